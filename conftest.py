@@ -0,0 +1,28 @@
+"""
+Shared pytest setup for the unit tests next to test_mock_services.py
+The API service is imported as the `app` package. The mock services are
+flat modules that share names (app.py, seo.py), so tests load them by path
+under a service-prefixed name.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+sys.path.insert(0, str(ROOT / "services" / "api"))
+
+# Smoke test script for running services (python test_mock_services.py), not a unit test
+collect_ignore = ["test_mock_services.py"]
+
+
+def load_service_module(service: str, name: str):
+    """Import services/{service}/{name}.py as {service}_{name}"""
+    module_name = f"{service}_{name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, ROOT / "services" / service / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
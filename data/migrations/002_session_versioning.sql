@@ -0,0 +1,19 @@
+-- Store Launch Wizard Database Schema
+-- Migration: 002_session_versioning.sql
+-- Row version for wizard sessions, bumped on every update. The API uses it to
+-- order writes into the Redis session cache (wizard:session:{session_id}).
+
+ALTER TABLE wizard_sessions
+    ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1;
+
+CREATE OR REPLACE FUNCTION bump_wizard_session_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.version = OLD.version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bump_wizard_sessions_version
+    BEFORE UPDATE ON wizard_sessions
+    FOR EACH ROW EXECUTE FUNCTION bump_wizard_session_version();
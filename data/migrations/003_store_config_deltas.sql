@@ -0,0 +1,23 @@
+-- Store Launch Wizard Database Schema
+-- Migration: 003_store_config_deltas.sql
+-- store_configs becomes an append-only history keyed by the session version.
+-- Most rows only carry the patch applied by one step update (delta); every
+-- Nth version is a full snapshot so a version can be rebuilt from the nearest
+-- snapshot plus a short run of deltas.
+
+ALTER TABLE store_configs
+    ADD COLUMN IF NOT EXISTS is_snapshot BOOLEAN NOT NULL DEFAULT true,
+    ADD COLUMN IF NOT EXISTS delta JSONB,
+    ADD COLUMN IF NOT EXISTS launch_config JSONB DEFAULT '{}';
+
+ALTER TABLE store_configs
+    ADD CONSTRAINT valid_delta CHECK (
+        is_snapshot OR (delta IS NOT NULL AND jsonb_typeof(delta) = 'object')
+    );
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_store_configs_session_version
+    ON store_configs(session_id, version);
+
+CREATE INDEX IF NOT EXISTS idx_store_configs_session_snapshots
+    ON store_configs(session_id, version)
+    WHERE is_snapshot;
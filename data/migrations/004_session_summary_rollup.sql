@@ -0,0 +1,224 @@
+-- Store Launch Wizard Database Schema
+-- Migration: 004_session_summary_rollup.sql
+-- wizard_session_summary becomes a rollup table with one row per session,
+-- kept current by triggers on the tables it counts. The old view joined five
+-- child tables at once, so every count was multiplied by the others (and the
+-- average rating weighted by them), and it ran calculate_wizard_progress()
+-- per row. Listing sessions is now a plain index scan of this table; run
+-- rebuild_wizard_session_summary() to recompute everything in bulk.
+
+DROP VIEW IF EXISTS wizard_session_summary;
+
+CREATE TABLE wizard_session_summary (
+    id UUID PRIMARY KEY REFERENCES wizard_sessions(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL,
+    current_step INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    business_name TEXT,
+    industry TEXT,
+    generated_content_count INTEGER NOT NULL DEFAULT 0,
+    theme_recommendations_count INTEGER NOT NULL DEFAULT 0,
+    integration_count INTEGER NOT NULL DEFAULT 0,
+    completed_checklist_count INTEGER NOT NULL DEFAULT 0,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    -- Same formula as calculate_wizard_progress(), without the per-row queries
+    progress_percentage FLOAT GENERATED ALWAYS AS (
+        LEAST(1.0, (current_step - 1)::FLOAT / 6 + completed_checklist_count::FLOAT / 20)
+    ) STORED,
+    average_rating NUMERIC GENERATED ALWAYS AS (
+        CASE WHEN rating_count > 0 THEN rating_sum::NUMERIC / rating_count END
+    ) STORED
+);
+
+CREATE INDEX idx_wizard_session_summary_updated_at ON wizard_session_summary(updated_at DESC);
+CREATE INDEX idx_wizard_session_summary_user_updated ON wizard_session_summary(user_id, updated_at DESC);
+CREATE INDEX idx_wizard_session_summary_step_updated ON wizard_session_summary(current_step, updated_at DESC);
+
+-- Session columns (business details live in the step 1 configuration)
+CREATE OR REPLACE FUNCTION sync_wizard_session_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO wizard_session_summary (
+        id, user_id, current_step, created_at, updated_at, completed_at, business_name, industry
+    ) VALUES (
+        NEW.id, NEW.user_id, NEW.current_step, NEW.created_at, NEW.updated_at, NEW.completed_at,
+        NEW.configuration->'step_1'->>'business_name',
+        NEW.configuration->'step_1'->>'industry'
+    )
+    ON CONFLICT (id) DO UPDATE SET
+        user_id = EXCLUDED.user_id,
+        current_step = EXCLUDED.current_step,
+        updated_at = EXCLUDED.updated_at,
+        completed_at = EXCLUDED.completed_at,
+        business_name = EXCLUDED.business_name,
+        industry = EXCLUDED.industry;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER wizard_sessions_summary
+    AFTER INSERT OR UPDATE ON wizard_sessions
+    FOR EACH ROW EXECUTE FUNCTION sync_wizard_session_summary();
+
+-- Counters: subtract the old row, add the new one. Updates that move a row
+-- between sessions (or flip the counted condition) adjust both sides.
+CREATE OR REPLACE FUNCTION count_generated_content_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE wizard_session_summary s
+        SET generated_content_count = s.generated_content_count - 1
+        FROM store_configs sc
+        WHERE sc.id = OLD.store_id AND s.id = sc.session_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE wizard_session_summary s
+        SET generated_content_count = s.generated_content_count + 1
+        FROM store_configs sc
+        WHERE sc.id = NEW.store_id AND s.id = sc.session_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER generated_content_summary
+    AFTER INSERT OR DELETE OR UPDATE OF store_id ON generated_content
+    FOR EACH ROW EXECUTE FUNCTION count_generated_content_summary();
+
+CREATE OR REPLACE FUNCTION count_theme_recommendations_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE wizard_session_summary
+        SET theme_recommendations_count = theme_recommendations_count - 1
+        WHERE id = OLD.session_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE wizard_session_summary
+        SET theme_recommendations_count = theme_recommendations_count + 1
+        WHERE id = NEW.session_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER theme_recommendations_summary
+    AFTER INSERT OR DELETE OR UPDATE OF session_id ON theme_recommendations
+    FOR EACH ROW EXECUTE FUNCTION count_theme_recommendations_summary();
+
+CREATE OR REPLACE FUNCTION count_integrations_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE wizard_session_summary
+        SET integration_count = integration_count - 1
+        WHERE id = OLD.session_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE wizard_session_summary
+        SET integration_count = integration_count + 1
+        WHERE id = NEW.session_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER integration_status_summary
+    AFTER INSERT OR DELETE OR UPDATE OF session_id ON integration_status
+    FOR EACH ROW EXECUTE FUNCTION count_integrations_summary();
+
+CREATE OR REPLACE FUNCTION count_checklist_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.is_completed THEN
+        UPDATE wizard_session_summary
+        SET completed_checklist_count = completed_checklist_count - 1
+        WHERE id = OLD.session_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_completed THEN
+        UPDATE wizard_session_summary
+        SET completed_checklist_count = completed_checklist_count + 1
+        WHERE id = NEW.session_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER launch_checklist_summary
+    AFTER INSERT OR DELETE OR UPDATE OF session_id, is_completed ON launch_checklist
+    FOR EACH ROW EXECUTE FUNCTION count_checklist_summary();
+
+CREATE OR REPLACE FUNCTION rate_feedback_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.rating IS NOT NULL THEN
+        UPDATE wizard_session_summary
+        SET rating_count = rating_count - 1,
+            rating_sum = rating_sum - OLD.rating
+        WHERE id = OLD.session_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.rating IS NOT NULL THEN
+        UPDATE wizard_session_summary
+        SET rating_count = rating_count + 1,
+            rating_sum = rating_sum + NEW.rating
+        WHERE id = NEW.session_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER user_feedback_summary
+    AFTER INSERT OR DELETE OR UPDATE OF session_id, rating ON user_feedback
+    FOR EACH ROW EXECUTE FUNCTION rate_feedback_summary();
+
+-- Bulk recompute, e.g. after a backfill or if the counters are ever in doubt.
+-- Each child table is aggregated on its own before joining, so nothing fans out.
+-- Takes an exclusive lock so concurrent trigger updates cannot interleave.
+CREATE OR REPLACE FUNCTION rebuild_wizard_session_summary()
+RETURNS INTEGER AS $$
+DECLARE
+    rebuilt INTEGER;
+BEGIN
+    LOCK TABLE wizard_session_summary IN EXCLUSIVE MODE;
+    DELETE FROM wizard_session_summary;
+
+    INSERT INTO wizard_session_summary (
+        id, user_id, current_step, created_at, updated_at, completed_at,
+        business_name, industry,
+        generated_content_count, theme_recommendations_count, integration_count,
+        completed_checklist_count, rating_count, rating_sum
+    )
+    SELECT
+        ws.id, ws.user_id, ws.current_step, ws.created_at, ws.updated_at, ws.completed_at,
+        ws.configuration->'step_1'->>'business_name',
+        ws.configuration->'step_1'->>'industry',
+        COALESCE(gc.n, 0), COALESCE(tr.n, 0), COALESCE(ist.n, 0),
+        COALESCE(lc.n, 0), COALESCE(uf.n, 0), COALESCE(uf.total, 0)
+    FROM wizard_sessions ws
+    LEFT JOIN (
+        SELECT sc.session_id, COUNT(*) AS n
+        FROM generated_content g JOIN store_configs sc ON sc.id = g.store_id
+        GROUP BY sc.session_id
+    ) gc ON gc.session_id = ws.id
+    LEFT JOIN (
+        SELECT session_id, COUNT(*) AS n FROM theme_recommendations GROUP BY session_id
+    ) tr ON tr.session_id = ws.id
+    LEFT JOIN (
+        SELECT session_id, COUNT(*) AS n FROM integration_status GROUP BY session_id
+    ) ist ON ist.session_id = ws.id
+    LEFT JOIN (
+        SELECT session_id, COUNT(*) AS n FROM launch_checklist WHERE is_completed GROUP BY session_id
+    ) lc ON lc.session_id = ws.id
+    LEFT JOIN (
+        SELECT session_id, COUNT(rating) AS n, SUM(rating) AS total FROM user_feedback GROUP BY session_id
+    ) uf ON uf.session_id = ws.id;
+
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+    RETURN rebuilt;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_wizard_session_summary();
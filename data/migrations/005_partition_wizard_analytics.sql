@@ -0,0 +1,115 @@
+-- Store Launch Wizard Database Schema
+-- Migration: 005_partition_wizard_analytics.sql
+-- wizard_analytics becomes a daily range-partitioned table on "timestamp".
+-- Queries that filter on a time window only scan the matching partitions, and
+-- retention drops whole partitions instead of DELETEing rows. Each partition
+-- gets a BRIN index on the (append-ordered) timestamp and a single B-tree for
+-- per-session lookups, which also serves the ON DELETE CASCADE from
+-- wizard_sessions. Partitions are created ahead of time by
+-- create_wizard_analytics_partitions(); the API runs it (and the retention
+-- function) periodically, see app/services/partition_maintenance.py.
+
+ALTER TABLE wizard_analytics RENAME TO wizard_analytics_legacy;
+
+CREATE TABLE wizard_analytics (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    session_id UUID REFERENCES wizard_sessions(id) ON DELETE CASCADE,
+    event_type VARCHAR(50) NOT NULL,
+    event_data JSONB DEFAULT '{}',
+    user_agent TEXT,
+    ip_address INET,
+    timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (id, timestamp),
+    CONSTRAINT valid_event_type CHECK (event_type IN (
+        'step_started', 'step_completed', 'content_generated',
+        'theme_selected', 'integration_added', 'wizard_completed',
+        'error_occurred', 'user_feedback'
+    ))
+) PARTITION BY RANGE (timestamp);
+
+-- Catches rows outside every daily partition (e.g. clock skew) so inserts never fail.
+-- Maintenance keeps partitions ahead of time, so this should stay empty.
+CREATE TABLE wizard_analytics_default PARTITION OF wizard_analytics DEFAULT;
+
+CREATE INDEX idx_wizard_analytics_timestamp_brin
+    ON wizard_analytics USING BRIN (timestamp) WITH (pages_per_range = 32);
+CREATE INDEX idx_wizard_analytics_session_time
+    ON wizard_analytics (session_id, timestamp);
+
+-- One partition per UTC day: wizard_analytics_pYYYYMMDD
+CREATE OR REPLACE FUNCTION create_wizard_analytics_partitions(
+    from_day DATE,
+    to_day DATE
+)
+RETURNS INTEGER AS $$
+DECLARE
+    day DATE := from_day;
+    partition_name TEXT;
+    created INTEGER := 0;
+BEGIN
+    -- Several API replicas run maintenance; serialize them
+    PERFORM pg_advisory_xact_lock(hashtext('wizard_analytics_partitions'));
+    WHILE day <= to_day LOOP
+        partition_name := 'wizard_analytics_p' || to_char(day, 'YYYYMMDD');
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF wizard_analytics FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                day::TIMESTAMP AT TIME ZONE 'UTC',
+                (day + 1)::TIMESTAMP AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+        day := day + 1;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION create_wizard_analytics_partitions(days_ahead INTEGER DEFAULT 7)
+RETURNS INTEGER AS $$
+    SELECT create_wizard_analytics_partitions(
+        (NOW() AT TIME ZONE 'UTC')::DATE,
+        (NOW() AT TIME ZONE 'UTC')::DATE + days_ahead
+    );
+$$ LANGUAGE sql;
+
+-- Retention: drop every daily partition that ends on or before the cutoff
+CREATE OR REPLACE FUNCTION drop_wizard_analytics_partitions(retention_days INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    cutoff DATE := (NOW() AT TIME ZONE 'UTC')::DATE - retention_days;
+    partition RECORD;
+    dropped INTEGER := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('wizard_analytics_partitions'));
+    FOR partition IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'wizard_analytics'::regclass
+          AND c.relname ~ '^wizard_analytics_p[0-9]{8}$'
+          AND to_date(substring(c.relname FROM '[0-9]{8}$'), 'YYYYMMDD') < cutoff
+    LOOP
+        EXECUTE format('DROP TABLE %I', partition.relname);
+        dropped := dropped + 1;
+    END LOOP;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partitions for existing events plus the coming week, then move the data over
+SELECT create_wizard_analytics_partitions(
+    LEAST(
+        (SELECT MIN(timestamp AT TIME ZONE 'UTC')::DATE FROM wizard_analytics_legacy),
+        (NOW() AT TIME ZONE 'UTC')::DATE
+    ),
+    (NOW() AT TIME ZONE 'UTC')::DATE + 7
+);
+
+INSERT INTO wizard_analytics (id, session_id, event_type, event_data, user_agent, ip_address, timestamp)
+SELECT id, session_id, event_type, event_data, user_agent, ip_address, COALESCE(timestamp, NOW())
+FROM wizard_analytics_legacy;
+
+DROP TABLE wizard_analytics_legacy;
@@ -0,0 +1,9 @@
+-- Store Launch Wizard Database Schema
+-- Migration: 006_session_summary_keyset_index.sql
+-- Session summary listings page on (updated_at, id) so sessions sharing an
+-- updated_at are neither skipped nor repeated; index the full sort key.
+
+DROP INDEX IF EXISTS idx_wizard_session_summary_updated_at;
+
+CREATE INDEX idx_wizard_session_summary_updated_id
+    ON wizard_session_summary(updated_at DESC, id DESC);
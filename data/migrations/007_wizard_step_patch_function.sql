@@ -0,0 +1,33 @@
+-- Store Launch Wizard Database Schema
+-- Migration: 007_wizard_step_patch_function.sql
+-- Step updates apply their JSON patch through one function, so the UPDATE is
+-- a single fixed statement that each connection prepares once instead of a
+-- chain of jsonb_set calls built per request. ops is an array of
+-- {"op", "path", "value"} with path already split into tokens below the step.
+-- "add" on an array position inserts before it (RFC 6902); "replace" and
+-- "add" on an object member set it; a parent that does not exist is a no-op.
+-- app/utils/json_patch.py replays the same semantics when rebuilding history.
+
+CREATE OR REPLACE FUNCTION apply_wizard_step_patch(configuration JSONB, step_key TEXT, ops JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    operation JSONB;
+    target TEXT[];
+BEGIN
+    configuration := jsonb_set(
+        configuration, ARRAY[step_key], COALESCE(configuration->step_key, '{}'::jsonb), true
+    );
+    FOR operation IN SELECT jsonb_array_elements(ops) LOOP
+        target := ARRAY[step_key] || ARRAY(SELECT jsonb_array_elements_text(operation->'path'));
+        IF operation->>'op' = 'remove' THEN
+            configuration := configuration #- target;
+        ELSIF operation->>'op' = 'add'
+            AND jsonb_typeof(configuration #> target[1:cardinality(target) - 1]) = 'array' THEN
+            configuration := jsonb_insert(configuration, target, COALESCE(operation->'value', 'null'::jsonb));
+        ELSE
+            configuration := jsonb_set(configuration, target, COALESCE(operation->'value', 'null'::jsonb), true);
+        END IF;
+    END LOOP;
+    RETURN configuration;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
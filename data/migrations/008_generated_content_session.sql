@@ -0,0 +1,125 @@
+-- Store Launch Wizard Database Schema
+-- Migration: 008_generated_content_session.sql
+-- generated_content carries its session_id, kept in step with store_configs,
+-- so the summary counter no longer has to join through store_configs. That
+-- join found nothing when the store_configs row was the one being deleted
+-- (ON DELETE CASCADE), and the count was never decremented. Counts that
+-- drifted that way are fixed by the rebuild at the end.
+
+ALTER TABLE generated_content
+    ADD COLUMN IF NOT EXISTS session_id UUID REFERENCES wizard_sessions(id) ON DELETE CASCADE;
+
+-- A backfill, not an edit: leave updated_at alone
+ALTER TABLE generated_content DISABLE TRIGGER update_generated_content_updated_at;
+UPDATE generated_content g
+SET session_id = sc.session_id
+FROM store_configs sc
+WHERE sc.id = g.store_id AND g.session_id IS DISTINCT FROM sc.session_id;
+ALTER TABLE generated_content ENABLE TRIGGER update_generated_content_updated_at;
+
+CREATE INDEX IF NOT EXISTS idx_generated_content_session_id ON generated_content(session_id);
+
+CREATE OR REPLACE FUNCTION set_generated_content_session()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.session_id := (SELECT session_id FROM store_configs WHERE id = NEW.store_id);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER generated_content_session
+    BEFORE INSERT OR UPDATE OF store_id, session_id ON generated_content
+    FOR EACH ROW EXECUTE FUNCTION set_generated_content_session();
+
+-- A store config moved to another session takes its content along (and the
+-- counter trigger below moves the count)
+CREATE OR REPLACE FUNCTION propagate_store_config_session()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE generated_content SET session_id = NEW.session_id WHERE store_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER store_configs_content_session
+    AFTER UPDATE OF session_id ON store_configs
+    FOR EACH ROW
+    WHEN (OLD.session_id IS DISTINCT FROM NEW.session_id)
+    EXECUTE FUNCTION propagate_store_config_session();
+
+CREATE OR REPLACE FUNCTION count_generated_content_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE wizard_session_summary
+        SET generated_content_count = generated_content_count - 1
+        WHERE id = OLD.session_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE wizard_session_summary
+        SET generated_content_count = generated_content_count + 1
+        WHERE id = NEW.session_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- UPDATE OF only sees columns named in the statement, not ones set by the
+-- BEFORE trigger, so a store_id change is watched too and filtered on the result
+DROP TRIGGER IF EXISTS generated_content_summary ON generated_content;
+CREATE TRIGGER generated_content_summary
+    AFTER INSERT OR DELETE ON generated_content
+    FOR EACH ROW EXECUTE FUNCTION count_generated_content_summary();
+
+CREATE TRIGGER generated_content_summary_move
+    AFTER UPDATE OF store_id, session_id ON generated_content
+    FOR EACH ROW
+    WHEN (OLD.session_id IS DISTINCT FROM NEW.session_id)
+    EXECUTE FUNCTION count_generated_content_summary();
+
+-- Bulk recompute, e.g. after a backfill or if the counters are ever in doubt.
+-- Each child table is aggregated on its own before joining, so nothing fans out.
+-- Takes an exclusive lock so concurrent trigger updates cannot interleave.
+CREATE OR REPLACE FUNCTION rebuild_wizard_session_summary()
+RETURNS INTEGER AS $$
+DECLARE
+    rebuilt INTEGER;
+BEGIN
+    LOCK TABLE wizard_session_summary IN EXCLUSIVE MODE;
+    DELETE FROM wizard_session_summary;
+
+    INSERT INTO wizard_session_summary (
+        id, user_id, current_step, created_at, updated_at, completed_at,
+        business_name, industry,
+        generated_content_count, theme_recommendations_count, integration_count,
+        completed_checklist_count, rating_count, rating_sum
+    )
+    SELECT
+        ws.id, ws.user_id, ws.current_step, ws.created_at, ws.updated_at, ws.completed_at,
+        ws.configuration->'step_1'->>'business_name',
+        ws.configuration->'step_1'->>'industry',
+        COALESCE(gc.n, 0), COALESCE(tr.n, 0), COALESCE(ist.n, 0),
+        COALESCE(lc.n, 0), COALESCE(uf.n, 0), COALESCE(uf.total, 0)
+    FROM wizard_sessions ws
+    LEFT JOIN (
+        SELECT session_id, COUNT(*) AS n FROM generated_content GROUP BY session_id
+    ) gc ON gc.session_id = ws.id
+    LEFT JOIN (
+        SELECT session_id, COUNT(*) AS n FROM theme_recommendations GROUP BY session_id
+    ) tr ON tr.session_id = ws.id
+    LEFT JOIN (
+        SELECT session_id, COUNT(*) AS n FROM integration_status GROUP BY session_id
+    ) ist ON ist.session_id = ws.id
+    LEFT JOIN (
+        SELECT session_id, COUNT(*) AS n FROM launch_checklist WHERE is_completed GROUP BY session_id
+    ) lc ON lc.session_id = ws.id
+    LEFT JOIN (
+        SELECT session_id, COUNT(rating) AS n, SUM(rating) AS total FROM user_feedback GROUP BY session_id
+    ) uf ON uf.session_id = ws.id;
+
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+    RETURN rebuilt;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_wizard_session_summary();
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     # Database
@@ -8,6 +8,15 @@ class Settings(BaseSettings):
     
     # Security
     JWT_SECRET: str = "wizard-dev-secret-key"
+    JWT_ALGORITHMS: List[str] = ["HS256"]
+    JWT_AUDIENCE: Optional[str] = None
+    JWT_DEFAULT_KID: str = "default"
+    JWT_KEYS: Dict[str, str] = {}  # Additional active keys by kid
+    JWT_KEYS_FILE: Optional[str] = None  # JSON {kid: secret}, re-read on change
+    JWT_KEYS_REFRESH_SECONDS: float = 10.0
+    JWT_CACHE_SIZE: int = 10000
+    JWT_CACHE_MAX_TTL: float = 300.0
+    AUTH_REQUIRED: bool = False
     ALLOWED_HOSTS: List[str] = ["localhost", "127.0.0.1", "0.0.0.0"]
     CORS_ORIGINS: List[str] = ["http://localhost:9026", "http://localhost:3000"]
     
@@ -16,6 +25,119 @@ class Settings(BaseSettings):
     CONTENT_GENERATOR_URL: str = "http://store-wizard-content-service:9022"
     THEME_SERVICE_URL: str = "http://store-wizard-theme-service:9023"
     INTEGRATION_SERVICE_URL: str = "http://store-wizard-integration-service:9024"
+    ANALYTICS_SERVICE_URL: str = "http://store-wizard-analytics-service:9025"
+    
+    # Postgres pool (the replica, when set, serves reporting reads)
+    DATABASE_REPLICA_URL: Optional[str] = None
+    DB_REPLICA_MAX_LAG: float = 5.0  # seconds; beyond this reads fall back to the primary
+    DB_REPLICA_LAG_CHECK_INTERVAL: float = 1.0
+    DB_POOL_MIN_SIZE: int = 5
+    DB_POOL_MAX_SIZE: int = 20
+    DB_ACQUIRE_TIMEOUT: float = 2.0  # seconds to wait for a free connection
+    DB_COMMAND_TIMEOUT: float = 5.0  # client-side per-query timeout
+    DB_STATEMENT_TIMEOUT: float = 10.0  # server-side statement_timeout
+    DB_MAX_INACTIVE_LIFETIME: float = 300.0
+    DB_STATEMENT_CACHE_SIZE: int = 256  # prepared statements kept per connection
+    DB_APPLICATION_NAME: str = "store-wizard-api"
+    
+    # Upstream HTTP pools
+    UPSTREAM_HTTP2: bool = False
+    UPSTREAM_MAX_CONNECTIONS: int = 100
+    UPSTREAM_MAX_KEEPALIVE: int = 20
+    UPSTREAM_KEEPALIVE_EXPIRY: float = 30.0
+    UPSTREAM_CONNECT_TIMEOUT: float = 2.0
+    UPSTREAM_TIMEOUT: float = 10.0
+    UPSTREAM_POOL_LIMITS: Dict[str, int] = {"llm": 50, "integration": 50}
+    UPSTREAM_BREAKER_FAILURE_THRESHOLD: int = 5
+    UPSTREAM_BREAKER_RESET_TIMEOUT: float = 30.0
+    UPSTREAM_BREAKER_HALF_OPEN_CALLS: int = 1
+    UPSTREAM_RETRY_BUDGET_RATIO: float = 0.2  # retries as a fraction of recent requests
+    UPSTREAM_RETRY_MIN_PER_SECOND: float = 1.0
+    UPSTREAM_MAX_RETRIES: int = 2
+    UPSTREAM_HEDGE_DELAY: float = 0.25  # seconds before a hedged GET sends its second copy
+    LLM_STREAM_IDLE_TIMEOUT: float = 30.0  # max gap between chunks of a streamed generation
+    
+    # Rate limiting (token bucket per identity and route class)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: Dict[str, str] = {
+        "llm_generation": "10/minute",
+        "content_generation": "30/minute",
+        "integration_setup": "20/minute",
+        "theme_recommendations": "300/minute",
+        "wizard_steps": "120/minute",
+        "default": "600/minute",
+    }
+    RATE_LIMIT_LEASE_FRACTION: float = 0.1  # largest lease, as a fraction of capacity
+    RATE_LIMIT_LEASE_TTL: float = 1.0  # unused leased tokens are returned on the next renewal
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 10000
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # honour X-Forwarded-For, and only from TRUSTED_PROXIES
+    TRUSTED_PROXIES: List[str] = []  # CIDRs of the load balancers/proxies in front of the gateway
+    API_KEYS: List[str] = []  # SHA-256 hex digests of issued X-API-Key values; other keys are limited by IP
+    
+    # Wizard sessions
+    SESSION_CACHE_TTL: int = 1800
+    SESSION_SNAPSHOT_INTERVAL: int = 10  # full store_configs snapshot every N versions
+    
+    # Analytics event ingestion
+    ANALYTICS_ENABLED: bool = True
+    ANALYTICS_BATCH_SIZE: int = 500
+    ANALYTICS_FLUSH_INTERVAL: float = 1.0  # seconds
+    ANALYTICS_BUFFER_MAXSIZE: int = 20000
+    ANALYTICS_STREAM_KEY: str = "wizard:analytics:events"
+    ANALYTICS_STREAM_MAXLEN: int = 500000
+    ANALYTICS_REPLAY_INTERVAL: float = 5.0
+    ANALYTICS_REPLAY_CLAIM_IDLE: float = 60.0  # seconds before another flusher takes over a pending batch
+    ANALYTICS_REPLAY_MAX_DELIVERIES: int = 5  # then events that still fail are moved to the dead stream
+    ANALYTICS_DEAD_STREAM_KEY: str = "wizard:analytics:events:dead"
+    ANALYTICS_PARTITIONS_AHEAD: int = 7  # daily wizard_analytics partitions created in advance
+    ANALYTICS_RETENTION_DAYS: int = 90  # 0 keeps partitions forever
+    ANALYTICS_PARTITION_MAINTENANCE_INTERVAL: float = 3600.0
+    
+    # Background jobs (Redis Streams, consumed by `python -m app.worker`)
+    JOB_STREAM_MAXLEN: int = 10000
+    JOB_RESULT_TTL: int = 86400  # seconds job state is kept after the last update
+    JOB_DEDUPE_WINDOW: float = 300.0  # identical submissions without an Idempotency-Key within this are one job
+    JOB_WORKER_CONCURRENCY: int = 8
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_BACKOFF_BASE: float = 2.0  # seconds, doubled per attempt with jitter
+    JOB_BACKOFF_MAX: float = 300.0
+    JOB_TIMEOUT: float = 90.0
+    JOB_VISIBILITY_TIMEOUT: float = 180.0  # must exceed JOB_TIMEOUT; then another worker reclaims the job
+    JOB_BLOCK_MS: int = 1000
+    JOB_WORKER_METRICS_PORT: int = 9030
+    
+    # Deployment status push (worker -> Redis pub/sub -> SSE/WebSocket)
+    DEPLOYMENT_STATUS_POLL_INTERVAL: float = 2.0  # worker-side tracking of the integration service
+    DEPLOYMENT_TRACK_TIMEOUT: float = 75.0  # keep below JOB_TIMEOUT
+    DEPLOYMENT_EVENTS_QUEUE_SIZE: int = 16  # per listener; oldest events are dropped when full
+    DEPLOYMENT_EVENTS_HEARTBEAT: float = 15.0
+    DEPLOYMENT_EVENTS_SEND_TIMEOUT: float = 10.0  # a WebSocket client slower than this is disconnected
+    DEPLOYMENT_EVENTS_MAX_DURATION: float = 900.0  # clients reconnect after this
+    
+    # Response cache (L1 memory, L2 Redis)
+    CACHE_MEMORY_MAXSIZE: int = 1000
+    CACHE_MEMORY_TTL: int = 60
+    CACHE_REDIS_TTL: int = 300
+    CONTENT_CACHE_TTL: int = 86400  # generated content under wizard:content:{hash}
+    CONTENT_CACHE_MAX_BYTES: int = 65536  # larger generations are served but not cached
+    
+    # Health checks
+    HEALTH_CACHE_TTL: float = 2.0
+    HEALTH_CHECK_TIMEOUT: float = 1.0
+    HEALTH_CRITICAL_CHECKS: List[str] = ["database", "redis"]
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_QUEUE_SIZE: int = 10000
+    ACCESS_LOG_DEFAULT_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_SAMPLE_RATES: Dict[str, float] = {
+        "/healthz": 0.01,
+        "/livez": 0.01,
+        "/readyz": 0.01,
+        "/metrics": 0.01,
+    }
+    ACCESS_LOG_SLOW_THRESHOLD: float = 1.0  # seconds; slower requests are always logged
     
     # API Keys (Optional)
     OPENAI_API_KEY: str = "demo-key"
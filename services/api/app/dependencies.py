@@ -1,20 +1,142 @@
-import asyncpg
 import redis.asyncio as redis
 from app.config import get_settings
+from app.repositories.analytics import AnalyticsRepository
+from app.repositories.database import Database, DatabaseRouter, create_pool
+from app.repositories.sessions import SessionRepository
+from app.services.analytics_events import AnalyticsEventBuffer
+from app.services.cache import CacheManager
+from app.services.deployment_events import DeploymentEventHub
+from app.services.jobs import JobQueue
+from app.services.partition_maintenance import AnalyticsPartitionMaintainer
+from app.services.upstream import Upstream, UpstreamClients
+from app.services.wizard_sessions import WizardFlowManager
 
-_db_pool = None
+_database = None
+_database_router = None
 _redis_client = None
+_upstream_clients = None
+_cache_manager = None
+_job_queue = None
+_deployment_event_hub = None
+_wizard_flow_manager = None
+_analytics_buffer = None
+_partition_maintainer = None
 
-async def get_database():
-    global _db_pool
-    if _db_pool is None:
+async def get_database() -> Database:
+    global _database
+    if _database is None:
         settings = get_settings()
-        _db_pool = await asyncpg.create_pool(settings.DATABASE_URL)
-    return _db_pool
+        _database = Database(await create_pool(settings), settings)
+    return _database
+
+async def get_database_router() -> DatabaseRouter:
+    global _database_router
+    if _database_router is None:
+        settings = get_settings()
+        replica = None
+        if settings.DATABASE_REPLICA_URL:
+            replica = Database(await create_pool(settings, settings.DATABASE_REPLICA_URL), settings)
+        _database_router = DatabaseRouter(await get_database(), replica, await get_redis_client(), settings)
+        _database_router.start()
+    return _database_router
+
+async def get_analytics_repository() -> AnalyticsRepository:
+    return AnalyticsRepository(await get_database_router())
+
+async def close_database():
+    global _database, _database_router
+    if _database_router is not None:
+        await _database_router.close()
+        _database_router = None
+    if _database is not None:
+        await _database.close()
+        _database = None
 
 async def get_redis_client():
     global _redis_client
     if _redis_client is None:
         settings = get_settings()
         _redis_client = redis.from_url(settings.REDIS_URL)
-    return _redis_client 
\ No newline at end of file
+    return _redis_client
+
+async def get_cache_manager() -> CacheManager:
+    global _cache_manager
+    if _cache_manager is None:
+        _cache_manager = CacheManager(await get_redis_client(), get_settings())
+    return _cache_manager
+
+async def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(await get_redis_client(), get_settings())
+    return _job_queue
+
+async def get_deployment_event_hub() -> DeploymentEventHub:
+    global _deployment_event_hub
+    if _deployment_event_hub is None:
+        _deployment_event_hub = DeploymentEventHub(await get_redis_client(), get_settings())
+        _deployment_event_hub.start()
+    return _deployment_event_hub
+
+async def close_deployment_event_hub():
+    global _deployment_event_hub
+    if _deployment_event_hub is not None:
+        await _deployment_event_hub.close()
+        _deployment_event_hub = None
+
+async def get_wizard_flow_manager() -> WizardFlowManager:
+    global _wizard_flow_manager
+    if _wizard_flow_manager is None:
+        _wizard_flow_manager = WizardFlowManager(
+            SessionRepository(await get_database()),
+            await get_redis_client(),
+            get_settings(),
+            databases=await get_database_router()
+        )
+    return _wizard_flow_manager
+
+async def get_upstream_clients() -> UpstreamClients:
+    global _upstream_clients
+    if _upstream_clients is None:
+        _upstream_clients = UpstreamClients(get_settings())
+        await _upstream_clients.start()
+    return _upstream_clients
+
+async def get_upstream_client(name: str) -> Upstream:
+    clients = await get_upstream_clients()
+    return clients.get(name)
+
+async def close_upstream_clients():
+    global _upstream_clients
+    if _upstream_clients is not None:
+        await _upstream_clients.close()
+        _upstream_clients = None
+
+async def get_analytics_buffer() -> AnalyticsEventBuffer:
+    global _analytics_buffer
+    if _analytics_buffer is None:
+        _analytics_buffer = AnalyticsEventBuffer(
+            await get_database(),
+            await get_redis_client(),
+            get_settings()
+        )
+        _analytics_buffer.start()
+    return _analytics_buffer
+
+async def close_analytics_buffer():
+    global _analytics_buffer
+    if _analytics_buffer is not None:
+        await _analytics_buffer.close()
+        _analytics_buffer = None
+
+async def start_partition_maintenance():
+    global _partition_maintainer
+    if _partition_maintainer is None:
+        _partition_maintainer = AnalyticsPartitionMaintainer(await get_database(), get_settings())
+        _partition_maintainer.start()
+
+async def stop_partition_maintenance():
+    global _partition_maintainer
+    if _partition_maintainer is not None:
+        await _partition_maintainer.close()
+        _partition_maintainer = None
@@ -12,21 +12,34 @@ import uvicorn
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from app.config import get_settings
+from app.utils.log_config import configure_logging, shutdown_logging
+from app.services.health import HealthChecker
+from app.repositories.database import HEALTH_PING
 from app.middleware.auth import AuthMiddleware
 from app.middleware.rate_limiting import RateLimitMiddleware
 from app.middleware.logging import LoggingMiddleware
 from app.routers import wizard, content, themes, integrations, analytics
-from app.dependencies import get_database, get_redis_client
+from app.dependencies import (
+    get_database,
+    get_database_router,
+    close_database,
+    get_redis_client,
+    get_upstream_clients,
+    close_upstream_clients,
+    get_analytics_buffer,
+    close_analytics_buffer,
+    start_partition_maintenance,
+    stop_partition_maintenance,
+    get_deployment_event_hub,
+    close_deployment_event_hub,
+)
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+configure_logging(get_settings())
 logger = logging.getLogger(__name__)
 
 
@@ -39,7 +52,7 @@ async def lifespan(app: FastAPI):
     # Initialize database connection
     try:
         db = await get_database()
-        await db.execute("SELECT 1")  # Test connection
+        await db.execute(HEALTH_PING)  # Test connection
         logger.info("Database connection established")
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
@@ -54,10 +67,28 @@ async def lifespan(app: FastAPI):
         logger.error(f"Redis connection failed: {e}")
         raise
     
+    # Open pooled upstream HTTP clients
+    await get_upstream_clients()
+    logger.info("Upstream service pools initialized")
+    
+    # Start replica lag monitoring, the analytics event flusher and wizard_analytics partition upkeep
+    await get_database_router()
+    await get_analytics_buffer()
+    await start_partition_maintenance()
+    
+    # Subscribe to deployment status events for the streaming status endpoints
+    await get_deployment_event_hub()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Store Launch Wizard API Service")
+    await close_deployment_event_hub()
+    await close_upstream_clients()
+    await stop_partition_maintenance()
+    await close_analytics_buffer()
+    await close_database()
+    shutdown_logging()
 
 
 # Initialize FastAPI app
@@ -68,11 +99,13 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 # Get settings
 settings = get_settings()
+health_checker = HealthChecker(settings)
 
 # Add middleware (order matters!)
 app.add_middleware(
@@ -88,9 +121,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.add_middleware(LoggingMiddleware)
 app.add_middleware(RateLimitMiddleware)
 app.add_middleware(AuthMiddleware)
+# Added last so it is outermost: requests rejected by auth or rate limiting are
+# logged too, and their responses carry its request_id
+app.add_middleware(LoggingMiddleware)
 
 # Initialize Prometheus metrics
 instrumentator = Instrumentator()
@@ -101,7 +136,7 @@ instrumentator.instrument(app).expose(app)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": "Internal server error",
@@ -111,38 +146,26 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+@app.get("/livez", tags=["Health"])
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive", "version": "1.0.0"}
+
+
+@app.get("/readyz", tags=["Health"])
+async def readiness_check():
+    """Readiness probe: dependency checks run concurrently and are cached briefly"""
+    report = await health_checker.readiness()
+    return ORJSONResponse(
+        content={**report, "version": "1.0.0"},
+        status_code=200 if report["ready"] else 503
+    )
+
+
 @app.get("/healthz", tags=["Health"])
 async def health_check():
-    """Health check endpoint"""
-    checks = {}
-    
-    try:
-        # Database health check
-        db = await get_database()
-        await db.execute("SELECT 1")
-        checks["database"] = "healthy"
-    except Exception as e:
-        checks["database"] = f"unhealthy: {str(e)}"
-    
-    try:
-        # Redis health check
-        redis = await get_redis_client()
-        await redis.ping()
-        checks["redis"] = "healthy"
-    except Exception as e:
-        checks["redis"] = f"unhealthy: {str(e)}"
-    
-    # Overall health status
-    is_healthy = all("healthy" in status for status in checks.values())
-    
-    return JSONResponse(
-        content={
-            "status": "healthy" if is_healthy else "unhealthy",
-            "checks": checks,
-            "version": "1.0.0"
-        },
-        status_code=200 if is_healthy else 503
-    )
+    """Health check endpoint (same report as /readyz)"""
+    return await readiness_check()
 
 
 @app.get("/", tags=["Root"])
@@ -195,5 +218,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=int(os.getenv("PORT", 9020)),
         reload=os.getenv("ENVIRONMENT") == "development",
-        log_level="info"
+        log_level="info",
+        access_log=False  # LoggingMiddleware writes access records
     ) 
\ No newline at end of file
@@ -1,9 +1,62 @@
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Simple auth middleware - in production, implement proper JWT validation
-        request.state.user_id = "demo-user"
-        response = await call_next(request)
-        return response 
\ No newline at end of file
+import json
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import get_settings
+from app.services.token_verifier import InvalidToken, TokenVerifier
+
+PUBLIC_PATHS = {"/", "/healthz", "/livez", "/readyz", "/metrics", "/docs", "/redoc", "/openapi.json"}
+
+class AuthMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.settings = get_settings()
+        self.verifier = TokenVerifier(self.settings)
+
+    async def _reject(self, scope: Scope, send: Send, message: str):
+        if scope["type"] == "websocket":
+            # Closing before accept makes the server answer the handshake with 403
+            await send({"type": "websocket.close", "code": 1008, "reason": message})
+            return
+        body = json.dumps({"error": "Unauthorized", "message": message}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 401,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"www-authenticate", b"Bearer"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket") or scope["path"] in PUBLIC_PATHS or scope.get("method") == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        
+        authorization = Headers(scope=scope).get("authorization")
+        if not authorization:
+            if self.settings.AUTH_REQUIRED:
+                await self._reject(scope, send, "Missing bearer token")
+                return
+            # Anonymous wizard usage; downstream keys rate limits by API key or IP
+            await self.app(scope, receive, send)
+            return
+        
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            await self._reject(scope, send, "Invalid authorization header")
+            return
+        
+        try:
+            claims = self.verifier.verify(token.strip())
+        except InvalidToken as e:
+            await self._reject(scope, send, f"Invalid token: {e}")
+            return
+        
+        state = scope.setdefault("state", {})
+        state["user_id"] = claims.get("sub")
+        state["token_claims"] = claims
+        await self.app(scope, receive, send)
@@ -1,21 +1,62 @@
+import random
 import time
 import uuid
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
 
-logger = logging.getLogger(__name__)
+from app.config import get_settings
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        request.state.request_id = str(uuid.uuid4())
+logger = logging.getLogger("app.access")
+
+class LoggingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        settings = get_settings()
+        self.sample_rates = settings.ACCESS_LOG_SAMPLE_RATES
+        self.default_sample_rate = settings.ACCESS_LOG_DEFAULT_SAMPLE_RATE
+        self.slow_threshold = settings.ACCESS_LOG_SLOW_THRESHOLD
+
+    def _should_log(self, path: str, status_code: int, duration: float) -> bool:
+        # Failures and slow requests are never sampled away
+        if status_code >= 500 or duration >= self.slow_threshold:
+            return True
+        rate = self.sample_rates.get(path, self.default_sample_rate)
+        return rate >= 1.0 or random.random() < rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        logger.info(f"Request started: {request.method} {request.url}")
+        start_time = time.perf_counter()
+        request_id = str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
         
-        response = await call_next(request)
+        status_code = 500
         
-        process_time = time.time() - start_time
-        logger.info(f"Request completed: {request.method} {request.url} - {response.status_code} - {process_time:.3f}s")
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
         
-        return response 
\ No newline at end of file
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            path = scope["path"]
+            if logger.isEnabledFor(logging.INFO) and self._should_log(path, status_code, duration):
+                client = scope.get("client")
+                logger.info(
+                    "request completed",
+                    extra={
+                        "request_id": request_id,
+                        "method": scope["method"],
+                        "path": path,
+                        "query": scope.get("query_string", b"").decode("latin-1"),
+                        "status": status_code,
+                        "duration_ms": round(duration * 1000, 2),
+                        "client_ip": client[0] if client else None,
+                        "user_id": scope["state"].get("user_id"),
+                    }
+                )
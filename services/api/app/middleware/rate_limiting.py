@@ -1,8 +1,90 @@
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Simple rate limiting - in production, implement proper rate limiting
-        response = await call_next(request)
-        return response 
\ No newline at end of file
+import hashlib
+import json
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+from app.dependencies import get_redis_client
+from app.services.rate_limiter import RateLimitResult, TokenBucketLimiter, classify_route
+from app.utils.client_ip import client_address, parse_networks
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.settings = get_settings()
+        self.limiter: Optional[TokenBucketLimiter] = None
+        self.trusted_proxies = parse_networks(self.settings.TRUSTED_PROXIES) if self.settings.RATE_LIMIT_TRUST_FORWARDED else []
+        self.api_keys = {digest.strip().lower() for digest in self.settings.API_KEYS}
+
+    async def _get_limiter(self) -> TokenBucketLimiter:
+        if self.limiter is None:
+            self.limiter = TokenBucketLimiter(await get_redis_client(), self.settings)
+        return self.limiter
+
+    def _identity(self, scope: Scope, headers: Headers) -> str:
+        user_id = scope.get("state", {}).get("user_id")
+        if user_id:
+            return f"user:{user_id}"
+        
+        # Only issued keys get their own bucket; an unchecked key would let a client
+        # mint a fresh bucket per request and dodge the per-IP limit
+        api_key = headers.get("x-api-key")
+        if api_key:
+            digest = hashlib.sha256(api_key.encode()).hexdigest()
+            if digest in self.api_keys:
+                return f"key:{digest[:16]}"
+        
+        client = scope.get("client")
+        address = client_address(client[0] if client else None, headers.get("x-forwarded-for"), self.trusted_proxies)
+        return f"ip:{address or 'unknown'}"
+
+    def _headers(self, result: RateLimitResult) -> list:
+        headers = [
+            (b"ratelimit-limit", str(result.limit).encode()),
+            (b"ratelimit-remaining", str(result.remaining).encode()),
+            (b"ratelimit-reset", str(result.reset).encode()),
+        ]
+        if not result.allowed:
+            headers.append((b"retry-after", str(result.retry_after).encode()))
+        return headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        
+        route_class = classify_route(scope["path"])
+        if route_class is None or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        
+        limiter = await self._get_limiter()
+        identity = self._identity(scope, Headers(scope=scope))
+        result = await limiter.hit(identity, route_class)
+        rate_headers = self._headers(result)
+        
+        if not result.allowed:
+            body = json.dumps({
+                "error": "Rate limit exceeded",
+                "message": f"Too many {route_class} requests, retry in {result.retry_after}s",
+                "request_id": scope.get("state", {}).get("request_id")
+            }).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ] + rate_headers,
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + rate_headers
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,74 @@
+"""
+Read-only reporting queries: session summaries and event counts
+These run on the read replica when one is configured (see DatabaseRouter).
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.repositories.database import DatabaseRouter, register_statement
+
+SUMMARY_COLUMNS = """
+    id AS session_id, user_id, current_step, created_at, updated_at, completed_at,
+    business_name, industry, progress_percentage,
+    generated_content_count, theme_recommendations_count, integration_count,
+    rating_count, average_rating::float8 AS average_rating
+"""
+
+# Keyset pagination on (updated_at, id) so deep pages stay a bounded index scan
+LIST_SUMMARIES = register_statement("summary.list", f"""
+    SELECT {SUMMARY_COLUMNS}
+    FROM wizard_session_summary
+    ORDER BY updated_at DESC, id DESC
+    LIMIT $1
+""")
+LIST_SUMMARIES_AFTER = register_statement("summary.list_after", f"""
+    SELECT {SUMMARY_COLUMNS}
+    FROM wizard_session_summary
+    WHERE (updated_at, id) < ($1, $2)
+    ORDER BY updated_at DESC, id DESC
+    LIMIT $3
+""")
+GET_SUMMARY = register_statement(
+    "summary.get", f"SELECT {SUMMARY_COLUMNS} FROM wizard_session_summary WHERE id = $1"
+)
+# The timestamp window lets Postgres prune wizard_analytics to the matching daily partitions
+EVENT_COUNTS = register_statement("analytics.event_counts", """
+    SELECT event_type, COUNT(*) AS events, COUNT(DISTINCT session_id) AS sessions
+    FROM wizard_analytics
+    WHERE timestamp >= $1 AND timestamp < $2
+    GROUP BY event_type
+    ORDER BY events DESC
+""")
+
+
+class AnalyticsRepository:
+    """Session summary and event reporting, routed to the replica when possible"""
+
+    def __init__(self, databases: DatabaseRouter):
+        self.databases = databases
+
+    async def list_session_summaries(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Dict[str, Any]]:
+        """Page of summaries, newest first; `after` is the (updated_at, session_id) of the last row seen"""
+        db = await self.databases.reader()
+        if after is None:
+            rows = await db.fetch(LIST_SUMMARIES, limit)
+        else:
+            rows = await db.fetch(LIST_SUMMARIES_AFTER, after[0], after[1], limit)
+        return [dict(row) for row in rows]
+
+    async def get_session_summary(self, session_id: UUID) -> Optional[Dict[str, Any]]:
+        # Scoped to the session so a just-updated session is read from the primary
+        db = await self.databases.reader(str(session_id))
+        row = await db.fetchrow(GET_SUMMARY, session_id)
+        return dict(row) if row else None
+
+    async def event_counts(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        db = await self.databases.reader()
+        rows = await db.fetch(EVENT_COUNTS, start, end)
+        return [dict(row) for row in rows]
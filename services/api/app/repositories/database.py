@@ -0,0 +1,293 @@
+"""
+Postgres pool and query layer
+Every query the API runs is registered here under a name. asyncpg prepares a
+statement the first time a connection runs it and keeps it in the
+per-connection statement cache, so each query is parsed and planned once per
+connection rather than once per request. Connections decode json/jsonb with
+orjson (binary jsonb on the wire) so repositories get dicts back directly.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import asyncpg
+import orjson
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+STATEMENTS: Dict[str, str] = {}
+
+query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Postgres query latency by statement name",
+    ["query"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+query_errors = Counter(
+    "db_query_errors_total", "Failed Postgres queries by statement name", ["query", "error"]
+)
+replica_lag = Gauge(
+    "db_replica_lag_seconds", "Replication lag of the read replica (-1 when unreachable)"
+)
+replica_lag_bytes = Gauge(
+    "db_replica_lag_bytes", "WAL written on the primary but not yet replayed by the replica"
+)
+routed_reads = Counter(
+    "db_routed_reads_total", "Read-only queries by the pool they were routed to", ["target", "reason"]
+)
+pool_acquire_duration = Histogram(
+    "db_pool_acquire_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5),
+)
+
+
+def register_statement(name: str, sql: str) -> str:
+    """Register a named statement; returns the name for use with Database methods"""
+    if STATEMENTS.get(name, sql) != sql:
+        raise ValueError(f"Statement {name} is already registered with different SQL")
+    STATEMENTS[name] = sql
+    return name
+
+
+HEALTH_PING = register_statement("health.ping", "SELECT 1")
+PRIMARY_WAL_LSN = register_statement("primary.wal_lsn", "SELECT pg_current_wal_lsn()::text")
+# Position and age of the last replayed transaction; a plain instance (not in recovery) has neither
+REPLICA_STATUS = register_statement("replica.status", """
+    SELECT pg_is_in_recovery() AS in_recovery,
+           pg_last_wal_replay_lsn()::text AS replay_lsn,
+           EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp())::float8 AS replay_age
+""")
+
+
+def parse_lsn(lsn: str) -> int:
+    """Postgres "XXXXXXXX/YYYYYYYY" WAL position as a byte offset"""
+    high, _, low = lsn.partition("/")
+    return (int(high, 16) << 32) + int(low, 16)
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    # Binary jsonb is a version byte followed by the JSON text
+    return b"\x01" + orjson.dumps(value)
+
+
+def _decode_jsonb(data: bytes) -> Any:
+    return orjson.loads(data[1:])
+
+
+async def init_connection(conn: asyncpg.Connection):
+    """Per-connection setup: orjson codecs for json and jsonb"""
+    await conn.set_type_codec(
+        "jsonb", schema="pg_catalog", format="binary",
+        encoder=_encode_jsonb, decoder=_decode_jsonb
+    )
+    await conn.set_type_codec(
+        "json", schema="pg_catalog", format="text",
+        encoder=lambda value: orjson.dumps(value).decode(), decoder=orjson.loads
+    )
+
+
+async def create_pool(settings: Settings, dsn: Optional[str] = None) -> asyncpg.Pool:
+    return await asyncpg.create_pool(
+        dsn or settings.DATABASE_URL,
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE,
+        max_inactive_connection_lifetime=settings.DB_MAX_INACTIVE_LIFETIME,
+        command_timeout=settings.DB_COMMAND_TIMEOUT,
+        statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+        server_settings={
+            "application_name": settings.DB_APPLICATION_NAME,
+            # Server-side guard in case the client-side timeout is not honoured (e.g. during COPY)
+            "statement_timeout": str(int(settings.DB_STATEMENT_TIMEOUT * 1000)),
+        },
+        init=init_connection,
+    )
+
+
+class _QueryRunner:
+    """Shared fetch/fetchrow/fetchval/execute over named statements"""
+
+    def _connection(self):
+        raise NotImplementedError
+
+    async def _run(self, method: str, name: str, args: tuple):
+        sql = STATEMENTS[name]
+        started = time.perf_counter()
+        try:
+            async with self._connection() as conn:
+                return await getattr(conn, method)(sql, *args)
+        except Exception as e:
+            query_errors.labels(query=name, error=type(e).__name__).inc()
+            raise
+        finally:
+            query_duration.labels(query=name).observe(time.perf_counter() - started)
+
+    async def fetch(self, name: str, *args):
+        return await self._run("fetch", name, args)
+
+    async def fetchrow(self, name: str, *args):
+        return await self._run("fetchrow", name, args)
+
+    async def fetchval(self, name: str, *args):
+        return await self._run("fetchval", name, args)
+
+    async def execute(self, name: str, *args):
+        return await self._run("execute", name, args)
+
+
+class Transaction(_QueryRunner):
+    """Named-statement queries on one connection inside a transaction"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    @asynccontextmanager
+    async def _connection(self):
+        yield self.connection
+
+
+class Database(_QueryRunner):
+    """The asyncpg pool plus named-statement helpers and query metrics"""
+
+    def __init__(self, pool: asyncpg.Pool, settings: Settings):
+        self.pool = pool
+        self.acquire_timeout = settings.DB_ACQUIRE_TIMEOUT
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[asyncpg.Connection]:
+        started = time.perf_counter()
+        async with self.pool.acquire(timeout=self.acquire_timeout) as conn:
+            pool_acquire_duration.observe(time.perf_counter() - started)
+            yield conn
+
+    def _connection(self):
+        return self.acquire()
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Transaction]:
+        async with self.acquire() as conn:
+            async with conn.transaction():
+                yield Transaction(conn)
+
+    async def close(self):
+        await self.pool.close()
+
+
+def session_write_key(session_id: str) -> str:
+    return f"wizard:session:{session_id}:written_lsn"
+
+
+class DatabaseRouter:
+    """Primary/replica pair with lag-aware routing of read-only queries
+
+    Writes and read-your-writes reads use the primary. Reporting reads use the
+    replica while its lag is under DB_REPLICA_MAX_LAG. Lag is measured against
+    the primary's current WAL position, so WAL the replica has not even received
+    yet counts. Reads scoped to a session go to the primary until the replica
+    has replayed past the WAL position recorded after that session's last
+    write. Positions are shared through Redis so every API replica sees them;
+    no wall clocks are compared.
+    """
+
+    def __init__(self, primary: Database, replica: Optional[Database], redis_client, settings: Settings):
+        self.primary = primary
+        self.replica = replica
+        self.redis = redis_client
+        self.max_lag = settings.DB_REPLICA_MAX_LAG
+        self.check_interval = settings.DB_REPLICA_LAG_CHECK_INTERVAL
+        self.lag: Optional[float] = None
+        # WAL position the replica had replayed at the last check (inf for a plain instance)
+        self._replayed_lsn: float = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.replica is not None and self._task is None:
+            self._task = asyncio.create_task(self._monitor())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.replica is not None:
+            await self.replica.close()
+
+    async def check_lag(self) -> Optional[float]:
+        """Seconds the replica is behind the primary's current position; None if unknown"""
+        try:
+            # Primary first: if the replica has replayed this position afterwards, it was caught up
+            primary_lsn = parse_lsn(await self.primary.fetchval(PRIMARY_WAL_LSN))
+            status = await self.replica.fetchrow(REPLICA_STATUS)
+        except Exception as e:
+            logger.warning(f"Replica lag check failed: {e}")
+            self.lag = None
+            replica_lag.set(-1)
+            return None
+
+        if not status["in_recovery"]:
+            # A plain instance standing in for the replica (e.g. local development)
+            self._replayed_lsn, self.lag = math.inf, 0.0
+            replica_lag_bytes.set(0)
+        else:
+            replayed = parse_lsn(status["replay_lsn"]) if status["replay_lsn"] else 0
+            self._replayed_lsn = replayed
+            replica_lag_bytes.set(max(primary_lsn - replayed, 0))
+            if replayed >= primary_lsn:
+                self.lag = 0.0
+            else:
+                # Age of the last replayed commit, on the replica's own clock; after an idle
+                # period this overstates the lag until the next check, which errs towards the primary
+                self.lag = max(status["replay_age"], 0.0) if status["replay_age"] is not None else math.inf
+        replica_lag.set(self.lag)
+        return self.lag
+
+    async def _monitor(self):
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(self.check_interval)
+
+    @property
+    def replica_usable(self) -> bool:
+        return self.replica is not None and self.lag is not None and self.lag <= self.max_lag
+
+    async def note_write(self, session_id: str):
+        """Remember the primary's WAL position after a session write; its reads stay on the primary until replayed"""
+        if self.replica is None:
+            return
+        try:
+            lsn = await self.primary.fetchval(PRIMARY_WAL_LSN)
+        except Exception as e:
+            logger.warning(f"Could not read WAL position after writing session {session_id}: {e}")
+            # Unknown position: pin the session to the primary for the whole window
+            lsn = "FFFFFFFF/FFFFFFFF"
+        try:
+            await self.redis.set(session_write_key(session_id), lsn, ex=max(int(self.max_lag) + 1, 1))
+        except Exception as e:
+            logger.warning(f"Could not record write position for session {session_id}: {e}")
+
+    async def reader(self, session_id: Optional[str] = None) -> Database:
+        """Database to use for a read-only query, optionally scoped to one session"""
+        if not self.replica_usable:
+            routed_reads.labels(target="primary", reason="replica_unavailable").inc()
+            return self.primary
+        if session_id is not None:
+            try:
+                written_lsn = await self.redis.get(session_write_key(session_id))
+            except Exception:
+                routed_reads.labels(target="primary", reason="write_unknown").inc()
+                return self.primary
+            if written_lsn is not None and parse_lsn(written_lsn.decode()) > self._replayed_lsn:
+                routed_reads.labels(target="primary", reason="read_your_writes").inc()
+                return self.primary
+        routed_reads.labels(target="replica", reason="ok").inc()
+        return self.replica
@@ -0,0 +1,178 @@
+"""
+Data access for wizard_sessions
+"""
+
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from app.repositories.database import Database, register_statement
+from app.utils.json_patch import apply_patch, parse_pointer
+
+SESSION_COLUMNS = "id, user_id, current_step, configuration, metadata, version, created_at, updated_at, completed_at"
+
+
+# Which store_configs column holds each wizard step in a full snapshot
+STEP_COLUMNS = {
+    "step_1": "business_info",
+    "step_2": "product_config",
+    "step_3": "theme_settings",
+    "step_4": "integrations",
+    "step_5": "content_data",
+    "step_6": "launch_config",
+}
+
+SNAPSHOT_STEP_COLUMNS = ", ".join(f"sc.{column}" for column in STEP_COLUMNS.values())
+
+# business_info is NOT NULL, so a snapshot taken before step 1 stores an empty object
+SNAPSHOT_INSERT = f"""
+    INSERT INTO store_configs (session_id, version, is_snapshot, {", ".join(STEP_COLUMNS.values())}, seo_config)
+    SELECT id, version, true,
+        COALESCE(configuration->'step_1', '{{}}'::jsonb),
+        {", ".join(f"configuration->'{step_key}'" for step_key in list(STEP_COLUMNS)[1:])},
+        COALESCE(configuration->'step_5'->'seo', '{{}}'::jsonb)
+    FROM wizard_sessions
+    WHERE id = $1
+"""
+
+DELTA_INSERT = """
+    INSERT INTO store_configs (session_id, version, is_snapshot, delta, business_info)
+    VALUES ($1, $2, false, $3::jsonb, '{}'::jsonb)
+"""
+
+CREATE_SESSION = register_statement("sessions.create", f"""
+    INSERT INTO wizard_sessions (user_id, metadata)
+    VALUES ($1, $2::jsonb)
+    RETURNING {SESSION_COLUMNS}
+""")
+GET_SESSION = register_statement(
+    "sessions.get", f"SELECT {SESSION_COLUMNS} FROM wizard_sessions WHERE id = $1"
+)
+GET_SESSION_VERSION = register_statement(
+    "sessions.get_version", "SELECT version FROM wizard_sessions WHERE id = $1"
+)
+# $6 is the patch with pointers already split into tokens (see apply_wizard_step_patch)
+SAVE_STEP = register_statement("sessions.save_step", f"""
+    UPDATE wizard_sessions
+    SET configuration = apply_wizard_step_patch(configuration, $2, $6::jsonb),
+        current_step = CASE
+            WHEN $3 THEN GREATEST(current_step, LEAST($4 + 1, 6))
+            ELSE current_step
+        END,
+        completed_at = CASE
+            WHEN $3 AND $4 = 6 THEN COALESCE(completed_at, NOW())
+            ELSE completed_at
+        END
+    WHERE id = $1 AND ($5::bigint IS NULL OR version = $5)
+    RETURNING {SESSION_COLUMNS}
+""")
+INSERT_SNAPSHOT = register_statement("store_configs.insert_snapshot", SNAPSHOT_INSERT)
+INSERT_DELTA = register_statement("store_configs.insert_delta", DELTA_INSERT)
+GET_HISTORY = register_statement("store_configs.history", f"""
+    WITH base AS (
+        SELECT COALESCE(MAX(version), 0) AS version
+        FROM store_configs
+        WHERE session_id = $1 AND is_snapshot AND version <= $2
+    )
+    SELECT sc.version, sc.is_snapshot, sc.delta, {SNAPSHOT_STEP_COLUMNS}
+    FROM store_configs sc, base
+    WHERE sc.session_id = $1 AND sc.version >= base.version AND sc.version <= $2
+    ORDER BY sc.version
+""")
+
+
+class VersionConflict(Exception):
+    """The session changed since the version the client last read"""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Session is at version {current_version}")
+        self.current_version = current_version
+
+
+def _row_to_session(row) -> Dict[str, Any]:
+    return {
+        "session_id": str(row["id"]),
+        "user_id": str(row["user_id"]),
+        "current_step": row["current_step"],
+        "configuration": row["configuration"],
+        "metadata": row["metadata"],
+        "version": row["version"],
+        "created_at": row["created_at"].isoformat(),
+        "updated_at": row["updated_at"].isoformat(),
+        "completed_at": row["completed_at"].isoformat() if row["completed_at"] else None,
+    }
+
+
+class SessionRepository:
+    """Reads and writes wizard sessions through the named-statement query layer"""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def create(self, user_id: UUID, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        row = await self.db.fetchrow(CREATE_SESSION, user_id, metadata)
+        return _row_to_session(row)
+
+    async def get(self, session_id: UUID) -> Optional[Dict[str, Any]]:
+        row = await self.db.fetchrow(GET_SESSION, session_id)
+        return _row_to_session(row) if row else None
+
+    async def save_step(
+        self,
+        session_id: UUID,
+        step_number: int,
+        operations: List[Dict[str, Any]],
+        auto_advance: bool,
+        expected_version: Optional[int] = None,
+        snapshot_interval: int = 10
+    ) -> Optional[Dict[str, Any]]:
+        """Apply a JSON patch to configuration["step_{n}"] in place and record it in store_configs
+
+        Raises VersionConflict when expected_version no longer matches the stored session.
+        """
+        step_key = f"step_{step_number}"
+        patch = [
+            {"op": operation["op"], "path": parse_pointer(operation["path"]), "value": operation.get("value")}
+            for operation in operations
+        ]
+        
+        async with self.db.transaction() as tx:
+            row = await tx.fetchrow(
+                SAVE_STEP, session_id, step_key, auto_advance, step_number, expected_version, patch
+            )
+            if row is None:
+                current_version = await tx.fetchval(GET_SESSION_VERSION, session_id)
+                if current_version is None:
+                    return None
+                raise VersionConflict(current_version)
+            
+            if row["version"] % snapshot_interval == 0:
+                await tx.execute(INSERT_SNAPSHOT, session_id)
+            else:
+                await tx.execute(
+                    INSERT_DELTA,
+                    session_id,
+                    row["version"],
+                    {"step": step_number, "ops": operations}
+                )
+        return _row_to_session(row)
+
+    async def get_configuration_at(self, session_id: UUID, version: int) -> Optional[Dict[str, Any]]:
+        """Rebuild the session configuration as of a version from the nearest snapshot plus deltas"""
+        rows = await self.db.fetch(GET_HISTORY, session_id, version)
+        if not rows or rows[-1]["version"] != version:
+            return None
+        
+        configuration: Dict[str, Any] = {}
+        for row in rows:
+            if row["is_snapshot"]:
+                configuration = {
+                    step_key: row[column]
+                    for step_key, column in STEP_COLUMNS.items()
+                    if row[column] is not None
+                }
+                continue
+            delta = row["delta"]
+            step_key = f"step_{delta['step']}"
+            configuration.setdefault(step_key, {})
+            configuration = apply_patch(configuration, delta["ops"], prefix=[step_key])
+        return configuration
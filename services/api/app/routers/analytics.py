@@ -1,8 +1,18 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
+from datetime import datetime, timedelta, timezone
+import base64
+import binascii
+import uuid
+import orjson
+
+from app.dependencies import get_analytics_repository
 
 router = APIRouter()
 
+# Longest event-count window, so a report cannot scan every partition
+MAX_EVENT_WINDOW = timedelta(days=31)
+
 @router.get("/predictions")
 async def get_predictions(store_id: Optional[str] = None):
     """Get performance predictions"""
@@ -39,4 +49,61 @@ async def get_insights(session_id: str):
             "Improve page load speed",
             "Optimize for mobile users"
         ]
-    } 
\ No newline at end of file
+    } 
+
+def _as_utc(value: datetime) -> datetime:
+    """Naive datetimes are taken to be UTC"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def _encode_cursor(updated_at: datetime, session_id) -> str:
+    # Opaque and URL-safe: a raw timestamp's "+00:00" turns into a space when passed back unencoded
+    raw = orjson.dumps([_as_utc(updated_at).isoformat(), str(session_id)])
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def _parse_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        updated_at, session_id = orjson.loads(raw)
+        return _as_utc(datetime.fromisoformat(updated_at)), uuid.UUID(session_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/sessions")
+async def list_session_summaries(limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None):
+    """List wizard session summaries, most recently updated first"""
+    repository = await get_analytics_repository()
+    sessions = await repository.list_session_summaries(limit, _parse_cursor(cursor) if cursor else None)
+    next_cursor = None
+    if len(sessions) == limit:
+        last = sessions[-1]
+        next_cursor = _encode_cursor(last["updated_at"], last["session_id"])
+    return {"sessions": sessions, "next_cursor": next_cursor}
+
+@router.get("/sessions/{session_id}/summary")
+async def get_session_summary(session_id: str):
+    """Get wizard session summary"""
+    try:
+        session_uuid = uuid.UUID(session_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    repository = await get_analytics_repository()
+    summary = await repository.get_session_summary(session_uuid)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return summary
+
+@router.get("/events")
+async def get_event_counts(start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Get wizard event counts for a time window (default: last 24 hours)"""
+    end = _as_utc(end) if end else datetime.now(timezone.utc)
+    start = _as_utc(start) if start else end - timedelta(days=1)
+    if start >= end or end - start > MAX_EVENT_WINDOW:
+        raise HTTPException(status_code=400, detail="Window must be positive and at most 31 days")
+    
+    repository = await get_analytics_repository()
+    return {
+        "start": start,
+        "end": end,
+        "events": await repository.event_counts(start, end)
+    }
@@ -1,6 +1,19 @@
-from fastapi import APIRouter
+import hashlib
+import logging
+from contextlib import AsyncExitStack
+
+import httpx
+import orjson
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, List, Optional
+
+from app.config import get_settings
+from app.dependencies import get_analytics_buffer, get_cache_manager, get_upstream_client
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -8,13 +21,204 @@ class ContentRequest(BaseModel):
     content_type: str
     inputs: Dict[str, Any]
     options: Dict[str, Any] = {}
+    session_id: Optional[str] = None
+
+# Options that control caching rather than what gets generated:
+#   cache: false               bypass the content cache entirely
+#   fresh_alternatives: true   generate anew and replace the cached entry
+CACHE_CONTROL_OPTIONS = {"cache", "fresh_alternatives"}
+
+def content_hash(request: ContentRequest) -> str:
+    """Canonical hash of everything that determines the generated content"""
+    spec = {
+        "content_type": request.content_type.strip().lower(),
+        "inputs": request.inputs,
+        "options": {key: value for key, value in request.options.items() if key not in CACHE_CONTROL_OPTIONS},
+    }
+    return hashlib.sha256(orjson.dumps(spec, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+def _llm_payload(request: ContentRequest) -> Dict[str, Any]:
+    # Cache-control options are passed on so the LLM service's semantic cache honours them too
+    return request.model_dump(exclude={"session_id"})
+
+async def _load_content(request: ContentRequest):
+    try:
+        client = await get_upstream_client("llm")
+        response = await client.post("/generate-content", json=_llm_payload(request), timeout=30.0)
+        
+        if response.status_code == 200:
+            return response.content
+        elif response.status_code < 500:
+            raise HTTPException(status_code=response.status_code, detail=f"LLM service error: {response.text[:200]}")
+        else:
+            raise HTTPException(status_code=502, detail="LLM service error")
+    
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=503, detail=f"LLM service unavailable: {str(e)}")
 
 @router.post("/generate")
-async def generate_content(request: ContentRequest):
-    """Generate AI content"""
-    return {
-        "content": f"Demo {request.content_type} content generated",
-        "alternatives": ["Alternative 1", "Alternative 2"],
-        "quality_score": 0.92,
-        "seo_keywords": ["keyword1", "keyword2"]
-    } 
\ No newline at end of file
+async def generate_content(request: ContentRequest, http_request: Request):
+    """Generate AI content (identical requests share one cached generation)"""
+    analytics = await get_analytics_buffer()
+    analytics.track("content_generated", request.session_id, {"content_type": request.content_type}, http_request)
+    
+    if request.options.get("cache", True) is False:
+        body = await _load_content(request)
+        return Response(content=body, media_type="application/json")
+    
+    settings = get_settings()
+    cache = await get_cache_manager()
+    entry = await cache.get_or_load(
+        f"wizard:content:{content_hash(request)}",
+        route="content_generate",
+        loader=lambda: _load_content(request),
+        ttl=settings.CONTENT_CACHE_TTL,
+        refresh=bool(request.options.get("fresh_alternatives")),
+        max_bytes=settings.CONTENT_CACHE_MAX_BYTES
+    )
+    return Response(content=entry.body, media_type="application/json")
+
+class _StreamedResult:
+    """Reassembles the final content from relayed NDJSON so it can be cached
+
+    result is set once the done line arrives; an error line, an unparseable
+    line or more than max_bytes of content gives up on caching.
+    """
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.result: Optional[Dict[str, Any]] = None
+        self.abandoned = False
+        self._pending = b""
+        self._parts: List[str] = []
+        self._size = 0
+    
+    def feed(self, chunk: bytes):
+        if self.abandoned or self.result is not None:
+            return
+        *lines, self._pending = (self._pending + chunk).split(b"\n")
+        for line in lines:
+            if line.strip():
+                self._line(line)
+        if len(self._pending) + self._size > self.max_bytes:
+            self.abandoned = True
+    
+    def _line(self, line: bytes):
+        try:
+            message = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            self.abandoned = True
+            return
+        kind = message.pop("type", None)
+        if kind == "delta":
+            text = message.get("text", "")
+            self._parts.append(text)
+            self._size += len(text)
+        elif kind == "done":
+            self.result = {"content": "".join(self._parts), **message}
+        elif kind != "start":
+            self.abandoned = True
+
+async def _relay(
+    upstream: httpx.Response,
+    stack: AsyncExitStack,
+    on_complete: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    max_bytes: int = 0
+) -> AsyncIterator[bytes]:
+    """Forward upstream bytes as they arrive; closing early (client gone) closes the upstream stream
+
+    When on_complete is given, a stream that ends with a done line is also
+    reassembled and handed to it (for the content cache).
+    """
+    collector = _StreamedResult(max_bytes) if on_complete is not None else None
+    ended_line = True
+    try:
+        async with stack:
+            async for chunk in upstream.aiter_raw():
+                ended_line = chunk.endswith(b"\n")
+                if collector is not None:
+                    collector.feed(chunk)
+                yield chunk
+        if collector is not None:
+            collector.feed(b"\n")
+            if collector.result is not None and not collector.abandoned:
+                await on_complete(collector.result)
+    except httpx.RequestError as e:
+        # Headers are already sent, so the failure is reported in-band as a final NDJSON line
+        logger.warning(f"LLM stream interrupted: {e}")
+        yield (b"" if ended_line else b"\n") + b'{"type":"error","message":"LLM stream interrupted"}\n'
+
+async def _replay_cached(body: bytes) -> AsyncIterator[bytes]:
+    result = orjson.loads(body)
+    content = result.pop("content", "")
+    yield b'{"type":"start"}\n'
+    yield orjson.dumps({"type": "delta", "text": content}) + b"\n"
+    yield orjson.dumps({"type": "done", **result}) + b"\n"
+
+@router.post("/generate/stream")
+async def generate_content_stream(request: ContentRequest, http_request: Request):
+    """Stream AI content from the LLM service as NDJSON (start, delta..., done)"""
+    settings = get_settings()
+    if request.options.get("cache", True) is not False and not request.options.get("fresh_alternatives"):
+        cache = await get_cache_manager()
+        entry = await cache.get(f"wizard:content:{content_hash(request)}", route="content_generate_stream")
+        if entry is not None:
+            # Already generated: replay it in the streaming format rather than generating again
+            return StreamingResponse(_replay_cached(entry.body), media_type="application/x-ndjson")
+    
+    client = await get_upstream_client("llm")
+    stack = AsyncExitStack()
+    try:
+        upstream = await stack.enter_async_context(client.stream(
+            "POST",
+            "/generate-content/stream",
+            json=_llm_payload(request),
+            timeout=httpx.Timeout(settings.UPSTREAM_TIMEOUT, read=settings.LLM_STREAM_IDLE_TIMEOUT)
+        ))
+        if upstream.status_code != 200:
+            await upstream.aread()
+            raise HTTPException(
+                status_code=upstream.status_code if upstream.status_code < 500 else 502,
+                detail=f"LLM service error: {upstream.text[:200]}"
+            )
+        
+        analytics = await get_analytics_buffer()
+        analytics.track(
+            "content_generated", request.session_id,
+            {"content_type": request.content_type, "streamed": True}, http_request
+        )
+    except httpx.RequestError as e:
+        await stack.aclose()
+        raise HTTPException(status_code=503, detail=f"LLM service unavailable: {str(e)}")
+    except BaseException:
+        await stack.aclose()
+        raise
+    
+    # Raw bytes are relayed as-is, so any upstream content encoding must be passed on too
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    on_complete = None
+    if "content-encoding" in upstream.headers:
+        headers["Content-Encoding"] = upstream.headers["content-encoding"]
+    elif request.options.get("cache", True) is not False:
+        # Store the finished generation so later requests (streamed or not) reuse it
+        key = content_hash(request)
+        
+        async def _cache_result(result: Dict[str, Any]):
+            try:
+                cache = await get_cache_manager()
+                await cache.put(
+                    f"wizard:content:{key}", "content_generate_stream", orjson.dumps(result),
+                    ttl=settings.CONTENT_CACHE_TTL, max_bytes=settings.CONTENT_CACHE_MAX_BYTES
+                )
+            except Exception as e:
+                logger.warning(f"Could not cache streamed content: {e}")
+        
+        on_complete = _cache_result
+    # The relay closes the stack when it finishes; the background task also covers a client
+    # that disconnects before the relay starts, when the generator's own cleanup never runs
+    return StreamingResponse(
+        _relay(upstream, stack, on_complete, settings.CONTENT_CACHE_MAX_BYTES),
+        media_type=upstream.headers.get("content-type", "application/x-ndjson"),
+        headers=headers,
+        background=BackgroundTask(stack.aclose)
+    )
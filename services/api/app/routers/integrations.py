@@ -1,18 +1,29 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import httpx
 
+from app.dependencies import get_analytics_buffer, get_cache_manager, get_upstream_client
+from app.services.cache import cached_json_response
+
 router = APIRouter()
 
 class IntegrationConfig(BaseModel):
     integration_type: str
     provider: str
     configuration: Dict[str, Any]
+    session_id: Optional[str] = None
 
 @router.post("/setup")
-async def setup_integration(config: IntegrationConfig):
+async def setup_integration(config: IntegrationConfig, request: Request):
     """Setup third-party integration"""
+    analytics = await get_analytics_buffer()
+    analytics.track(
+        "integration_added",
+        config.session_id,
+        {"integration_type": config.integration_type, "provider": config.provider},
+        request
+    )
     return {
         "status": "configured",
         "integration_id": "int_123456",
@@ -31,20 +42,31 @@ async def get_integration_status(integration_id: str):
     }
 
 @router.get("/platforms")
-async def get_available_platforms():
+async def get_available_platforms(request: Request):
     """Get available e-commerce platforms"""
+    cache = await get_cache_manager()
+    return await cached_json_response(
+        request,
+        cache,
+        key="wizard:platforms",
+        route="integrations_platforms",
+        loader=_load_platforms
+    )
+
+async def _load_platforms():
     try:
         # Forward request to integration service
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "http://integration:9024/platforms",
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(status_code=500, detail="Integration service error")
+        client = await get_upstream_client("integration")
+        response = await client.get(
+            "/platforms",
+            timeout=10.0,
+            hedge=True
+        )
+        
+        if response.status_code == 200:
+            return response.content
+        else:
+            raise HTTPException(status_code=500, detail="Integration service error")
                 
     except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail=f"Integration service unavailable: {str(e)}")
@@ -52,20 +74,31 @@ async def get_available_platforms():
         raise HTTPException(status_code=500, detail=f"Failed to get platforms: {str(e)}")
 
 @router.get("/integrations/{platform_id}")
-async def get_platform_integrations(platform_id: str):
+async def get_platform_integrations(request: Request, platform_id: str):
     """Get available integrations for a platform"""
+    cache = await get_cache_manager()
+    return await cached_json_response(
+        request,
+        cache,
+        key=f"wizard:integrations:{platform_id}",
+        route="integrations_platform",
+        loader=lambda: _load_platform_integrations(platform_id)
+    )
+
+async def _load_platform_integrations(platform_id: str):
     try:
         # Forward request to integration service
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"http://integration:9024/integrations/{platform_id}",
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(status_code=500, detail="Integration service error")
+        client = await get_upstream_client("integration")
+        response = await client.get(
+            f"/integrations/{platform_id}",
+            timeout=10.0,
+            hedge=True
+        )
+        
+        if response.status_code == 200:
+            return response.content
+        else:
+            raise HTTPException(status_code=500, detail="Integration service error")
                 
     except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail=f"Integration service unavailable: {str(e)}")
@@ -1,14 +1,28 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
 from typing import Optional
 
+from app.dependencies import get_cache_manager
+from app.services.cache import cached_json_response
+
 router = APIRouter()
 
 @router.get("/recommendations")
 async def get_theme_recommendations(
+    request: Request,
     industry: Optional[str] = Query(None),
     style: Optional[str] = Query(None)
 ):
     """Get theme recommendations"""
+    cache = await get_cache_manager()
+    return await cached_json_response(
+        request,
+        cache,
+        key=f"wizard:themes:{(industry or 'any').lower()}:{(style or 'any').lower()}",
+        route="themes_recommendations",
+        loader=lambda: _load_theme_recommendations(industry, style)
+    )
+
+async def _load_theme_recommendations(industry: Optional[str], style: Optional[str]):
     return {
         "themes": [
             {
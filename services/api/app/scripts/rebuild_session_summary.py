@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Recompute the wizard_session_summary rollup from its source tables.
+The triggers keep it current; this is for backfills or after manual repairs.
+
+Usage (from services/api, or inside the api container):
+    python -m app.scripts.rebuild_session_summary
+"""
+
+import asyncio
+import time
+
+import asyncpg
+
+from app.config import get_settings
+
+
+async def rebuild() -> int:
+    conn = await asyncpg.connect(get_settings().DATABASE_URL)
+    try:
+        async with conn.transaction():
+            return await conn.fetchval("SELECT rebuild_wizard_session_summary()")
+    finally:
+        await conn.close()
+
+
+def main():
+    started = time.perf_counter()
+    rebuilt = asyncio.run(rebuild())
+    print(f"Rebuilt wizard_session_summary: {rebuilt} sessions in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+Batched ingestion of wizard events into wizard_analytics
+Request handlers call track(), which only appends to an in-process buffer and
+never waits on I/O. A background flusher COPYs the buffer into Postgres once it
+reaches ANALYTICS_BATCH_SIZE events or every ANALYTICS_FLUSH_INTERVAL seconds.
+Batches that fail to write are spilled to a Redis Stream and replayed once the
+database is reachable again, so delivery is at-least-once. Spilled entries that
+cannot be decoded, or that still fail on their own once a batch has been
+delivered ANALYTICS_REPLAY_MAX_DELIVERIES times, are moved to a dead stream so
+they cannot block the replay forever.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import asyncpg
+import orjson
+from fastapi import Request
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.config import Settings
+from app.repositories.database import Database, register_statement
+from app.utils.client_ip import Network, client_address, parse_networks
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = {
+    "step_started", "step_completed", "content_generated",
+    "theme_selected", "integration_added", "wizard_completed",
+    "error_occurred", "user_feedback",
+}
+
+COLUMNS = ["session_id", "event_type", "event_data", "user_agent", "ip_address", "timestamp"]
+
+STREAM_GROUP = "analytics-flusher"
+
+# Failures that say nothing about the events themselves; they never dead-letter an entry
+UNAVAILABLE_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.InterfaceError,
+    asyncpg.CannotConnectNowError,
+    asyncpg.InsufficientResourcesError,
+)
+
+# Events are COPYed into a per-connection staging table first so that an event
+# for a deleted session is discarded instead of failing the whole batch on the FK
+CREATE_STAGING = register_statement("analytics.create_staging", """
+    CREATE TEMP TABLE IF NOT EXISTS wizard_analytics_staging (
+        session_id UUID,
+        event_type VARCHAR(50),
+        event_data JSONB,
+        user_agent TEXT,
+        ip_address INET,
+        timestamp TIMESTAMP WITH TIME ZONE
+    ) ON COMMIT DELETE ROWS
+""")
+
+INSERT_FROM_STAGING = register_statement("analytics.insert_from_staging", f"""
+    INSERT INTO wizard_analytics ({", ".join(COLUMNS)})
+    SELECT {", ".join(f"s.{column}" for column in COLUMNS)}
+    FROM wizard_analytics_staging s
+    WHERE s.session_id IS NULL
+       OR EXISTS (SELECT 1 FROM wizard_sessions ws WHERE ws.id = s.session_id)
+""")
+
+events_buffered = Gauge(
+    "analytics_buffer_events", "Analytics events waiting in the in-process buffer"
+)
+events_written = Counter(
+    "analytics_events_written_total", "Analytics events written to wizard_analytics", ["source"]
+)
+events_spilled = Counter(
+    "analytics_events_spilled_total", "Analytics events spilled to the Redis Stream"
+)
+events_dropped = Counter(
+    "analytics_events_dropped_total", "Analytics events that were never written", ["reason"]
+)
+ingestion_lag = Histogram(
+    "analytics_ingestion_lag_seconds",
+    "Time from track() to the event being committed",
+    ["source"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900),
+)
+stream_backlog = Gauge(
+    "analytics_stream_backlog_events", "Spilled analytics events waiting in the Redis Stream"
+)
+
+
+def _client_ip(request: Request, trusted_proxies: List[Network]) -> Optional[str]:
+    peer = request.client.host if request.client else None
+    return client_address(peer, request.headers.get("x-forwarded-for"), trusted_proxies)
+
+
+def _decode_spilled(fields: Dict[bytes, bytes]) -> Dict[str, Any]:
+    event = orjson.loads(fields[b"event"])
+    event["session_id"] = _session_uuid(event["session_id"])
+    event["timestamp"] = datetime.fromisoformat(event["timestamp"])
+    return event
+
+
+def _session_uuid(session_id: Any) -> Optional[UUID]:
+    if session_id is None or isinstance(session_id, UUID):
+        return session_id
+    try:
+        return UUID(str(session_id))
+    except ValueError:
+        return None
+
+
+class AnalyticsEventBuffer:
+    """Buffers wizard events in memory and flushes them to Postgres in batches"""
+
+    def __init__(self, db: Database, redis_client, settings: Settings):
+        self.db = db
+        self.redis = redis_client
+        self.enabled = settings.ANALYTICS_ENABLED
+        self.batch_size = settings.ANALYTICS_BATCH_SIZE
+        self.flush_interval = settings.ANALYTICS_FLUSH_INTERVAL
+        self.max_buffer = settings.ANALYTICS_BUFFER_MAXSIZE
+        self.stream_key = settings.ANALYTICS_STREAM_KEY
+        self.stream_maxlen = settings.ANALYTICS_STREAM_MAXLEN
+        self.replay_interval = settings.ANALYTICS_REPLAY_INTERVAL
+        self.claim_idle_ms = int(settings.ANALYTICS_REPLAY_CLAIM_IDLE * 1000)
+        self.max_deliveries = settings.ANALYTICS_REPLAY_MAX_DELIVERIES
+        self.dead_stream_key = settings.ANALYTICS_DEAD_STREAM_KEY
+        self.trusted_proxies = parse_networks(settings.TRUSTED_PROXIES) if settings.RATE_LIMIT_TRUST_FORWARDED else []
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._group_ready = False
+        self._last_replay = 0.0
+
+    def track(
+        self,
+        event_type: str,
+        session_id: Any = None,
+        event_data: Optional[Dict[str, Any]] = None,
+        request: Optional[Request] = None
+    ):
+        """Queue an event; never blocks and never raises into the request"""
+        if not self.enabled:
+            return
+        if event_type not in EVENT_TYPES:
+            logger.warning(f"Ignoring unknown analytics event type {event_type}")
+            events_dropped.labels(reason="invalid").inc()
+            return
+        if len(self._buffer) >= self.max_buffer:
+            events_dropped.labels(reason="buffer_full").inc()
+            return
+
+        self._buffer.append({
+            "session_id": _session_uuid(session_id),
+            "event_type": event_type,
+            "event_data": event_data or {},
+            "user_agent": request.headers.get("user-agent") if request else None,
+            "ip_address": _client_ip(request, self.trusted_proxies) if request else None,
+            "timestamp": datetime.now(timezone.utc),
+            "tracked_at": time.monotonic(),
+        })
+        events_buffered.set(len(self._buffer))
+        if len(self._buffer) >= self.batch_size:
+            self._batch_ready.set()
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the flusher and write whatever is still buffered"""
+        self._closing = True
+        self._batch_ready.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            try:
+                await self.flush()
+                if time.monotonic() - self._last_replay >= self.replay_interval:
+                    self._last_replay = time.monotonic()
+                    await self.replay()
+            except Exception as e:
+                logger.error(f"Analytics flush loop error: {e}")
+        await self.flush()
+
+    async def flush(self):
+        """Write the buffer in batches, spilling failed batches to Redis"""
+        while self._buffer:
+            batch = self._buffer[:self.batch_size]
+            del self._buffer[:self.batch_size]
+            events_buffered.set(len(self._buffer))
+            try:
+                await self._write(batch)
+            except Exception as e:
+                logger.warning(f"Analytics batch of {len(batch)} failed, spilling to Redis: {e}")
+                await self._spill(batch)
+                return
+            self._observe(batch, "buffer")
+
+    async def _write(self, events: List[Dict[str, Any]]) -> int:
+        records = [
+            (
+                event["session_id"],
+                event["event_type"],
+                event["event_data"],
+                event["user_agent"],
+                event["ip_address"],
+                event["timestamp"],
+            )
+            for event in events
+        ]
+        async with self.db.transaction() as tx:
+            await tx.execute(CREATE_STAGING)
+            await tx.connection.copy_records_to_table(
+                "wizard_analytics_staging", records=records, columns=COLUMNS
+            )
+            status = await tx.execute(INSERT_FROM_STAGING)
+
+        written = int(status.split()[-1])
+        if written < len(events):
+            events_dropped.labels(reason="unknown_session").inc(len(events) - written)
+        return written
+
+    def _observe(self, events: List[Dict[str, Any]], source: str):
+        now = time.monotonic()
+        wall_now = time.time()
+        for event in events:
+            if "tracked_at" in event:
+                ingestion_lag.labels(source=source).observe(now - event["tracked_at"])
+            else:
+                ingestion_lag.labels(source=source).observe(wall_now - event["timestamp"].timestamp())
+        events_written.labels(source=source).inc(len(events))
+
+    async def _spill(self, events: List[Dict[str, Any]]):
+        # Anything still buffered would most likely fail the same way
+        events = events + self._buffer
+        self._buffer.clear()
+        events_buffered.set(0)
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for event in events:
+                payload = {key: value for key, value in event.items() if key != "tracked_at"}
+                pipe.xadd(
+                    self.stream_key,
+                    {"event": orjson.dumps(payload)},
+                    maxlen=self.stream_maxlen,
+                    approximate=True
+                )
+            await pipe.execute()
+            events_spilled.inc(len(events))
+        except Exception as e:
+            logger.error(f"Dropping {len(events)} analytics events, Redis spill failed: {e}")
+            events_dropped.labels(reason="spill_failed").inc(len(events))
+
+    async def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            await self.redis.xgroup_create(self.stream_key, STREAM_GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def _read_group(self, start_id: str) -> list:
+        response = await self.redis.xreadgroup(
+            STREAM_GROUP, self.consumer, {self.stream_key: start_id}, count=self.batch_size
+        )
+        return [(entry_id, fields) for entry_id, fields in response[0][1] if fields] if response else []
+
+    async def replay(self, max_batches: int = 10):
+        """Move spilled events from the Redis Stream into Postgres"""
+        for _ in range(max_batches):
+            if not await self._replay_batch():
+                return
+
+    async def _replay_batch(self) -> bool:
+        try:
+            backlog = await self.redis.xlen(self.stream_key)
+            stream_backlog.set(backlog)
+            if not backlog:
+                return False
+            await self._ensure_group()
+
+            # Retry our own failed batches first, then take over batches left
+            # pending by a crashed flusher, then read new entries
+            entries = await self._read_group("0")
+            if not entries:
+                _, claimed, *_ = await self.redis.xautoclaim(
+                    self.stream_key, STREAM_GROUP, self.consumer,
+                    min_idle_time=self.claim_idle_ms, start_id="0-0", count=self.batch_size
+                )
+                entries = [(entry_id, fields) for entry_id, fields in claimed if fields]
+            if not entries:
+                entries = await self._read_group(">")
+        except Exception as e:
+            logger.warning(f"Analytics stream replay unavailable: {e}")
+            return False
+        if not entries:
+            return False
+
+        decoded = []
+        for entry_id, fields in entries:
+            try:
+                decoded.append((entry_id, _decode_spilled(fields)))
+            except (KeyError, TypeError, ValueError) as e:
+                # Retrying cannot fix a malformed entry
+                await self._dead_letter(entry_id, fields, f"undecodable: {e}")
+
+        events = [event for _, event in decoded]
+        try:
+            if events:
+                await self._write(events)
+        except Exception as e:
+            # Left pending in the group and retried on the next pass, until the batch has
+            # been delivered too often to be a passing problem
+            logger.warning(f"Analytics stream replay of {len(events)} events failed: {e}")
+            if isinstance(e, UNAVAILABLE_ERRORS) or await self._max_deliveries(decoded) < self.max_deliveries:
+                return False
+            decoded = await self._isolate_poison(decoded, dict(entries))
+            events = [event for _, event in decoded]
+
+        await self._settle([entry_id for entry_id, _ in decoded])
+        self._observe(events, "stream")
+        stream_backlog.set(max(backlog - len(entries), 0))
+        return True
+
+    async def _settle(self, entry_ids: List[bytes]):
+        if entry_ids:
+            await self.redis.xack(self.stream_key, STREAM_GROUP, *entry_ids)
+            await self.redis.xdel(self.stream_key, *entry_ids)
+
+    async def _max_deliveries(self, entries: list) -> int:
+        """Highest delivery count among our pending entries (given in stream order)"""
+        pending = await self.redis.xpending_range(
+            self.stream_key, STREAM_GROUP, min=entries[0][0], max=entries[-1][0],
+            count=len(entries), consumername=self.consumer
+        )
+        return max((entry["times_delivered"] for entry in pending), default=0)
+
+    async def _isolate_poison(self, decoded: list, fields_by_id: Dict[bytes, Any]) -> list:
+        """Write events one at a time, dead-lettering the ones that fail; returns those written
+
+        Stops at the first failure that looks like an outage, leaving the rest pending.
+        """
+        written = []
+        for entry_id, event in decoded:
+            try:
+                await self._write([event])
+            except UNAVAILABLE_ERRORS as e:
+                logger.warning(f"Analytics stream replay interrupted: {e}")
+                break
+            except Exception as e:
+                await self._dead_letter(entry_id, fields_by_id[entry_id], str(e))
+            else:
+                written.append((entry_id, event))
+        return written
+
+    async def _dead_letter(self, entry_id: bytes, fields: Dict[bytes, Any], error: str):
+        """Move an entry to the dead stream for inspection; it is no longer replayed"""
+        logger.error(f"Moving analytics stream entry {entry_id!r} to {self.dead_stream_key}: {error}")
+        await self.redis.xadd(
+            self.dead_stream_key,
+            {**fields, b"source_id": entry_id, b"error": error[:500]},
+            maxlen=self.stream_maxlen,
+            approximate=True
+        )
+        await self._settle([entry_id])
+        events_dropped.labels(reason="dead_lettered").inc()
@@ -0,0 +1,197 @@
+"""
+Two-tier response cache for gateway read routes
+L1 is an in-process TTL/LRU map, L2 is Redis shared by all replicas. Misses are
+single-flighted so a cold key triggers one upstream load per replica.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import orjson
+from fastapi import Request, Response
+from prometheus_client import Counter
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+cache_requests = Counter(
+    "gateway_cache_requests_total", "Response cache lookups", ["route", "result"]
+)
+cache_evictions = Counter(
+    "gateway_cache_evictions_total", "Response cache L1 evictions", ["route"]
+)
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    route: str
+    expires_at: float = 0.0
+
+    @classmethod
+    def from_body(cls, body: bytes, route: str) -> "CachedResponse":
+        return cls(body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"', route=route)
+
+
+class CacheManager:
+    """Memory (L1) + Redis (L2) cache of serialized JSON responses"""
+
+    def __init__(self, redis_client, settings: Settings):
+        self.redis = redis_client
+        self.memory_maxsize = settings.CACHE_MEMORY_MAXSIZE
+        self.memory_ttl = settings.CACHE_MEMORY_TTL
+        self.redis_ttl = settings.CACHE_REDIS_TTL
+        self._memory: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _memory_get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._memory[key]
+            cache_evictions.labels(route=entry.route).inc()
+            return None
+        self._memory.move_to_end(key)
+        return entry
+
+    def _memory_set(self, key: str, entry: CachedResponse):
+        entry.expires_at = time.monotonic() + self.memory_ttl
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_maxsize:
+            _, evicted = self._memory.popitem(last=False)
+            cache_evictions.labels(route=evicted.route).inc()
+
+    async def _redis_get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.redis.get(key)
+        except Exception as e:
+            logger.warning(f"Redis cache read failed for {key}: {e}")
+            return None
+
+    async def _redis_set(self, key: str, body: bytes, ttl: int):
+        try:
+            await self.redis.set(key, body, ex=ttl)
+        except Exception as e:
+            logger.warning(f"Redis cache write failed for {key}: {e}")
+
+    async def _load(
+        self,
+        key: str,
+        route: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        refresh: bool = False,
+        max_bytes: Optional[int] = None
+    ) -> CachedResponse:
+        body = None if refresh else await self._redis_get(key)
+        if body is not None:
+            cache_requests.labels(route=route, result="hit_redis").inc()
+            entry = CachedResponse.from_body(body, route)
+        else:
+            cache_requests.labels(route=route, result="miss").inc()
+            data = await loader()
+            # Loaders may hand back the upstream body untouched
+            body = data if isinstance(data, bytes) else orjson.dumps(data)
+            return await self.put(key, route, body, ttl, max_bytes)
+        self._memory_set(key, entry)
+        return entry
+
+    async def get_or_load(
+        self,
+        key: str,
+        route: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        refresh: bool = False,
+        max_bytes: Optional[int] = None
+    ) -> CachedResponse:
+        """Return the cached response for key, loading it once on a miss
+
+        refresh skips the cached copy and stores a new one (concurrent callers
+        still share the load); bodies over max_bytes are returned but not cached.
+        """
+        if not refresh:
+            entry = self._memory_get(key)
+            if entry is not None:
+                cache_requests.labels(route=route, result="hit_memory").inc()
+                return entry
+        
+        # A refresh must not be answered by an ordinary load that may return the cached copy
+        inflight_key = f"{key}#refresh" if refresh else key
+        inflight = self._inflight.get(inflight_key)
+        if inflight is not None:
+            cache_requests.labels(route=route, result="coalesced").inc()
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.ensure_future(
+            self._load(key, route, loader, ttl or self.redis_ttl, refresh=refresh, max_bytes=max_bytes)
+        )
+        self._inflight[inflight_key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+        return await asyncio.shield(future)
+
+    async def put(
+        self,
+        key: str,
+        route: str,
+        body: bytes,
+        ttl: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> CachedResponse:
+        """Store a body produced outside get_or_load (e.g. assembled from a stream)"""
+        entry = CachedResponse.from_body(body, route)
+        if max_bytes is not None and len(body) > max_bytes:
+            cache_requests.labels(route=route, result="too_large").inc()
+            return entry
+        await self._redis_set(key, entry.body, ttl or self.redis_ttl)
+        self._memory_set(key, entry)
+        return entry
+
+    async def get(self, key: str, route: str) -> Optional[CachedResponse]:
+        """Cached response for key if there is one; never loads"""
+        entry = self._memory_get(key)
+        if entry is not None:
+            cache_requests.labels(route=route, result="hit_memory").inc()
+            return entry
+        body = await self._redis_get(key)
+        if body is None:
+            cache_requests.labels(route=route, result="miss").inc()
+            return None
+        cache_requests.labels(route=route, result="hit_redis").inc()
+        entry = CachedResponse.from_body(body, route)
+        self._memory_set(key, entry)
+        return entry
+
+    async def invalidate(self, key: str):
+        self._memory.pop(key, None)
+        try:
+            await self.redis.delete(key)
+        except Exception as e:
+            logger.warning(f"Redis cache delete failed for {key}: {e}")
+
+
+async def cached_json_response(
+    request: Request,
+    cache: CacheManager,
+    key: str,
+    route: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: Optional[int] = None
+) -> Response:
+    """Serve a cached JSON body with an ETag, answering 304 when If-None-Match matches"""
+    entry = await cache.get_or_load(key, route, loader, ttl)
+    headers = {"ETag": entry.etag, "Cache-Control": f"private, max-age={cache.memory_ttl}"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and entry.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,181 @@
+"""
+Deployment status push
+The worker publishes each deployment stage to the Redis channel
+wizard:deployment:{id}:events and keeps the latest one in
+wizard:deployment:{id}:state. Each API replica holds a single pattern
+subscription and fans events out to its SSE/WebSocket listeners, so open
+status streams cost no Redis connections and no upstream polling.
+
+Every listener has a small bounded queue. Status is latest-wins, so when a
+slow client falls behind the oldest queued event is dropped rather than
+blocking the fan-out for everyone else.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Set
+
+import orjson
+from prometheus_client import Counter, Gauge
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PATTERN = "wizard:deployment:*:events"
+TERMINAL_STATUSES = {"completed", "failed"}
+
+deployment_listeners = Gauge(
+    "deployment_status_listeners", "Open deployment status streams on this replica"
+)
+deployment_events_published = Counter(
+    "deployment_status_events_published_total", "Deployment status events published", ["status"]
+)
+deployment_events_dropped = Counter(
+    "deployment_status_events_dropped_total", "Events dropped for listeners that fell behind"
+)
+
+
+def deployment_channel(deployment_id: str) -> str:
+    return f"wizard:deployment:{deployment_id}:events"
+
+
+def deployment_state_key(deployment_id: str) -> str:
+    return f"wizard:deployment:{deployment_id}:state"
+
+
+def deployment_event(
+    deployment_id: str,
+    status: str,
+    progress: int,
+    message: str,
+    store_id: Optional[str] = None,
+    store_url: Optional[str] = None,
+    **extra: Any
+) -> Dict[str, Any]:
+    """Status event in the same shape as GET /launch/status"""
+    return {
+        "deployment_id": deployment_id,
+        "status": status,
+        "progress": progress,
+        "store_id": store_id,
+        "store_url": store_url,
+        "message": message,
+        "updated_at": time.time(),
+        **extra,
+    }
+
+
+async def publish_deployment_event(redis_client, event: Dict[str, Any], ttl: int):
+    """Store the event as the deployment's current state and push it to listeners"""
+    deployment_id = event["deployment_id"]
+    data = orjson.dumps(event)
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.set(deployment_state_key(deployment_id), data, ex=ttl)
+    pipe.publish(deployment_channel(deployment_id), data)
+    await pipe.execute()
+    deployment_events_published.labels(status=event["status"]).inc()
+
+
+async def get_deployment_state(redis_client, deployment_id: str) -> Optional[Dict[str, Any]]:
+    data = await redis_client.get(deployment_state_key(deployment_id))
+    return orjson.loads(data) if data else None
+
+
+class DeploymentListener:
+    """One open status stream: a bounded, latest-wins event queue"""
+
+    def __init__(self, deployment_id: str, maxsize: int):
+        self.deployment_id = deployment_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, event: Dict[str, Any]):
+        if self.queue.full():
+            self.queue.get_nowait()
+            deployment_events_dropped.inc()
+        self.queue.put_nowait(event)
+
+    async def next_event(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event, or None if nothing arrived within timeout (time for a heartbeat)"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class DeploymentEventHub:
+    """Fans deployment events from one Redis pattern subscription out to local listeners"""
+
+    def __init__(self, redis_client, settings: Settings):
+        self.redis = redis_client
+        self.queue_size = settings.DEPLOYMENT_EVENTS_QUEUE_SIZE
+        self.reconnect_delay = 1.0
+        self._listeners: Dict[str, Set[DeploymentListener]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self, deployment_id: str) -> DeploymentListener:
+        listener = DeploymentListener(deployment_id, self.queue_size)
+        self._listeners.setdefault(deployment_id, set()).add(listener)
+        deployment_listeners.inc()
+        return listener
+
+    def unsubscribe(self, listener: DeploymentListener):
+        listeners = self._listeners.get(listener.deployment_id)
+        if listeners is not None and listener in listeners:
+            listeners.discard(listener)
+            deployment_listeners.dec()
+            if not listeners:
+                del self._listeners[listener.deployment_id]
+
+    def _dispatch(self, deployment_id: str, event: Dict[str, Any]):
+        for listener in self._listeners.get(deployment_id, ()):
+            listener.offer(event)
+
+    async def _resync(self):
+        """Re-send current state after a reconnect, in case events were published meanwhile"""
+        for deployment_id in list(self._listeners):
+            state = await get_deployment_state(self.redis, deployment_id)
+            if state is not None:
+                self._dispatch(deployment_id, state)
+
+    async def _run(self):
+        resync = False
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.psubscribe(CHANNEL_PATTERN)
+                if resync:
+                    await self._resync()
+                resync = True
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+                    if message is None or message["type"] != "pmessage":
+                        continue
+                    # wizard:deployment:{id}:events
+                    deployment_id = message["channel"].decode()[len("wizard:deployment:"):-len(":events")]
+                    if deployment_id in self._listeners:
+                        self._dispatch(deployment_id, orjson.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Deployment event subscription lost, reconnecting: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
@@ -0,0 +1,117 @@
+"""
+Dependency health checks for the readiness probe
+All checks run concurrently with their own timeout, and the combined result is
+cached for a short window so frequent probes do not hammer the dependencies.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import Settings
+from app.dependencies import get_database, get_database_router, get_redis_client, get_upstream_clients
+from app.repositories.database import HEALTH_PING
+
+
+class HealthChecker:
+    """Runs DB, Redis and upstream /health checks and caches the report"""
+
+    def __init__(self, settings: Settings):
+        self.cache_ttl = settings.HEALTH_CACHE_TTL
+        self.timeout = settings.HEALTH_CHECK_TIMEOUT
+        self.critical = set(settings.HEALTH_CRITICAL_CHECKS)
+        self.replica_configured = bool(settings.DATABASE_REPLICA_URL)
+        self._report: Optional[Dict[str, Any]] = None
+        self._expires_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+
+    async def _check_database(self):
+        db = await get_database()
+        await db.execute(HEALTH_PING)
+
+    async def _check_replica(self):
+        databases = await get_database_router()
+        lag = await databases.check_lag()
+        if lag is None:
+            raise RuntimeError("replica unreachable")
+        if lag > databases.max_lag:
+            raise RuntimeError(f"replica lag {lag:.1f}s exceeds {databases.max_lag}s")
+
+    async def _check_redis(self):
+        redis = await get_redis_client()
+        await redis.ping()
+
+    def _check_upstream(self, name: str) -> Callable[[], Awaitable[None]]:
+        async def check():
+            upstreams = await get_upstream_clients()
+            # Probe the raw pool so health traffic does not count against the breaker
+            response = await upstreams.get(name).client.get("/health", timeout=self.timeout)
+            response.raise_for_status()
+        return check
+
+    async def _run(self, check: Callable[[], Awaitable[None]]) -> str:
+        try:
+            await asyncio.wait_for(check(), timeout=self.timeout)
+            return "healthy"
+        except asyncio.TimeoutError:
+            return f"unhealthy: timed out after {self.timeout}s"
+        except Exception as e:
+            return f"unhealthy: {str(e)}"
+
+    def _failed(self, error: Exception) -> Callable[[], Awaitable[None]]:
+        async def check():
+            raise error
+        return check
+
+    async def _collect(self) -> Dict[str, Any]:
+        checks = {
+            "database": self._check_database,
+            "redis": self._check_redis,
+        }
+        if self.replica_configured:
+            checks["database_replica"] = self._check_replica
+        upstreams = None
+        try:
+            upstreams = await get_upstream_clients()
+        except Exception as e:
+            # Reported like any other failed check instead of failing the probe itself
+            checks["upstreams"] = self._failed(e)
+        else:
+            for name in upstreams.base_urls():
+                checks[f"{name}_service"] = self._check_upstream(name)
+        
+        results = await asyncio.gather(*(self._run(check) for check in checks.values()))
+        statuses = dict(zip(checks, results))
+        
+        critical_ok = all(statuses[name] == "healthy" for name in statuses if name in self.critical)
+        all_ok = all(result == "healthy" for result in results)
+        return {
+            "status": "healthy" if all_ok else ("degraded" if critical_ok else "unhealthy"),
+            "ready": critical_ok,
+            "checks": statuses,
+            "circuits": upstreams.circuit_states() if upstreams is not None else {},
+            "checked_at": time.time(),
+        }
+
+    async def readiness(self) -> Dict[str, Any]:
+        """Cached report; concurrent callers share a single refresh"""
+        if self._report is not None and time.monotonic() < self._expires_at:
+            return self._report
+        
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.ensure_future(self._collect())
+        try:
+            report = await asyncio.shield(self._refresh)
+        except Exception as e:
+            # Not cached: the next probe tries again
+            return {
+                "status": "unhealthy",
+                "ready": False,
+                "checks": {"health_checker": f"unhealthy: {str(e)}"},
+                "circuits": {},
+                "checked_at": time.time(),
+            }
+        
+        self._report = report
+        self._expires_at = time.monotonic() + self.cache_ttl
+        return report
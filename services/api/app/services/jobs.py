@@ -0,0 +1,336 @@
+"""
+Background jobs on Redis Streams
+The gateway enqueues a job and returns immediately; `python -m app.worker`
+consumes jobs:{job_type} through a consumer group. Job state lives in the hash
+job:{job_id}, so a job id doubles as an idempotency key: enqueueing an id that
+already exists returns the existing job instead of running it twice. A job that
+went dead can be resubmitted under the same id, and a succeeded one once it is
+older than the caller's dedupe window.
+
+Failed attempts are acknowledged and parked in the jobs:{job_type}:delayed
+sorted set until their backoff expires, then re-added to the stream. After
+JOB_MAX_ATTEMPTS, or on a PermanentJobError, the job goes to the
+jobs:{job_type}:dead stream. Entries left pending by a crashed worker are
+reclaimed after JOB_VISIBILITY_TIMEOUT.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import socket
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import orjson
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+JOB_GROUP = "job-workers"
+
+# Job types
+DEPLOY_STORE = "deploy_store"
+LAUNCH_NOTIFICATION = "launch_notification"
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+# Called as (job_type, job, status, fields) after a job is retried, dead-lettered or succeeds
+TransitionHook = Callable[[str, Dict[str, Any], str, Dict[str, Any]], Awaitable[None]]
+
+# Create the job hash and stream entry together, unless the job already exists and is
+# still in flight, or succeeded within the dedupe window (ARGV[7] seconds, 0 = while kept)
+ENQUEUE_SCRIPT = """
+local status = redis.call('HGET', KEYS[1], 'status')
+if status then
+    local window = tonumber(ARGV[7])
+    local age = tonumber(ARGV[4]) - tonumber(redis.call('HGET', KEYS[1], 'enqueued_at') or ARGV[4])
+    local finished = status == 'dead' or status == 'failed' or (status == 'succeeded' and window > 0 and age >= window)
+    if not finished then
+        return {0, status}
+    end
+    redis.call('DEL', KEYS[1])
+end
+redis.call('HSET', KEYS[1],
+    'job_id', ARGV[1], 'job_type', ARGV[2], 'payload', ARGV[3],
+    'status', 'queued', 'attempts', 0, 'enqueued_at', ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[6], '*', 'job_id', ARGV[1])
+return {1, 'queued'}
+"""
+
+# Move delayed retries whose backoff has expired back onto the stream
+PROMOTE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job_id in ipairs(due) do
+    redis.call('ZREM', KEYS[1], job_id)
+    redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[3], '*', 'job_id', job_id)
+end
+return #due
+"""
+
+jobs_enqueued = Counter(
+    "jobs_enqueued_total", "Jobs submitted to the queue", ["job_type", "result"]
+)
+jobs_processed = Counter(
+    "jobs_processed_total", "Job attempts by outcome", ["job_type", "outcome"]
+)
+job_duration = Histogram(
+    "job_duration_seconds", "Job handler run time", ["job_type"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+jobs_in_flight = Gauge("jobs_in_flight", "Jobs currently running in this worker")
+
+
+class PermanentJobError(Exception):
+    """Retrying will not help (e.g. the upstream rejected the request); dead-letter now"""
+
+
+def job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def job_stream(job_type: str) -> str:
+    return f"jobs:{job_type}"
+
+
+def idempotent_job_id(job_type: str, key: str) -> str:
+    """Stable job id for a client idempotency key or a canonical payload"""
+    return hashlib.sha256(f"{job_type}:{key}".encode()).hexdigest()[:24]
+
+
+def _decode(job: Dict[bytes, bytes]) -> Dict[str, Any]:
+    data = {key.decode(): value.decode() for key, value in job.items()}
+    for field in ("payload", "result"):
+        if field in data:
+            data[field] = orjson.loads(data[field])
+    if "attempts" in data:
+        data["attempts"] = int(data["attempts"])
+    return data
+
+
+class JobQueue:
+    """Enqueue jobs and read their state (used by the gateway and the worker)"""
+
+    def __init__(self, redis_client, settings: Settings):
+        self.redis = redis_client
+        self.stream_maxlen = settings.JOB_STREAM_MAXLEN
+        self.result_ttl = settings.JOB_RESULT_TTL
+        self._enqueue = redis_client.register_script(ENQUEUE_SCRIPT)
+
+    async def enqueue_job(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        job_id: str,
+        dedupe_window: float = 0
+    ) -> Dict[str, Any]:
+        """Queue a job unless job_id is in flight or recently succeeded; returns {"job_id", "status", "created"}
+
+        Dead jobs are always queued again. dedupe_window=0 returns a succeeded job for as
+        long as its state is kept (explicit idempotency keys); otherwise only for that many seconds.
+        """
+        created, status = await self._enqueue(
+            keys=[job_key(job_id), job_stream(job_type)],
+            args=[
+                job_id, job_type, orjson.dumps(payload), repr(time.time()),
+                self.result_ttl, self.stream_maxlen, dedupe_window
+            ]
+        )
+        status = status.decode() if isinstance(status, bytes) else status
+        jobs_enqueued.labels(job_type=job_type, result="new" if created else "duplicate").inc()
+        return {"job_id": job_id, "status": status, "created": bool(created)}
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await self.redis.hgetall(job_key(job_id))
+        return _decode(job) if job else None
+
+
+class JobWorker:
+    """Consumes job streams with bounded concurrency, retries and dead-lettering"""
+
+    def __init__(
+        self,
+        redis_client,
+        handlers: Dict[str, JobHandler],
+        settings: Settings,
+        on_transition: Optional[TransitionHook] = None
+    ):
+        self.redis = redis_client
+        self.handlers = handlers
+        self.on_transition = on_transition
+        self.queue = JobQueue(redis_client, settings)
+        self.concurrency = settings.JOB_WORKER_CONCURRENCY
+        self.max_attempts = settings.JOB_MAX_ATTEMPTS
+        self.backoff_base = settings.JOB_BACKOFF_BASE
+        self.backoff_max = settings.JOB_BACKOFF_MAX
+        self.timeout = settings.JOB_TIMEOUT
+        self.visibility_ms = int(settings.JOB_VISIBILITY_TIMEOUT * 1000)
+        self.block_ms = settings.JOB_BLOCK_MS
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._promote = redis_client.register_script(PROMOTE_SCRIPT)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._tasks: set = set()
+        self._stopping = asyncio.Event()
+
+    async def _ensure_groups(self):
+        for job_type in self.handlers:
+            try:
+                await self.redis.xgroup_create(job_stream(job_type), JOB_GROUP, id="0", mkstream=True)
+            except Exception as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _promote_due(self):
+        now = repr(time.time())
+        for job_type in self.handlers:
+            await self._promote(
+                keys=[f"{job_stream(job_type)}:delayed", job_stream(job_type)],
+                args=[now, 100, self.queue.stream_maxlen]
+            )
+
+    async def _claim(self, job_type: str, count: int) -> List:
+        _, claimed, *_ = await self.redis.xautoclaim(
+            job_stream(job_type), JOB_GROUP, self.consumer,
+            min_idle_time=self.visibility_ms, start_id="0-0", count=count
+        )
+        return [(entry_id, fields) for entry_id, fields in claimed if fields]
+
+    async def _read(self, count: int) -> List:
+        """Reclaimed entries first, then new ones; returns [(job_type, entry_id, fields)]"""
+        entries = []
+        for job_type in self.handlers:
+            for entry_id, fields in await self._claim(job_type, count - len(entries)):
+                entries.append((job_type, entry_id, fields))
+            if len(entries) >= count:
+                return entries
+
+        streams = {job_stream(job_type): ">" for job_type in self.handlers}
+        response = await self.redis.xreadgroup(
+            JOB_GROUP, self.consumer, streams, count=count - len(entries),
+            block=None if entries else self.block_ms
+        )
+        for stream, messages in response or []:
+            job_type = stream.decode().split(":", 1)[1]
+            entries.extend((job_type, entry_id, fields) for entry_id, fields in messages)
+        return entries
+
+    async def _transition(self, job_type: str, job: Dict[str, Any], status: str, fields: Dict[str, Any]):
+        if self.on_transition is None:
+            return
+        try:
+            await self.on_transition(job_type, job, status, fields)
+        except Exception as e:
+            logger.warning(f"Transition hook failed for job {job['job_id']} ({status}): {e}")
+
+    async def _finish(self, job_type: str, entry_id, job_id: str, fields: Dict[str, Any], clear: tuple = ()):
+        key = job_key(job_id)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(key, mapping=fields)
+        if clear:
+            pipe.hdel(key, *clear)
+        pipe.expire(key, self.queue.result_ttl)
+        pipe.xack(job_stream(job_type), JOB_GROUP, entry_id)
+        pipe.xdel(job_stream(job_type), entry_id)
+        await pipe.execute()
+
+    async def _process(self, job_type: str, entry_id, message: Dict[bytes, bytes]):
+        job_id = message[b"job_id"].decode()
+        job = await self.queue.get_job(job_id)
+        if job is None or job["status"] in ("succeeded", "dead"):
+            # Expired, or a duplicate delivery of a job that already finished
+            await self.redis.xack(job_stream(job_type), JOB_GROUP, entry_id)
+            await self.redis.xdel(job_stream(job_type), entry_id)
+            return
+
+        attempts = job["attempts"] + 1
+        await self.redis.hset(job_key(job_id), mapping={
+            "status": "running", "attempts": attempts, "started_at": repr(time.time())
+        })
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self.handlers[job_type](job["payload"]), timeout=self.timeout)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            permanent = isinstance(e, PermanentJobError)
+            if permanent or attempts >= self.max_attempts:
+                logger.error(f"Job {job_type} {job_id} dead after {attempts} attempts: {error}")
+                await self.redis.xadd(
+                    f"{job_stream(job_type)}:dead",
+                    {"job_id": job_id, "error": error, "attempts": attempts},
+                    maxlen=self.queue.stream_maxlen, approximate=True
+                )
+                fields = {"status": "dead", "error": error, "attempts": attempts}
+                await self._finish(job_type, entry_id, job_id, fields)
+                await self._transition(job_type, job, "dead", fields)
+                jobs_processed.labels(job_type=job_type, outcome="dead").inc()
+            else:
+                retry_at = time.time() + self._backoff(attempts)
+                logger.warning(f"Job {job_type} {job_id} attempt {attempts} failed, retrying: {error}")
+                await self.redis.zadd(f"{job_stream(job_type)}:delayed", {job_id: retry_at})
+                fields = {"status": "retrying", "error": error, "retry_at": repr(retry_at), "attempts": attempts}
+                await self._finish(job_type, entry_id, job_id, fields)
+                await self._transition(job_type, job, "retrying", fields)
+                jobs_processed.labels(job_type=job_type, outcome="retried").inc()
+            return
+        finally:
+            job_duration.labels(job_type=job_type).observe(time.perf_counter() - started)
+
+        fields = {
+            "status": "succeeded",
+            "result": orjson.dumps(result or {}),
+            "finished_at": repr(time.time()),
+        }
+        await self._finish(job_type, entry_id, job_id, fields, clear=("error", "retry_at"))
+        await self._transition(job_type, job, "succeeded", fields)
+        jobs_processed.labels(job_type=job_type, outcome="succeeded").inc()
+
+    async def _run_one(self, job_type: str, entry_id, message):
+        jobs_in_flight.inc()
+        try:
+            await self._process(job_type, entry_id, message)
+        except Exception as e:
+            # Left pending; reclaimed after the visibility timeout
+            logger.error(f"Job bookkeeping failed for {job_type} entry {entry_id}: {e}")
+        finally:
+            jobs_in_flight.dec()
+            self._slots.release()
+
+    async def run(self):
+        await self._ensure_groups()
+        logger.info(f"Job worker {self.consumer} consuming {', '.join(self.handlers)}")
+        while not self._stopping.is_set():
+            await self._slots.acquire()
+            free = 1
+            while free < self.concurrency and not self._slots.locked():
+                await self._slots.acquire()
+                free += 1
+            try:
+                await self._promote_due()
+                entries = await self._read(free)
+            except Exception as e:
+                logger.error(f"Job stream read failed: {e}")
+                entries = []
+                await asyncio.sleep(1)
+
+            for _ in range(free - len(entries)):
+                self._slots.release()
+            for index, (job_type, entry_id, message) in enumerate(entries):
+                if index >= free:
+                    # XREADGROUP's count is per stream, so a multi-stream read can overshoot
+                    await self._slots.acquire()
+                task = asyncio.create_task(self._run_one(job_type, entry_id, message))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stop(self):
+        self._stopping.set()
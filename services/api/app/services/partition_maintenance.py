@@ -0,0 +1,62 @@
+"""
+Partition maintenance for wizard_analytics
+Keeps daily partitions created ANALYTICS_PARTITIONS_AHEAD days in advance and
+drops partitions older than ANALYTICS_RETENTION_DAYS. Both SQL functions take
+an advisory lock, so every replica can run this loop safely.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import Settings
+from app.repositories.database import Database, register_statement
+
+logger = logging.getLogger(__name__)
+
+CREATE_PARTITIONS = register_statement(
+    "analytics.create_partitions", "SELECT create_wizard_analytics_partitions($1::integer)"
+)
+DROP_PARTITIONS = register_statement(
+    "analytics.drop_partitions", "SELECT drop_wizard_analytics_partitions($1::integer)"
+)
+
+
+class AnalyticsPartitionMaintainer:
+    """Periodically pre-creates and retires wizard_analytics partitions"""
+
+    def __init__(self, db: Database, settings: Settings):
+        self.db = db
+        self.days_ahead = settings.ANALYTICS_PARTITIONS_AHEAD
+        self.retention_days = settings.ANALYTICS_RETENTION_DAYS
+        self.interval = settings.ANALYTICS_PARTITION_MAINTENANCE_INTERVAL
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self):
+        created = await self.db.fetchval(CREATE_PARTITIONS, self.days_ahead)
+        dropped = 0
+        if self.retention_days > 0:
+            dropped = await self.db.fetchval(DROP_PARTITIONS, self.retention_days)
+        if created or dropped:
+            logger.info(f"wizard_analytics partitions: {created} created, {dropped} dropped")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"wizard_analytics partition maintenance failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
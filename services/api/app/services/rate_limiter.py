@@ -0,0 +1,174 @@
+"""
+Distributed token-bucket rate limiter
+The authoritative bucket lives in Redis and is updated atomically by a Lua script.
+Each gateway replica leases a small batch of tokens at a time, so most allowed
+requests are answered from the in-process lease without a Redis round trip.
+
+Leases follow demand: a key starts with a single token, doubles its lease while
+it keeps running out early (up to RATE_LIMIT_LEASE_FRACTION of capacity), and
+shrinks to what was actually used once traffic drops. Tokens left in a lease
+are refunded to the shared bucket on the next renewal instead of being lost.
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Evaluated atomically by Redis: refill, take back `refund` unused leased tokens,
+# then grant up to `lease` tokens if `cost` fits. Returns {granted, tokens_left, retry_after_seconds}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local lease = tonumber(ARGV[4])
+local refund = tonumber(ARGV[5])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate + refund)
+local granted = 0
+local retry_after = 0
+if tokens >= cost then
+    granted = math.max(cost, math.min(lease, math.floor(tokens)))
+    tokens = tokens - granted
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {granted, tostring(tokens), tostring(retry_after)}
+"""
+
+# Path prefix -> route class, first match wins
+ROUTE_CLASSES: List[Tuple[str, str]] = [
+    ("/api/v1/wizard/llm/", "llm_generation"),
+    ("/api/v1/content/", "content_generation"),
+    ("/api/v1/integrations/setup", "integration_setup"),
+    ("/api/v1/themes/", "theme_recommendations"),
+    ("/api/v1/wizard/", "wizard_steps"),
+]
+
+EXEMPT_PATHS = {"/", "/healthz", "/livez", "/readyz", "/metrics", "/docs", "/redoc", "/openapi.json"}
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """Parse "10/minute" into (capacity, tokens per second)"""
+    count, _, period = rate.partition("/")
+    capacity = int(count)
+    seconds = _PERIODS[period.strip().lower()]
+    return capacity, capacity / seconds
+
+
+def classify_route(path: str) -> Optional[str]:
+    if path in EXEMPT_PATHS:
+        return None
+    for prefix, route_class in ROUTE_CLASSES:
+        if path.startswith(prefix):
+            return route_class
+    return "default"
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int
+    retry_after: int = 0
+
+
+@dataclass
+class _Lease:
+    tokens: float
+    granted: int
+    remote_remaining: float
+    expires_at: float
+    used: int = 0
+
+
+class TokenBucketLimiter:
+    """Redis token bucket with per-replica token leases"""
+
+    def __init__(self, redis_client, settings: Settings):
+        self.redis = redis_client
+        self.rates: Dict[str, Tuple[int, float]] = {
+            route_class: parse_rate(rate) for route_class, rate in settings.RATE_LIMITS.items()
+        }
+        self.lease_fraction = settings.RATE_LIMIT_LEASE_FRACTION
+        self.lease_ttl = settings.RATE_LIMIT_LEASE_TTL
+        self.max_local_keys = settings.RATE_LIMIT_LOCAL_MAX_KEYS
+        self._leases: "OrderedDict[str, _Lease]" = OrderedDict()
+        self._script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def _rate_for(self, route_class: str) -> Tuple[int, float]:
+        return self.rates.get(route_class) or self.rates["default"]
+
+    def _reset_after(self, capacity: int, rate: float, remaining: float) -> int:
+        return math.ceil(max(0.0, capacity - remaining) / rate)
+
+    def _lease_size(self, lease: Optional[_Lease], capacity: int, cost: int, now: float) -> int:
+        max_lease = max(cost, int(capacity * self.lease_fraction))
+        if lease is None:
+            return cost
+        if lease.expires_at > now:
+            # Ran out before expiring: demand outgrew the lease
+            return min(max_lease, max(cost, lease.granted * 2))
+        return min(max_lease, max(cost, lease.used))
+
+    async def hit(self, identity: str, route_class: str, cost: int = 1) -> RateLimitResult:
+        capacity, rate = self._rate_for(route_class)
+        key = f"wizard:rate:{identity}:{route_class}"
+        now = time.monotonic()
+
+        # Local pre-check against the tokens already leased from Redis
+        lease = self._leases.get(key)
+        if lease is not None and lease.expires_at > now and lease.tokens >= cost:
+            lease.tokens -= cost
+            lease.used += cost
+            self._leases.move_to_end(key)
+            remaining = lease.remote_remaining + lease.tokens
+            return RateLimitResult(True, capacity, int(remaining), self._reset_after(capacity, rate, remaining))
+
+        lease_size = self._lease_size(lease, capacity, cost, now)
+        refund = int(lease.tokens) if lease is not None else 0
+        try:
+            granted, tokens_left, retry_after = await self._script(
+                keys=[key], args=[capacity, rate, cost, lease_size, refund]
+            )
+        except Exception as e:
+            # Fail open: an unavailable Redis must not take the gateway down
+            logger.warning(f"Rate limiter backend unavailable, allowing request: {e}")
+            return RateLimitResult(True, capacity, capacity, 0)
+
+        granted = int(granted)
+        tokens_left = float(tokens_left)
+        if granted < cost:
+            self._leases.pop(key, None)
+            return RateLimitResult(
+                False, capacity, 0,
+                self._reset_after(capacity, rate, tokens_left),
+                retry_after=max(1, math.ceil(float(retry_after)))
+            )
+
+        self._leases[key] = _Lease(granted - cost, granted, tokens_left, now + self.lease_ttl, used=cost)
+        self._leases.move_to_end(key)
+        while len(self._leases) > self.max_local_keys:
+            self._leases.popitem(last=False)
+
+        remaining = tokens_left + granted - cost
+        return RateLimitResult(True, capacity, int(remaining), self._reset_after(capacity, rate, remaining))
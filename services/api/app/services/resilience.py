@@ -0,0 +1,101 @@
+"""
+Failure handling primitives for upstream calls
+Circuit breaker (closed/open/half-open) and a retry budget that caps retries
+at a fraction of recent traffic.
+"""
+
+import time
+from typing import List
+
+import httpx
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.RequestError):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with limited half-open probes"""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, half_open_calls: int):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probes = 0
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now"""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"Circuit open for {self.name} service")
+            self.state = HALF_OPEN
+            self._probes = 0
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                raise CircuitOpenError(f"Circuit half-open for {self.name} service, probe in flight")
+            self._probes += 1
+
+    def record_success(self):
+        self.failures = 0
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """A call ended without an outcome (cancelled): free its half-open probe slot"""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+
+class RetryBudget:
+    """Allows retries while they stay under `ratio` of requests seen in the last `window` seconds"""
+
+    def __init__(self, ratio: float, min_per_second: float, window: int = 10):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        # Per-second buckets of [requests, retries], indexed by second % window
+        self._buckets: List[List[int]] = [[0, 0] for _ in range(window)]
+        self._seconds: List[int] = [0] * window
+
+    def _bucket(self) -> List[int]:
+        second = int(time.monotonic())
+        index = second % self.window
+        if self._seconds[index] != second:
+            self._seconds[index] = second
+            self._buckets[index] = [0, 0]
+        return self._buckets[index]
+
+    def _totals(self) -> List[int]:
+        oldest = int(time.monotonic()) - self.window
+        requests = retries = 0
+        for second, (bucket_requests, bucket_retries) in zip(self._seconds, self._buckets):
+            if second > oldest:
+                requests += bucket_requests
+                retries += bucket_retries
+        return [requests, retries]
+
+    def record_request(self):
+        self._bucket()[0] += 1
+
+    def try_withdraw(self) -> bool:
+        """Reserve one retry if the budget allows it"""
+        requests, retries = self._totals()
+        if retries >= self.min_per_second * self.window + self.ratio * requests:
+            return False
+        self._bucket()[1] += 1
+        return True
+
@@ -0,0 +1,138 @@
+"""
+JWT verification with a bounded cache of verified tokens
+Signatures are checked once per token; later requests carrying the same token
+are answered from an LRU cache until the token's own `exp`.
+"""
+
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from jose import JWTError, jwt
+from prometheus_client import Counter, Gauge
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+token_cache_lookups = Counter(
+    "auth_token_cache_lookups_total", "Verified-token cache lookups", ["result"]
+)
+token_cache_hit_ratio = Gauge(
+    "auth_token_cache_hit_ratio", "Verified-token cache hit ratio since startup"
+)
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class KeyRing:
+    """Active signing keys by kid, reloaded from JWT_KEYS_FILE when it changes"""
+
+    def __init__(self, settings: Settings):
+        self.default_kid = settings.JWT_DEFAULT_KID
+        self.static_keys = {self.default_kid: settings.JWT_SECRET, **settings.JWT_KEYS}
+        self.keys_file = settings.JWT_KEYS_FILE
+        self.refresh_interval = settings.JWT_KEYS_REFRESH_SECONDS
+        self.keys: Dict[str, str] = dict(self.static_keys)
+        self._file_mtime: Optional[float] = None
+        self._next_check = 0.0
+        self.version = 0
+
+    def refresh(self) -> bool:
+        """Re-read the keys file if it changed; returns True when the key set changed"""
+        now = time.monotonic()
+        if not self.keys_file or now < self._next_check:
+            return False
+        self._next_check = now + self.refresh_interval
+        try:
+            mtime = os.stat(self.keys_file).st_mtime
+            if mtime == self._file_mtime:
+                return False
+            with open(self.keys_file) as f:
+                file_keys = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load JWT keys from {self.keys_file}: {e}")
+            return False
+        
+        self._file_mtime = mtime
+        keys = {**self.static_keys, **file_keys}
+        if keys == self.keys:
+            return False
+        self.keys = keys
+        self.version += 1
+        logger.info(f"JWT key ring reloaded: {sorted(keys)}")
+        return True
+
+    def get(self, kid: Optional[str]) -> str:
+        key = self.keys.get(kid or self.default_kid)
+        if key is None:
+            raise InvalidToken(f"Unknown signing key: {kid}")
+        return key
+
+
+class TokenVerifier:
+    """Verifies bearer tokens, caching the claims of valid ones until they expire"""
+
+    def __init__(self, settings: Settings):
+        self.key_ring = KeyRing(settings)
+        self.algorithms: List[str] = settings.JWT_ALGORITHMS
+        self.audience = settings.JWT_AUDIENCE
+        self.max_size = settings.JWT_CACHE_SIZE
+        self.max_ttl = settings.JWT_CACHE_MAX_TTL
+        self._cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _record(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        token_cache_lookups.labels(result="hit" if hit else "miss").inc()
+        token_cache_hit_ratio.set(self.hits / (self.hits + self.misses))
+
+    def _decode(self, token: str) -> Dict[str, Any]:
+        try:
+            header = jwt.get_unverified_header(token)
+            key = self.key_ring.get(header.get("kid"))
+            return jwt.decode(
+                token,
+                key,
+                algorithms=self.algorithms,
+                audience=self.audience,
+                options={"verify_aud": self.audience is not None}
+            )
+        except JWTError as e:
+            raise InvalidToken(str(e))
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Return the token claims or raise InvalidToken"""
+        if self.key_ring.refresh():
+            # Keys may have been revoked; previously verified tokens must be re-checked
+            self._cache.clear()
+        
+        now = time.time()
+        cached = self._cache.get(token)
+        if cached is not None:
+            claims, expires_at = cached
+            if expires_at > now:
+                self._cache.move_to_end(token)
+                self._record(hit=True)
+                return claims
+            del self._cache[token]
+        
+        self._record(hit=False)
+        claims = self._decode(token)
+        
+        expires_at = now + self.max_ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+        self._cache[token] = (claims, expires_at)
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return claims
@@ -0,0 +1,243 @@
+"""
+Upstream HTTP client registry
+Keeps one long-lived keep-alive pool per downstream wizard service, guarded by
+a circuit breaker and a retry budget.
+"""
+
+import asyncio
+import logging
+import random
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+import httpx
+from prometheus_client import Counter, Gauge
+
+from app.config import Settings
+from app.services.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+)
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+RETRYABLE_STATUS = {502, 503, 504}
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+circuit_state = Gauge(
+    "upstream_circuit_state", "Circuit breaker state (0=closed, 1=half-open, 2=open)", ["upstream"]
+)
+circuit_rejections = Counter(
+    "upstream_circuit_rejections_total", "Calls rejected by an open circuit", ["upstream"]
+)
+upstream_retries = Counter("upstream_retries_total", "Retried upstream calls", ["upstream"])
+upstream_hedges = Counter("upstream_hedged_requests_total", "Hedged upstream calls", ["upstream"])
+
+
+class Upstream:
+    """One downstream service: pooled client plus breaker, retry budget and hedging"""
+
+    def __init__(self, name: str, client: httpx.AsyncClient, settings: Settings):
+        self.name = name
+        self.client = client
+        self.breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.UPSTREAM_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.UPSTREAM_BREAKER_RESET_TIMEOUT,
+            half_open_calls=settings.UPSTREAM_BREAKER_HALF_OPEN_CALLS
+        )
+        self.budget = RetryBudget(
+            ratio=settings.UPSTREAM_RETRY_BUDGET_RATIO,
+            min_per_second=settings.UPSTREAM_RETRY_MIN_PER_SECOND
+        )
+        self.max_retries = settings.UPSTREAM_MAX_RETRIES
+        self.hedge_delay = settings.UPSTREAM_HEDGE_DELAY
+        circuit_state.labels(upstream=name).set(0)
+
+    def _before_call(self):
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            circuit_rejections.labels(upstream=self.name).inc()
+            raise
+        finally:
+            circuit_state.labels(upstream=self.name).set(_STATE_VALUES[self.breaker.state])
+
+    def _record(self, success: bool):
+        if success:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        circuit_state.labels(upstream=self.name).set(_STATE_VALUES[self.breaker.state])
+
+    def _release(self):
+        self.breaker.release()
+        circuit_state.labels(upstream=self.name).set(_STATE_VALUES[self.breaker.state])
+
+    async def _hedged(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a second copy if the first has not answered within hedge_delay; first success wins"""
+        primary = asyncio.ensure_future(self.client.request(method, url, **kwargs))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay)
+            if done or not self.budget.try_withdraw():
+                return await primary
+            
+            upstream_hedges.labels(upstream=self.name).inc()
+            tasks.append(asyncio.ensure_future(self.client.request(method, url, **kwargs)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            raise primary.exception()
+        finally:
+            # Also reached when the caller is cancelled: no copy is left running unowned
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def request(self, method: str, url: str, hedge: bool = False, **kwargs) -> httpx.Response:
+        """Call the upstream; idempotent methods are retried within the retry budget"""
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        self.budget.record_request()
+        attempt = 0
+        
+        while True:
+            self._before_call()
+            try:
+                if hedge and idempotent:
+                    response = await self._hedged(method, url, **kwargs)
+                else:
+                    response = await self.client.request(method, url, **kwargs)
+            except httpx.RequestError:
+                self._record(success=False)
+                if not await self._should_retry(idempotent, attempt):
+                    raise
+                attempt += 1
+                continue
+            except asyncio.CancelledError:
+                # Says nothing about the upstream's health, but a half-open probe slot must not leak
+                self._release()
+                raise
+            except Exception:
+                self._record(success=False)
+                raise
+            
+            if response.status_code >= 500:
+                self._record(success=False)
+                if response.status_code in RETRYABLE_STATUS and await self._should_retry(idempotent, attempt):
+                    attempt += 1
+                    continue
+            else:
+                self._record(success=True)
+            return response
+
+    async def _should_retry(self, idempotent: bool, attempt: int) -> bool:
+        if not idempotent or attempt >= self.max_retries or self.breaker.state == OPEN:
+            return False
+        if not self.budget.try_withdraw():
+            return False
+        upstream_retries.labels(upstream=self.name).inc()
+        # Exponential backoff with full jitter: 50ms, 100ms, ...
+        await asyncio.sleep(random.uniform(0, 0.05 * (2 ** attempt)))
+        return True
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Open a streamed response; the body is read by the caller and closed on exit
+
+        Not retried or hedged: once bytes have been relayed the call cannot be replayed.
+        A failure while the body is being read still counts against the breaker.
+        """
+        self._before_call()
+        self.budget.record_request()
+        request = self.client.build_request(method.upper(), url, **kwargs)
+        try:
+            response = await self.client.send(request, stream=True)
+        except asyncio.CancelledError:
+            self._release()
+            raise
+        except Exception:
+            self._record(success=False)
+            raise
+        
+        self._record(success=response.status_code < 500)
+        try:
+            yield response
+        except httpx.RequestError:
+            self._record(success=False)
+            raise
+        finally:
+            await response.aclose()
+
+
+class UpstreamClients:
+    """Pooled upstreams for the llm/content/theme/integration/analytics services"""
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._upstreams: Dict[str, Upstream] = {}
+
+    def base_urls(self) -> Dict[str, str]:
+        return {
+            "llm": self.settings.LLM_SERVICE_URL,
+            "content": self.settings.CONTENT_GENERATOR_URL,
+            "theme": self.settings.THEME_SERVICE_URL,
+            "integration": self.settings.INTEGRATION_SERVICE_URL,
+            "analytics": self.settings.ANALYTICS_SERVICE_URL,
+        }
+
+    def _limits(self, name: str) -> httpx.Limits:
+        max_connections = self.settings.UPSTREAM_POOL_LIMITS.get(
+            name, self.settings.UPSTREAM_MAX_CONNECTIONS
+        )
+        return httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(max_connections, self.settings.UPSTREAM_MAX_KEEPALIVE),
+            keepalive_expiry=self.settings.UPSTREAM_KEEPALIVE_EXPIRY
+        )
+
+    async def start(self):
+        """Open one client per upstream"""
+        timeout = httpx.Timeout(
+            self.settings.UPSTREAM_TIMEOUT,
+            connect=self.settings.UPSTREAM_CONNECT_TIMEOUT
+        )
+        for name, base_url in self.base_urls().items():
+            client = httpx.AsyncClient(
+                base_url=base_url,
+                limits=self._limits(name),
+                timeout=timeout,
+                http2=self.settings.UPSTREAM_HTTP2
+            )
+            self._upstreams[name] = Upstream(name, client, self.settings)
+            logger.info(f"Upstream pool ready: {name} -> {base_url}")
+
+    def get(self, name: str) -> Upstream:
+        try:
+            return self._upstreams[name]
+        except KeyError:
+            raise RuntimeError(f"Unknown or closed upstream service: {name}")
+
+    def circuit_states(self) -> Dict[str, str]:
+        return {name: upstream.breaker.state for name, upstream in self._upstreams.items()}
+
+    async def close(self):
+        """Close every pool, dropping idle keep-alive connections"""
+        for upstream in self._upstreams.values():
+            await upstream.client.aclose()
+        self._upstreams.clear()
@@ -0,0 +1,136 @@
+"""
+Wizard session management
+Sessions live in Postgres; reads go through a Redis read-through cache under
+wizard:session:{session_id}. Cache writes carry the row version, so a slow
+reader can never overwrite a newer session state written by an update.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import orjson
+
+from app.config import Settings
+from app.repositories.database import DatabaseRouter
+from app.repositories.sessions import SessionRepository, VersionConflict
+
+logger = logging.getLogger(__name__)
+
+TOTAL_STEPS = 6
+
+# Set the cached session only if it is not older than what is already cached
+VERSIONED_SET_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], 'version'))
+if current and current > tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'version', ARGV[1], 'data', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+def session_cache_key(session_id: str) -> str:
+    return f"wizard:session:{session_id}"
+
+
+def session_progress(session: Dict[str, Any]) -> Dict[str, Any]:
+    completed_steps = [
+        step for step in range(1, TOTAL_STEPS + 1)
+        if f"step_{step}" in session["configuration"]
+    ]
+    return {"completed_steps": completed_steps, "total_steps": TOTAL_STEPS}
+
+
+class WizardFlowManager:
+    """Creates, reads and advances wizard sessions"""
+
+    def __init__(
+        self,
+        repository: SessionRepository,
+        redis_client,
+        settings: Settings,
+        databases: Optional[DatabaseRouter] = None
+    ):
+        self.repository = repository
+        self.databases = databases
+        self.redis = redis_client
+        self.cache_ttl = settings.SESSION_CACHE_TTL
+        self.snapshot_interval = settings.SESSION_SNAPSHOT_INTERVAL
+        self._set_script = redis_client.register_script(VERSIONED_SET_SCRIPT)
+
+    async def _cache_get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = await self.redis.hget(session_cache_key(session_id), "data")
+        except Exception as e:
+            logger.warning(f"Session cache read failed for {session_id}: {e}")
+            return None
+        return orjson.loads(data) if data else None
+
+    async def _cache_set(self, session: Dict[str, Any]):
+        try:
+            await self._set_script(
+                keys=[session_cache_key(session["session_id"])],
+                args=[session["version"], orjson.dumps(session), self.cache_ttl]
+            )
+        except Exception as e:
+            # A missed cache write only costs a DB read later, but a stale entry
+            # would be wrong, so drop the key if we cannot write the new version
+            logger.warning(f"Session cache write failed for {session['session_id']}: {e}")
+            await self.invalidate(session["session_id"])
+
+    async def _written(self, session: Dict[str, Any]):
+        await self._cache_set(session)
+        if self.databases is not None:
+            await self.databases.note_write(session["session_id"])
+
+    async def invalidate(self, session_id: str):
+        try:
+            await self.redis.delete(session_cache_key(session_id))
+        except Exception as e:
+            logger.error(f"Session cache invalidation failed for {session_id}: {e}")
+
+    async def create_session(self, user_id: UUID, preferences: Dict[str, Any]) -> Dict[str, Any]:
+        session = await self.repository.create(user_id, {"user_preferences": preferences})
+        await self._written(session)
+        return session
+
+    async def get_session(self, session_id: UUID) -> Optional[Dict[str, Any]]:
+        session = await self._cache_get(str(session_id))
+        if session is not None:
+            return session
+        
+        session = await self.repository.get(session_id)
+        if session is not None:
+            await self._cache_set(session)
+        return session
+
+    async def update_step(
+        self,
+        session_id: UUID,
+        step_number: int,
+        operations: List[Dict[str, Any]],
+        auto_advance: bool = True,
+        expected_version: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            session = await self.repository.save_step(
+                session_id,
+                step_number,
+                operations,
+                auto_advance,
+                expected_version=expected_version,
+                snapshot_interval=self.snapshot_interval
+            )
+        except VersionConflict:
+            # Whatever we have cached is at best as fresh as the version that beat us
+            await self.invalidate(str(session_id))
+            raise
+        if session is not None:
+            await self._written(session)
+        return session
+
+    async def get_configuration_at(self, session_id: UUID, version: int) -> Optional[Dict[str, Any]]:
+        """Get the session configuration as it was at a given version"""
+        return await self.repository.get_configuration_at(session_id, version)
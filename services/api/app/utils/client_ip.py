@@ -0,0 +1,42 @@
+"""
+Client address resolution behind reverse proxies
+X-Forwarded-For is only honoured when the direct peer is a configured trusted
+proxy. The client is then the rightmost address that is not a trusted proxy:
+everything to its left was supplied by the client and can be forged.
+"""
+
+import ipaddress
+from typing import List, Optional, Union
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_networks(cidrs: List[str]) -> List[Network]:
+    return [ipaddress.ip_network(cidr.strip(), strict=False) for cidr in cidrs if cidr.strip()]
+
+
+def _address(value: str) -> Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+    try:
+        return ipaddress.ip_address(value.strip())
+    except ValueError:
+        return None
+
+
+def _trusted(address, trusted: List[Network]) -> bool:
+    return any(address in network for network in trusted)
+
+
+def client_address(peer: Optional[str], forwarded_for: Optional[str], trusted: List[Network]) -> Optional[str]:
+    """Normalised client IP, or None if no valid address is known"""
+    peer_address = _address(peer) if peer else None
+    if peer_address is None or not forwarded_for or not _trusted(peer_address, trusted):
+        return str(peer_address) if peer_address else None
+    hops = [_address(hop) for hop in forwarded_for.split(",")]
+    for hop in reversed(hops):
+        if hop is None:
+            # Unparseable hop: the chain cannot be followed further
+            break
+        if not _trusted(hop, trusted):
+            return str(hop)
+    # Only trusted proxies (or garbage) in the chain: the peer is the best we know
+    return str(peer_address)
@@ -0,0 +1,85 @@
+"""
+Minimal JSON patch support for wizard step updates
+Supports the add/replace/remove operations with JSON pointer paths. Semantics
+mirror apply_wizard_step_patch() (jsonb_insert / jsonb_set / #-) so that
+patches applied in SQL and replayed in Python (when rebuilding store_configs
+history) give the same document:
+- add on an array position inserts before it (RFC 6902); replace overwrites
+  it; either appends for an index past the end, or "-"
+- add and replace on an object member both set it
+- operations whose parent path does not exist are no-ops
+"""
+
+from typing import Any, Dict, List, Optional
+
+# jsonb_set / jsonb_insert append when the index is past the end of the array
+APPEND_INDEX = "2147483647"
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """Split a JSON pointer ("/products/0/price") into path tokens"""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer: {pointer}")
+    tokens = [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+    return [APPEND_INDEX if token == "-" else token for token in tokens]
+
+
+def _index(container: list, token: str) -> int:
+    try:
+        return int(token)
+    except ValueError:
+        raise ValueError(f"Path element {token} is not an integer")
+
+
+def _parent(document: Any, tokens: List[str]) -> Optional[Any]:
+    node = document
+    for token in tokens:
+        if isinstance(node, dict):
+            if token not in node:
+                return None
+            node = node[token]
+        elif isinstance(node, list):
+            index = _index(node, token)
+            if not -len(node) <= index < len(node):
+                return None
+            node = node[index]
+        else:
+            return None
+    return node
+
+
+def apply_operation(document: Any, op: str, tokens: List[str], value: Any = None) -> Any:
+    """Apply one operation, returning the (possibly new) document"""
+    if not tokens:
+        return None if op == "remove" else value
+    
+    parent = _parent(document, tokens[:-1])
+    key = tokens[-1]
+    if isinstance(parent, dict):
+        if op == "remove":
+            parent.pop(key, None)
+        else:
+            parent[key] = value
+    elif isinstance(parent, list):
+        index = _index(parent, key)
+        if op == "remove":
+            if -len(parent) <= index < len(parent):
+                del parent[index]
+        elif op == "add" or index >= len(parent):
+            # list.insert clamps out-of-range positions the same way jsonb_insert does
+            parent.insert(index, value)
+        elif index < -len(parent):
+            parent.insert(0, value)
+        else:
+            parent[index] = value
+    return document
+
+
+def apply_patch(document: Dict[str, Any], operations: List[Dict[str, Any]], prefix: List[str] = None) -> Dict[str, Any]:
+    """Apply a list of {"op", "path", "value"} operations below an optional path prefix"""
+    for operation in operations:
+        tokens = (prefix or []) + parse_pointer(operation["path"])
+        document = apply_operation(document, operation["op"], tokens, operation.get("value"))
+    return document
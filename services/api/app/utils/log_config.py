@@ -0,0 +1,91 @@
+"""
+Logging setup for the API service
+Records are only enqueued on the event loop thread; formatting and I/O happen
+on a QueueListener thread.
+"""
+
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from prometheus_client import Counter
+
+from app.config import Settings
+
+log_records_dropped = Counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, including fields passed via `extra`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that never formats or blocks on the calling thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in-process, so the record can be handed over as-is
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc()
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(settings: Settings) -> QueueListener:
+    """Route the root logger through a bounded queue to a background writer"""
+    global _listener
+    if _listener is not None:
+        return _listener
+    
+    output = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    root.handlers = [NonBlockingQueueHandler(log_queue)]
+    root.setLevel(settings.LOG_LEVEL)
+    # httpx logs every upstream call at INFO; access records already cover them
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
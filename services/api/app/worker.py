@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Background job worker
+Runs the deploy and launch-notification jobs enqueued by the gateway.
+
+Usage (from services/api, or as the api-worker container):
+    python -m app.worker
+"""
+
+import asyncio
+import logging
+import signal
+from datetime import datetime
+from typing import Any, Dict
+
+from prometheus_client import start_http_server
+
+from app.config import get_settings
+from app.dependencies import close_upstream_clients, get_redis_client, get_upstream_client
+from app.services.deployment_events import TERMINAL_STATUSES, deployment_event, publish_deployment_event
+from app.services.jobs import DEPLOY_STORE, LAUNCH_NOTIFICATION, JobWorker, PermanentJobError
+from app.utils.log_config import configure_logging, shutdown_logging
+
+configure_logging(get_settings())
+logger = logging.getLogger(__name__)
+
+
+async def _post(path: str, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    client = await get_upstream_client("integration")
+    response = await client.post(path, json=payload, timeout=timeout)
+    if 400 <= response.status_code < 500:
+        raise PermanentJobError(f"{path} rejected with {response.status_code}: {response.text[:200]}")
+    response.raise_for_status()
+    return response.json()
+
+
+async def _publish(event: Dict[str, Any]):
+    settings = get_settings()
+    await publish_deployment_event(await get_redis_client(), event, settings.JOB_RESULT_TTL)
+
+
+def _stage_event(payload: Dict[str, Any], status: Dict[str, Any]) -> Dict[str, Any]:
+    return deployment_event(
+        payload["deployment_id"],
+        status.get("status", "deploying"),
+        status.get("progress", 0),
+        status.get("message") or f"Store deployment {status.get('status', 'deploying')}",
+        store_id=payload["store_id"],
+        store_url=status.get("store_url"),
+    )
+
+
+async def _track_deployment(payload: Dict[str, Any], status: Dict[str, Any]) -> Dict[str, Any]:
+    """Follow the deployment through its stages, publishing each change
+
+    One worker polls the integration service per deployment, however many
+    clients are watching the status stream.
+    """
+    settings = get_settings()
+    client = await get_upstream_client("integration")
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.DEPLOYMENT_TRACK_TIMEOUT
+    while status.get("status") not in TERMINAL_STATUSES:
+        if loop.time() >= deadline:
+            raise RuntimeError(f"Deployment still {status.get('status')} after {settings.DEPLOYMENT_TRACK_TIMEOUT}s")
+        await asyncio.sleep(settings.DEPLOYMENT_STATUS_POLL_INTERVAL)
+        response = await client.get(f"/deployment-status/{payload['deployment_id']}", timeout=10.0)
+        if response.status_code != 200:
+            continue
+        latest = response.json()
+        if (latest.get("status"), latest.get("progress")) != (status.get("status"), status.get("progress")):
+            await _publish(_stage_event(payload, latest))
+        status = latest
+    if status["status"] == "failed":
+        raise PermanentJobError(status.get("message") or "Deployment failed upstream")
+    return status
+
+
+async def deploy_store(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # deployment_id is the job id, so a retried attempt is the same deployment upstream
+    status = await _post("/deploy-store", payload, timeout=60.0)
+    await _publish(_stage_event(payload, status))
+    return await _track_deployment(payload, status)
+
+
+async def send_launch_notifications(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await _post(
+        "/send-notifications",
+        {**payload, "timestamp": datetime.utcnow().isoformat()},
+        timeout=30.0
+    )
+
+
+HANDLERS = {
+    DEPLOY_STORE: deploy_store,
+    LAUNCH_NOTIFICATION: send_launch_notifications,
+}
+
+
+async def on_transition(job_type: str, job: Dict[str, Any], status: str, fields: Dict[str, Any]):
+    """Push job-level deployment outcomes (the handler publishes the stages in between)"""
+    if job_type != DEPLOY_STORE or status == "succeeded":
+        return
+    payload = job["payload"]
+    if status == "retrying":
+        message = f"Deployment attempt {fields['attempts']} failed, retrying"
+    else:
+        message = f"Store deployment failed: {fields['error']}"
+    await _publish(deployment_event(
+        payload["deployment_id"],
+        "failed" if status == "dead" else status,
+        0,
+        message,
+        store_id=payload["store_id"],
+        attempts=fields["attempts"],
+        error=fields["error"],
+    ))
+
+
+async def main():
+    settings = get_settings()
+    start_http_server(settings.JOB_WORKER_METRICS_PORT)
+    worker = JobWorker(await get_redis_client(), HANDLERS, settings, on_transition=on_transition)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        await close_upstream_clients()
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
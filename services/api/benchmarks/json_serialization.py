@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON serialization of the largest service responses.
+Compares FastAPI's default path (jsonable_encoder + stdlib json) with orjson,
+and with the pre-serialized bytes used for constant catalogs.
+
+Usage (from services/api):
+    python -m benchmarks.json_serialization --iterations 2000
+"""
+
+import argparse
+import importlib.util
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+SERVICES_DIR = Path(__file__).resolve().parents[2]
+
+
+def load_service(name: str):
+    spec = importlib.util.spec_from_file_location(f"{name}_service", SERVICES_DIR / name / "app.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def stdlib_render(content: Any) -> bytes:
+    # Mirrors fastapi.responses.JSONResponse.render after jsonable_encoder
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+def timed(render: Callable[[], bytes], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render()
+    return (time.perf_counter() - start) / iterations
+
+
+def main(iterations: int):
+    llm = load_service("llm")
+    analytics = load_service("analytics")
+    theme = load_service("theme")
+
+    payloads: Dict[str, Any] = {
+        "llm /generate-products (count=100)": llm.build_products(
+            llm.ProductGenerationRequest(categories=["Electronics", "Fashion", "Home"], count=100)
+        ),
+        "analytics /metrics/{store_id}": analytics.build_store_metrics("store_123"),
+        "analytics /reports (detailed)": analytics.build_report("store_123", "detailed"),
+        "theme /categories": orjson.loads(theme.THEME_CATEGORIES_RESPONSE),
+    }
+
+    print(f"{'payload':<38}{'bytes':>8}{'stdlib us':>12}{'orjson us':>12}{'speedup':>9}")
+    for name, payload in payloads.items():
+        size = len(orjson.dumps(payload))
+        stdlib = timed(lambda: stdlib_render(payload), iterations)
+        fast = timed(lambda: orjson.dumps(payload), iterations)
+        print(f"{name:<38}{size:>8}{stdlib * 1e6:>12.1f}{fast * 1e6:>12.1f}{stdlib / fast:>8.1f}x")
+
+    cached = timed(lambda: theme.THEME_CATEGORIES_RESPONSE, iterations)
+    print(f"{'theme /categories (pre-serialized)':<38}{'':>8}{'':>12}{cached * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.iterations)
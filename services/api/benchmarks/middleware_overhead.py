@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request middleware overhead on a trivial route.
+Compares the previous BaseHTTPMiddleware stack with the pure ASGI middleware.
+
+Usage (from services/api):
+    python -m benchmarks.middleware_overhead --requests 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware.auth import AuthMiddleware
+from app.middleware.logging import LoggingMiddleware
+from app.middleware.rate_limiting import RateLimitMiddleware
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request.state.user_id = "demo-user"
+        return await call_next(request)
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        return await call_next(request)
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        request.state.request_id = str(uuid.uuid4())
+        logging.getLogger(__name__).info(f"Request started: {request.method} {request.url}")
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logging.getLogger(__name__).info(
+            f"Request completed: {request.method} {request.url} - {response.status_code} - {process_time:.3f}s"
+        )
+        return response
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/")
+    async def root():
+        return {"service": "Store Launch Wizard API"}
+
+    for cls in middleware:
+        app.add_middleware(cls)
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up
+        for _ in range(100):
+            await client.get("/")
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get("/")
+            assert response.status_code == 200
+        return (time.perf_counter() - start) / requests
+
+
+async def main(requests: int):
+    logging.basicConfig(level=logging.WARNING)
+    baseline = await run(build_app([]), requests)
+    legacy = await run(
+        build_app([LegacyLoggingMiddleware, LegacyRateLimitMiddleware, LegacyAuthMiddleware]),
+        requests
+    )
+    asgi = await run(build_app([LoggingMiddleware, RateLimitMiddleware, AuthMiddleware]), requests)
+
+    print(f"{'stack':<22}{'us/request':>12}{'overhead us':>14}")
+    for name, value in [("no middleware", baseline), ("BaseHTTPMiddleware", legacy), ("pure ASGI", asgi)]:
+        print(f"{name:<22}{value * 1e6:>12.1f}{(value - baseline) * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
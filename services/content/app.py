@@ -1,10 +1,25 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Any, List
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Dict, Any, List, Optional
+import asyncio
+import os
 import uuid
 import random
+import orjson
 
-app = FastAPI(title="Content Service", version="1.0.0")
+import seo
+from bulk import BulkStreamingResponse, ndjson_lines, run_bulk
+from template_registry import TemplateRegistry
+
+BULK_CONCURRENCY = int(os.getenv("CONTENT_BULK_CONCURRENCY", "8"))
+SEO_BATCH_MAX_DOCUMENTS = int(os.getenv("SEO_BATCH_MAX_DOCUMENTS", "1000"))
+
+# Generation templates and catalogs are compiled once at startup; see templates/
+TEMPLATES = TemplateRegistry.load()
+
+app = FastAPI(title="Content Service", version="1.0.0", default_response_class=ORJSONResponse)
 
 class ContentRequest(BaseModel):
     content_type: str
@@ -16,6 +31,16 @@ class SEOOptimizationRequest(BaseModel):
     target_keywords: List[str]
     content_type: str = "product"
 
+class SEODocument(BaseModel):
+    id: Optional[str] = None
+    content: str
+    target_keywords: Optional[List[str]] = None
+    content_type: str = "product"
+
+class SEOBatchRequest(BaseModel):
+    documents: List[SEODocument]
+    target_keywords: List[str] = []
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -28,36 +53,7 @@ async def generate_content(request: ContentRequest):
         content_type = request.content_type.lower()
         inputs = request.inputs
         
-        # Generate different types of content based on content_type
-        if content_type == "product_description":
-            product_name = inputs.get("product_name", "Product")
-            category = inputs.get("category", "General")
-            content = f"Discover the amazing {product_name}. This premium {category.lower()} product offers exceptional quality and innovative features that will exceed your expectations. Perfect for modern lifestyles, it combines style with functionality."
-        
-        elif content_type == "store_description":
-            business_name = inputs.get("business_name", "Our Store")
-            industry = inputs.get("industry", "retail")
-            content = f"Welcome to {business_name}, your premier destination for high-quality {industry} products. We're committed to providing exceptional customer service and the best products in the market."
-        
-        elif content_type == "meta_description":
-            page_title = inputs.get("page_title", "Page")
-            content = f"Explore {page_title} - Find the best products and services. Shop with confidence and enjoy fast shipping, secure payments, and excellent customer support."
-        
-        elif content_type == "blog_post":
-            topic = inputs.get("topic", "E-commerce")
-            content = f"# The Future of {topic}\n\nIn today's rapidly evolving digital landscape, {topic.lower()} continues to transform how businesses operate and serve their customers. This comprehensive guide explores the latest trends and strategies."
-        
-        elif content_type == "product_title":
-            category = inputs.get("category", "Product")
-            features = inputs.get("features", ["Quality", "Modern"])
-            content = f"Premium {category} - {', '.join(features)}"
-        
-        elif content_type == "category_description":
-            category = inputs.get("category", "Category")
-            content = f"Explore our curated collection of {category.lower()} products. From premium selections to everyday essentials, we offer the best quality and value for your needs."
-        
-        else:
-            content = f"Custom {content_type} content generated based on your requirements. This content is optimized for your specific needs and target audience."
+        content = TEMPLATES.render(content_type, inputs)
         
         return {
             "content": content,
@@ -85,99 +81,64 @@ async def generate_content(request: ContentRequest):
 async def optimize_seo(request: SEOOptimizationRequest):
     """Optimize content for SEO"""
     try:
-        content = request.content
-        target_keywords = request.target_keywords
-        
-        # Simple keyword optimization simulation
-        optimized_content = content
-        keyword_density = {}
-        
-        for keyword in target_keywords:
-            if keyword.lower() not in content.lower():
-                optimized_content += f" {keyword}."
-            keyword_density[keyword] = round(random.uniform(1.0, 3.0), 2)
-        
-        return {
-            "optimized_content": optimized_content,
-            "seo_score": round(random.uniform(70, 95), 1),
-            "keyword_density": keyword_density,
-            "suggestions": [
-                "Add more relevant keywords",
-                "Include internal links",
-                "Optimize meta descriptions",
-                "Improve heading structure",
-                "Add alt text to images"
-            ],
-            "content_length": len(optimized_content),
-            "readability_improvement": round(random.uniform(5, 15), 1)
-        }
-        
+        return seo.optimize(request.content, request.target_keywords, request.content_type)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"SEO optimization failed: {str(e)}")
 
-@app.post("/generate-bulk")
-async def generate_bulk_content(requests: List[ContentRequest]):
-    """Generate multiple content pieces in bulk"""
+@app.post("/optimize-seo/batch")
+async def optimize_seo_batch(request: SEOBatchRequest):
+    """Analyze many documents in one call; documents without keywords use the shared target_keywords"""
+    if len(request.documents) > SEO_BATCH_MAX_DOCUMENTS:
+        raise HTTPException(status_code=413, detail=f"At most {SEO_BATCH_MAX_DOCUMENTS} documents per batch")
     try:
-        results = []
-        for request in requests:
-            result = await generate_content(request)
-            results.append({
-                "request": request.dict(),
-                "result": result
-            })
-        
-        return {
-            "results": results,
-            "total_generated": len(results),
-            "success_rate": len(results) / len(requests) if requests else 0
-        }
-        
+        # CPU-bound: keep the event loop free while a large batch is scored
+        results = await run_in_threadpool(
+            seo.analyze_batch, [document.model_dump() for document in request.documents], request.target_keywords
+        )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Bulk content generation failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"SEO analysis failed: {str(e)}")
+    return {
+        "results": results,
+        "total": len(results),
+        "average_seo_score": round(sum(result["seo_score"] for result in results) / len(results), 1) if results else 0
+    }
+
+async def _generate_bulk_item(item: Any) -> Dict[str, Any]:
+    try:
+        content_request = ContentRequest.model_validate(orjson.loads(item) if isinstance(item, bytes) else item)
+    except (orjson.JSONDecodeError, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bulk item: {str(e)}")
+    return await generate_content(content_request)
+
+@app.post("/generate-bulk")
+async def generate_bulk_content(request: Request):
+    """Generate multiple content pieces in bulk, streamed as NDJSON as each one completes
+
+    The body is a JSON array of content requests, or NDJSON (one request per
+    line, Content-Type: application/x-ndjson) for large catalogs.
+    """
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        body_read = asyncio.Event()
+        return BulkStreamingResponse(
+            run_bulk(ndjson_lines(request, body_read), _generate_bulk_item, BULK_CONCURRENCY),
+            body_read,
+            media_type="application/x-ndjson"
+        )
+    try:
+        items = orjson.loads(await request.body())
+    except orjson.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {str(e)}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Bulk body must be a JSON array of content requests")
+    return StreamingResponse(
+        run_bulk(items, _generate_bulk_item, BULK_CONCURRENCY),
+        media_type="application/x-ndjson"
+    )
 
 @app.get("/templates/{content_type}")
 async def get_content_templates(content_type: str):
     """Get content templates for a specific type"""
-    templates = {
-        "product_description": [
-            {
-                "id": "template_1",
-                "name": "Feature-focused",
-                "template": "Discover the amazing {product_name}. This premium product offers {feature_1}, {feature_2}, and {feature_3} that will exceed your expectations."
-            },
-            {
-                "id": "template_2", 
-                "name": "Benefit-focused",
-                "template": "Transform your experience with {product_name}. Enjoy {benefit_1}, {benefit_2}, and {benefit_3} with this innovative solution."
-            }
-        ],
-        "store_description": [
-            {
-                "id": "template_1",
-                "name": "Professional",
-                "template": "Welcome to {business_name}, your premier destination for high-quality {industry} products. We're committed to providing exceptional customer service."
-            },
-            {
-                "id": "template_2",
-                "name": "Casual",
-                "template": "Hey there! Welcome to {business_name} where we bring you the best {industry} products with a smile and great service."
-            }
-        ],
-        "meta_description": [
-            {
-                "id": "template_1",
-                "name": "Standard",
-                "template": "Explore {page_title} - Find the best products and services. Shop with confidence and enjoy fast shipping, secure payments."
-            }
-        ]
-    }
-    
-    return {
-        "content_type": content_type,
-        "templates": templates.get(content_type, []),
-        "total_templates": len(templates.get(content_type, []))
-    }
+    return Response(content=TEMPLATES.catalog_response(content_type), media_type="application/json")
 
 @app.post("/validate-content")
 async def validate_content(content: str, content_type: str):
@@ -0,0 +1,130 @@
+"""
+Bounded-concurrency bulk execution with streamed results
+Items are pulled from an (async) iterable by a feeder into a small work queue
+and processed by a fixed pool of workers. Each result is written out as one
+NDJSON line as soon as it completes, so a catalog of thousands of items never
+holds more than a few queue slots of requests or results in memory. A slow
+client backs up the result queue, which in turn pauses the workers and the
+feeder instead of buffering output.
+
+Every item succeeds or fails on its own; the final line summarizes the run.
+"""
+
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, Union
+
+import orjson
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+# Processes one raw item and returns its result; any exception fails only that item
+BulkHandler = Callable[[Any], Awaitable[Dict[str, Any]]]
+
+_DONE = object()
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, HTTPException):
+        return str(error.detail)
+    return str(error) or type(error).__name__
+
+
+async def _aiter(items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def ndjson_lines(request: Request, body_read: asyncio.Event) -> AsyncIterator[bytes]:
+    """Lines of an NDJSON body, read as it arrives rather than buffered whole"""
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+    body_read.set()
+
+
+class BulkStreamingResponse(StreamingResponse):
+    """Streaming response whose content reads the request body while it streams
+
+    Starlette's disconnect listener calls receive() from the start and would
+    swallow the body chunks, so it only starts once body_read is set.
+    """
+
+    def __init__(self, content: AsyncIterable[bytes], body_read: asyncio.Event, **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self.body_read = body_read
+
+    async def listen_for_disconnect(self, receive):
+        await self.body_read.wait()
+        await super().listen_for_disconnect(receive)
+
+
+async def run_bulk(
+    items: Union[Iterable[Any], AsyncIterable[Any]],
+    handler: BulkHandler,
+    concurrency: int
+) -> AsyncIterator[bytes]:
+    """NDJSON: one "result" line per item in completion order, then a "done" summary"""
+    work: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 4)
+
+    async def feed():
+        try:
+            index = 0
+            async for item in _aiter(items):
+                await work.put((index, item))
+                index += 1
+        except Exception as e:
+            # The request body could not be read any further; items already queued still complete
+            await results.put({"type": "error", "error": f"Could not read bulk request: {_error_message(e)}"})
+        # Not in a finally: once cancelled nobody drains the queue, and the put would block forever
+        for _ in range(concurrency):
+            await work.put(_DONE)
+
+    async def work_loop():
+        while True:
+            entry = await work.get()
+            if entry is _DONE:
+                await results.put(_DONE)
+                return
+            index, item = entry
+            try:
+                line = {"type": "result", "index": index, "status": "succeeded", "result": await handler(item)}
+            except Exception as e:
+                line = {"type": "result", "index": index, "status": "failed", "error": _error_message(e)}
+            await results.put(line)
+
+    tasks = [asyncio.create_task(feed())] + [asyncio.create_task(work_loop()) for _ in range(concurrency)]
+    total = succeeded = 0
+    running = concurrency
+    try:
+        while running:
+            line = await results.get()
+            if line is _DONE:
+                running -= 1
+                continue
+            if line["type"] == "result":
+                total += 1
+                succeeded += line["status"] == "succeeded"
+            yield orjson.dumps(line) + b"\n"
+        yield orjson.dumps({
+            "type": "done",
+            "total": total,
+            "total_generated": succeeded,
+            "failed": total - succeeded,
+            "success_rate": succeeded / total if total else 0
+        }) + b"\n"
+    finally:
+        # Also reached when the client disconnects: stop feeding and drop in-flight items
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
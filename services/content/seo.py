@@ -0,0 +1,347 @@
+"""
+SEO analysis
+A document is tokenized once by a single regex that yields words, sentence
+breaks and HTML tags. Each word is fed to an Aho-Corasick automaton built over
+the word sequences of all target keywords, so every keyword (including
+multi-word and overlapping ones, e.g. "shoes" inside "running shoes") is
+counted in one pass, on whole-word boundaries. The same pass counts sentences
+and syllables for Flesch reading ease. Headings (Markdown "#" lines and HTML
+<h1>-<h6>) are collected for the structure check.
+
+Automata are cached per keyword set, so a batch that shares its keywords
+builds one automaton for all documents.
+
+Words are runs of Unicode letters and digits, so accented and non-Latin words
+count as one word each; text is NFC-normalized first so composed and
+decomposed accents match the same keywords.
+
+services/content/seo.py and services/llm/seo.py are identical copies: each
+service image is built from its own directory.
+"""
+
+import re
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(
+    r"(?P<tag></?(?P<tag_name>[a-z][a-z0-9]*)\b[^>]*>)"
+    r"|(?P<word>[^\W_]+(?:['’][^\W\d_]+)*)"
+    r"|(?P<end>[.!?]+|\n)",
+    re.IGNORECASE,
+)
+WORD_PATTERN = re.compile(r"[^\W_]+(?:['’][^\W\d_]+)*")
+HEADING_PATTERN = re.compile(
+    r"^(?P<hashes>#{1,6})[ \t]+(?P<md>.+?)[ \t#]*$|<h(?P<level>[1-6])\b[^>]*>(?P<html>.*?)</h(?P=level)>",
+    re.MULTILINE | re.IGNORECASE | re.DOTALL,
+)
+STRIP_TAGS_PATTERN = re.compile(r"<[^>]+>")
+VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+# Closing these tags ends a sentence even without a full stop
+BLOCK_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "div", "br", "title", "td", "th"}
+
+# Keyword density (percent of words) that reads naturally; above the max looks like stuffing
+DENSITY_MIN = 0.5
+DENSITY_MAX = 3.0
+# Copy shorter than this does not need headings
+HEADINGS_MIN_WORDS = 150
+MIN_WORDS = {
+    "meta_description": 15,
+    "product_title": 3,
+    "product": 50,
+    "product_description": 50,
+    "category_description": 40,
+    "store_description": 40,
+    "blog_post": 300,
+    "blog": 300,
+}
+DEFAULT_MIN_WORDS = 50
+# Share of the 0-100 score per check
+WEIGHTS = {"keywords": 30, "density": 20, "readability": 20, "headings": 15, "length": 15}
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFC", text)
+
+
+def words(text: str) -> List[str]:
+    return WORD_PATTERN.findall(normalize(text).lower())
+
+
+def _strip_accents(word: str) -> str:
+    return "".join(char for char in unicodedata.normalize("NFKD", word) if not unicodedata.combining(char))
+
+
+def count_syllables(word: str) -> int:
+    """Vowel-group estimate with a silent final "e"; good enough for Flesch"""
+    if word.isdigit():
+        return 1
+    plain = _strip_accents(word)
+    syllables = len(VOWEL_GROUPS.findall(plain))
+    # An accented final "é" is sounded, so only a plain final "e" can be silent
+    if word.endswith("e") and not plain.endswith(("le", "ee")) and syllables > 1:
+        syllables -= 1
+    return max(syllables, 1)
+
+
+def reading_level(reading_ease: float) -> str:
+    if reading_ease >= 80:
+        return "easy"
+    if reading_ease >= 60:
+        return "standard"
+    if reading_ease >= 30:
+        return "difficult"
+    return "very difficult"
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over word tokens: all keywords matched in one pass over a document"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self.lengths: List[int] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for keyword in dict.fromkeys(keyword.strip() for keyword in keywords if keyword.strip()):
+            tokens = words(keyword)
+            index = len(self.keywords)
+            self.keywords.append(keyword)
+            self.lengths.append(len(tokens))
+            if not tokens:
+                continue
+            state = 0
+            for token in tokens:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[state][token] = next_state
+                state = next_state
+            self._out[state].append(index)
+        self._link()
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                # A match ending here also ends every keyword that is a suffix of it
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def step(self, state: int, token: str) -> int:
+        goto = self._goto
+        while state and token not in goto[state]:
+            state = self._fail[state]
+        return goto[state].get(token, 0)
+
+    def matches(self, state: int) -> List[int]:
+        return self._out[state]
+
+
+@lru_cache(maxsize=256)
+def _automaton(keywords: Tuple[str, ...]) -> KeywordAutomaton:
+    return KeywordAutomaton(keywords)
+
+
+def keyword_automaton(keywords: Iterable[str]) -> KeywordAutomaton:
+    return _automaton(tuple(keywords))
+
+
+def headings(content: str) -> List[Dict[str, Any]]:
+    outline = []
+    for match in HEADING_PATTERN.finditer(content):
+        if match.group("hashes"):
+            level, text = len(match.group("hashes")), match.group("md")
+        else:
+            level, text = int(match.group("level")), STRIP_TAGS_PATTERN.sub("", match.group("html"))
+        outline.append({"level": level, "text": " ".join(text.split())})
+    return outline
+
+
+def _heading_issues(outline: List[Dict[str, Any]], word_count: int, keywords: List[str]) -> List[str]:
+    if not outline:
+        return ["missing_headings"] if word_count >= HEADINGS_MIN_WORDS else []
+    issues = []
+    h1_count = sum(1 for heading in outline if heading["level"] == 1)
+    if h1_count == 0:
+        issues.append("missing_h1")
+    elif h1_count > 1:
+        issues.append("multiple_h1")
+    previous = 0
+    for heading in outline:
+        if previous and heading["level"] > previous + 1:
+            issues.append("skipped_heading_level")
+            break
+        previous = heading["level"]
+    if keywords:
+        heading_words = set()
+        for heading in outline:
+            heading_words.update(words(heading["text"]))
+        if not any(set(words(keyword)) <= heading_words for keyword in keywords if words(keyword)):
+            issues.append("keywords_not_in_headings")
+    return issues
+
+
+def analyze(content: str, target_keywords: List[str], content_type: str = "product") -> Dict[str, Any]:
+    """Keyword counts and density, heading structure, readability and an overall 0-100 score"""
+    content = normalize(content)
+    automaton = keyword_automaton(target_keywords)
+    counts = [0] * len(automaton.keywords)
+    word_count = sentence_count = syllable_count = 0
+    words_in_sentence = 0
+    state = 0
+
+    for match in TOKEN_PATTERN.finditer(content):
+        word = match.group("word")
+        if word is not None:
+            word = word.lower()
+            word_count += 1
+            words_in_sentence += 1
+            syllable_count += count_syllables(word)
+            state = automaton.step(state, word)
+            for index in automaton.matches(state):
+                counts[index] += 1
+            continue
+        if match.group("tag") is not None and match.group("tag_name").lower() not in BLOCK_TAGS:
+            continue
+        # Sentence (or block) boundary: keywords do not match across it
+        state = 0
+        if words_in_sentence:
+            sentence_count += 1
+            words_in_sentence = 0
+    if words_in_sentence:
+        sentence_count += 1
+
+    if word_count:
+        reading_ease = 206.835 - 1.015 * (word_count / sentence_count) - 84.6 * (syllable_count / word_count)
+    else:
+        reading_ease = 0.0
+    reading_ease = round(min(max(reading_ease, 0.0), 100.0), 1)
+
+    keyword_counts = dict(zip(automaton.keywords, counts))
+    keyword_density = {
+        keyword: round(count * length / word_count * 100, 2) if word_count else 0.0
+        for keyword, count, length in zip(automaton.keywords, counts, automaton.lengths)
+    }
+    missing_keywords = [keyword for keyword, count in keyword_counts.items() if not count]
+    outline = headings(content)
+    heading_issues = _heading_issues(outline, word_count, automaton.keywords)
+    min_words = MIN_WORDS.get(content_type.lower(), DEFAULT_MIN_WORDS)
+
+    checks = {
+        "keywords": 1 - len(missing_keywords) / len(keyword_counts) if keyword_counts else 1.0,
+        "density": _density_score(keyword_density.values()),
+        "readability": min(reading_ease / 60, 1.0),
+        "headings": max(1 - 0.35 * len(heading_issues), 0.0),
+        "length": min(word_count / min_words, 1.0),
+    }
+    if not word_count:
+        # Nothing to rank: the checks that pass vacuously must not add up to a score
+        checks = {name: 0.0 for name in checks}
+    score = sum(WEIGHTS[name] * value for name, value in checks.items())
+
+    return {
+        "seo_score": round(score, 1),
+        "word_count": word_count,
+        "sentence_count": sentence_count,
+        "syllable_count": syllable_count,
+        "flesch_reading_ease": reading_ease,
+        "reading_level": reading_level(reading_ease),
+        "keyword_counts": keyword_counts,
+        "keyword_density": keyword_density,
+        "missing_keywords": missing_keywords,
+        "headings": {
+            "outline": outline,
+            "counts": {f"h{level}": sum(1 for heading in outline if heading["level"] == level) for level in range(1, 7)},
+            "issues": heading_issues,
+        },
+        "checks": {name: round(value, 2) for name, value in checks.items()},
+        "suggestions": _suggestions(keyword_density, missing_keywords, heading_issues, reading_ease, word_count, min_words),
+    }
+
+
+def _density_score(densities: Iterable[float]) -> float:
+    scores = []
+    for density in densities:
+        if density < DENSITY_MIN:
+            scores.append(density / DENSITY_MIN)
+        elif density <= DENSITY_MAX:
+            scores.append(1.0)
+        else:
+            scores.append(max(1 - (density - DENSITY_MAX) / DENSITY_MAX, 0.0))
+    return sum(scores) / len(scores) if scores else 1.0
+
+
+def _suggestions(
+    keyword_density: Dict[str, float],
+    missing_keywords: List[str],
+    heading_issues: List[str],
+    reading_ease: float,
+    word_count: int,
+    min_words: int
+) -> List[str]:
+    suggestions = []
+    if missing_keywords:
+        suggestions.append(f"Add missing keywords: {', '.join(missing_keywords)}")
+    stuffed = [keyword for keyword, density in keyword_density.items() if density > DENSITY_MAX]
+    if stuffed:
+        suggestions.append(f"Reduce repetition of: {', '.join(stuffed)} (keep density under {DENSITY_MAX:g}%)")
+    sparse = [keyword for keyword, density in keyword_density.items() if 0 < density < DENSITY_MIN]
+    if sparse:
+        suggestions.append(f"Use these keywords more often: {', '.join(sparse)}")
+    if "missing_headings" in heading_issues:
+        suggestions.append("Break long content up with headings")
+    if "missing_h1" in heading_issues:
+        suggestions.append("Add a single H1 heading")
+    if "multiple_h1" in heading_issues:
+        suggestions.append("Use only one H1 heading")
+    if "skipped_heading_level" in heading_issues:
+        suggestions.append("Do not skip heading levels (e.g. H1 straight to H3)")
+    if "keywords_not_in_headings" in heading_issues:
+        suggestions.append("Include a target keyword in a heading")
+    if word_count and reading_ease < 60:
+        suggestions.append("Use shorter sentences and simpler words to improve readability")
+    if word_count < min_words:
+        suggestions.append(f"Expand the content to at least {min_words} words")
+    return suggestions
+
+
+def optimize(content: str, target_keywords: List[str], content_type: str = "product") -> Dict[str, Any]:
+    """Analysis plus content with missing keywords appended"""
+    analysis = analyze(content, target_keywords, content_type)
+    optimized_content = content
+    readability_improvement = 0.0
+    if analysis["missing_keywords"]:
+        optimized_content = content + "".join(f" {keyword}." for keyword in analysis["missing_keywords"])
+        optimized = analyze(optimized_content, target_keywords, content_type)
+        readability_improvement = round(optimized["flesch_reading_ease"] - analysis["flesch_reading_ease"], 1)
+    return {
+        "optimized_content": optimized_content,
+        "seo_score": analysis["seo_score"],
+        "keyword_density": analysis["keyword_density"],
+        "suggestions": analysis["suggestions"],
+        "content_length": len(optimized_content),
+        "readability_improvement": readability_improvement,
+        "analysis": analysis,
+    }
+
+
+def analyze_batch(documents: List[Dict[str, Any]], target_keywords: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Analyze many documents; each may bring its own keywords or use the shared ones"""
+    results = []
+    for document in documents:
+        keywords = document.get("target_keywords") or target_keywords or []
+        analysis = analyze(document["content"], keywords, document.get("content_type") or "product")
+        if document.get("id") is not None:
+            analysis = {"id": document["id"], **analysis}
+        results.append(analysis)
+    return results
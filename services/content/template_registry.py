@@ -0,0 +1,131 @@
+"""
+Content template registry
+Each file templates/{content_type}.json defines one content type:
+
+    {
+      "template": "Premium {category} - {features|join}",
+      "defaults": {"category": "Product", "features": ["Quality", "Modern"]},
+      "catalog": [{"id": "...", "name": "...", "template": "..."}]
+    }
+
+"template" is what /generate renders, "defaults" fill inputs the request left
+out, and "catalog" is what /templates/{content_type} lists. _default.json is
+used for content types without a file. Fields take an optional filter
+({name|lower}, {name|upper}, {name|title}, {name|join}).
+
+Files are read and compiled once at startup: a compiled template is a tuple of
+(literal, field, filter) parts, so rendering is a single pass and a join, and
+a bad placeholder fails the service on boot instead of on a request. Adding a
+content type is adding a file.
+"""
+
+import os
+from pathlib import Path
+from string import Formatter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import orjson
+
+TEMPLATES_DIR = Path(os.getenv("CONTENT_TEMPLATES_DIR", Path(__file__).parent / "templates"))
+DEFAULT_TEMPLATE = "_default"
+
+
+def _join(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value)
+    return str(value)
+
+
+FILTERS: Dict[str, Callable[[Any], str]] = {
+    "lower": lambda value: str(value).lower(),
+    "upper": lambda value: str(value).upper(),
+    "title": lambda value: str(value).title(),
+    "join": _join,
+}
+
+
+class CompiledTemplate:
+    """A template parsed once into literal text and field lookups"""
+
+    __slots__ = ("source", "defaults", "fields", "_parts")
+
+    def __init__(self, source: str, defaults: Optional[Dict[str, Any]] = None):
+        self.source = source
+        self.defaults = defaults or {}
+        parts: List[Tuple[str, Optional[str], Callable[[Any], str]]] = []
+        for literal, field, format_spec, conversion in Formatter().parse(source):
+            if field is None:
+                parts.append((literal, None, str))
+                continue
+            if format_spec or conversion:
+                raise ValueError(f"Template field {{{field}}} may only use |filters, not format specs")
+            name, _, filter_name = field.partition("|")
+            if not name:
+                raise ValueError(f"Template {source!r} has an empty field")
+            if filter_name and filter_name not in FILTERS:
+                raise ValueError(f"Unknown template filter {filter_name!r}; use one of {sorted(FILTERS)}")
+            parts.append((literal, name, FILTERS[filter_name] if filter_name else str))
+        self._parts = tuple(parts)
+        self.fields = tuple(name for _, name, _ in self._parts if name is not None)
+
+    def render(self, inputs: Mapping[str, Any], **context: Any) -> str:
+        """Fill fields from context, then inputs, then the template's defaults"""
+        defaults = self.defaults
+        chunks = []
+        for literal, name, transform in self._parts:
+            chunks.append(literal)
+            if name is None:
+                continue
+            if name in context:
+                value = context[name]
+            elif name in inputs:
+                value = inputs[name]
+            else:
+                value = defaults.get(name, "")
+            chunks.append(transform(value))
+        return "".join(chunks)
+
+
+class TemplateRegistry:
+    """Compiled generation templates and pre-serialized catalog responses, keyed by content type"""
+
+    def __init__(self, templates: Dict[str, CompiledTemplate], catalogs: Dict[str, List[Dict[str, Any]]]):
+        if DEFAULT_TEMPLATE not in templates:
+            raise ValueError(f"Template registry needs a {DEFAULT_TEMPLATE} template")
+        self.fallback = templates.pop(DEFAULT_TEMPLATE)
+        self.templates = templates
+        self.catalog_responses = {
+            content_type: catalog_payload(content_type, catalog) for content_type, catalog in catalogs.items()
+        }
+
+    @classmethod
+    def load(cls, directory: Path = TEMPLATES_DIR) -> "TemplateRegistry":
+        templates: Dict[str, CompiledTemplate] = {}
+        catalogs: Dict[str, List[Dict[str, Any]]] = {}
+        for path in sorted(Path(directory).glob("*.json")):
+            content_type = path.stem
+            try:
+                spec = orjson.loads(path.read_bytes())
+                templates[content_type] = CompiledTemplate(spec["template"], spec.get("defaults"))
+            except (KeyError, ValueError) as e:
+                raise ValueError(f"Invalid content template {path}: {e}") from e
+            if "catalog" in spec:
+                catalogs[content_type] = spec["catalog"]
+        return cls(templates, catalogs)
+
+    def get(self, content_type: str) -> CompiledTemplate:
+        return self.templates.get(content_type, self.fallback)
+
+    def render(self, content_type: str, inputs: Mapping[str, Any]) -> str:
+        return self.get(content_type).render(inputs, content_type=content_type)
+
+    def catalog_response(self, content_type: str) -> bytes:
+        return self.catalog_responses.get(content_type) or catalog_payload(content_type, [])
+
+
+def catalog_payload(content_type: str, templates: List[Dict[str, Any]]) -> bytes:
+    return orjson.dumps({
+        "content_type": content_type,
+        "templates": templates,
+        "total_templates": len(templates)
+    })
@@ -1,11 +1,13 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any, List
 import uuid
 import random
 from datetime import datetime, timedelta
+import orjson
 
-app = FastAPI(title="Integration Service", version="1.0.0")
+app = FastAPI(title="Integration Service", version="1.0.0", default_response_class=ORJSONResponse)
 
 class DeployStoreRequest(BaseModel):
     store_id: str
@@ -23,62 +25,71 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "integration"}
 
+# Constant catalog payloads, serialized once at startup
+PLATFORMS_RESPONSE = orjson.dumps({
+    "platforms": [
+        {
+            "id": "nextbasket",
+            "name": "Next Basket",
+            "description": "AI-powered e-commerce platform for modern businesses",
+            "features": ["AI optimization", "Smart pricing", "Automated marketing", "All-in-one commerce"],
+            "pricing": {"self": 19, "pro": 99},
+            "rating": 4.9,
+            "setup_time": "3-5 minutes"
+        }
+    ],
+    "total": 1
+})
+
+PLATFORM_INTEGRATIONS = {
+    "nextbasket": [
+        {
+            "id": "stripe",
+            "name": "Stripe",
+            "type": "payment",
+            "description": "Online payment processing",
+            "setup_difficulty": "easy",
+            "features": ["Credit cards", "Digital wallets", "International payments"]
+        },
+        {
+            "id": "mailchimp",
+            "name": "Mailchimp",
+            "type": "marketing",
+            "description": "Email marketing automation",
+            "setup_difficulty": "easy",
+            "features": ["Email campaigns", "Automation", "Analytics"]
+        },
+        {
+            "id": "google_analytics",
+            "name": "Google Analytics",
+            "type": "analytics",
+            "description": "Web analytics service",
+            "setup_difficulty": "medium",
+            "features": ["Traffic analysis", "Conversion tracking", "E-commerce tracking"]
+        }
+    ]
+}
+
+PLATFORM_INTEGRATIONS_RESPONSES = {
+    platform_id: orjson.dumps({
+        "platform_id": platform_id,
+        "integrations": integrations,
+        "total": len(integrations)
+    })
+    for platform_id, integrations in PLATFORM_INTEGRATIONS.items()
+}
+
 @app.get("/platforms")
 async def get_available_platforms():
     """Get available e-commerce platforms"""
-    return {
-        "platforms": [
-            {
-                "id": "nextbasket",
-                "name": "Next Basket",
-                "description": "AI-powered e-commerce platform for modern businesses",
-                "features": ["AI optimization", "Smart pricing", "Automated marketing", "All-in-one commerce"],
-                "pricing": {"self": 19, "pro": 99},
-                "rating": 4.9,
-                "setup_time": "3-5 minutes"
-            }
-        ],
-        "total": 1
-    }
+    return Response(content=PLATFORMS_RESPONSE, media_type="application/json")
 
 @app.get("/integrations/{platform_id}")
 async def get_platform_integrations(platform_id: str):
     """Get available integrations for a platform"""
-    integrations = {
-        "nextbasket": [
-            {
-                "id": "stripe",
-                "name": "Stripe",
-                "type": "payment",
-                "description": "Online payment processing",
-                "setup_difficulty": "easy",
-                "features": ["Credit cards", "Digital wallets", "International payments"]
-            },
-            {
-                "id": "mailchimp",
-                "name": "Mailchimp",
-                "type": "marketing",
-                "description": "Email marketing automation",
-                "setup_difficulty": "easy",
-                "features": ["Email campaigns", "Automation", "Analytics"]
-            },
-            {
-                "id": "google_analytics",
-                "name": "Google Analytics",
-                "type": "analytics",
-                "description": "Web analytics service",
-                "setup_difficulty": "medium",
-                "features": ["Traffic analysis", "Conversion tracking", "E-commerce tracking"]
-            }
-        ]
-    }
-    if platform_id not in integrations:
+    if platform_id not in PLATFORM_INTEGRATIONS_RESPONSES:
         raise HTTPException(status_code=404, detail="Platform not found")
-    return {
-        "platform_id": platform_id,
-        "integrations": integrations[platform_id],
-        "total": len(integrations[platform_id])
-    }
+    return Response(content=PLATFORM_INTEGRATIONS_RESPONSES[platform_id], media_type="application/json")
 
 @app.post("/deploy-store")
 async def deploy_store(request: DeployStoreRequest):
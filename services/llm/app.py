@@ -1,10 +1,39 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from prometheus_client import make_asgi_app
 from pydantic import BaseModel
-from typing import Dict, Any, List
-import uuid
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+import asyncio
+import hashlib
+import os
+import re
 import random
+import orjson
 
-app = FastAPI(title="LLM Service", version="1.0.0")
+from batching import GenerationBackend, GenerationScheduler, load_backend
+from semantic_cache import SemanticCache
+import seo
+
+# Backend: "local" or "package.module:ClassName"; LLM_BACKEND_SEED makes the local backend deterministic
+LLM_BACKEND = os.getenv("LLM_BACKEND", "local")
+LLM_BACKEND_SEED = os.getenv("LLM_BACKEND_SEED")
+LLM_BATCH_MAX_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", "16"))
+LLM_BATCH_MAX_WAIT = float(os.getenv("LLM_BATCH_MAX_WAIT_MS", "10")) / 1000
+LLM_BATCH_MAX_CONCURRENCY = int(os.getenv("LLM_BATCH_MAX_CONCURRENCY", "4"))
+# Near-duplicate content reuse; memory is about CAPACITY x DIM x 4 bytes (20 MB by default)
+LLM_SEMANTIC_CACHE_ENABLED = os.getenv("LLM_SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+LLM_SEMANTIC_CACHE_DIM = int(os.getenv("LLM_SEMANTIC_CACHE_DIM", "1024"))
+LLM_SEMANTIC_CACHE_CAPACITY = int(os.getenv("LLM_SEMANTIC_CACHE_CAPACITY", "5000"))
+LLM_SEMANTIC_CACHE_THRESHOLD = float(os.getenv("LLM_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+LLM_SEMANTIC_CACHE_TTL = float(os.getenv("LLM_SEMANTIC_CACHE_TTL", "3600"))
+SEO_BATCH_MAX_DOCUMENTS = int(os.getenv("SEO_BATCH_MAX_DOCUMENTS", "1000"))
+
+# Words with their trailing whitespace, so the deltas concatenate back to the content
+TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+# Optional simulated per-token latency for freshly generated streams (cache hits are never delayed)
+STREAM_TOKEN_DELAY = float(os.getenv("LLM_STREAM_TOKEN_DELAY", "0"))
 
 class ProductGenerationRequest(BaseModel):
     categories: List[str]
@@ -15,132 +44,249 @@ class ContentGenerationRequest(BaseModel):
     inputs: Dict[str, Any]
     options: Dict[str, Any] = {}
 
+class SEODocument(BaseModel):
+    id: Optional[str] = None
+    content: str
+    target_keywords: Optional[List[str]] = None
+    content_type: str = "product"
+
+class SEOBatchRequest(BaseModel):
+    documents: List[SEODocument]
+    target_keywords: List[str] = []
+
+class LocalBackend(GenerationBackend):
+    """Template-based stand-in for a model backend
+
+    With a seed, each result depends only on the seed and the request, so
+    tests get the same output for the same input regardless of batching.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+
+    def _rng(self, request: BaseModel) -> random.Random:
+        if self.seed is None:
+            return random.Random()
+        digest = hashlib.sha256(orjson.dumps(request.model_dump(), option=orjson.OPT_SORT_KEYS)).digest()
+        return random.Random(self.seed ^ int.from_bytes(digest[:8], "big"))
+
+    async def generate_products(self, requests: List[ProductGenerationRequest]) -> List[Any]:
+        return [self._build(build_products, request) for request in requests]
+
+    async def generate_content(self, requests: List[ContentGenerationRequest]) -> List[Any]:
+        return [self._build(build_content, request) for request in requests]
+
+    def _build(self, builder, request: BaseModel) -> Any:
+        # A bad request fails only its own caller, not the whole batch
+        try:
+            return builder(request, self._rng(request))
+        except Exception as e:
+            return e
+
+BACKENDS = {
+    "local": lambda: LocalBackend(int(LLM_BACKEND_SEED) if LLM_BACKEND_SEED else None),
+}
+
+scheduler = GenerationScheduler(
+    load_backend(LLM_BACKEND, BACKENDS),
+    max_batch_size=LLM_BATCH_MAX_SIZE,
+    max_wait=LLM_BATCH_MAX_WAIT,
+    max_concurrency=LLM_BATCH_MAX_CONCURRENCY,
+)
+
+semantic_cache = SemanticCache(
+    dim=LLM_SEMANTIC_CACHE_DIM,
+    capacity=LLM_SEMANTIC_CACHE_CAPACITY,
+    threshold=LLM_SEMANTIC_CACHE_THRESHOLD,
+    ttl=LLM_SEMANTIC_CACHE_TTL,
+) if LLM_SEMANTIC_CACHE_ENABLED else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    scheduler.start()
+    yield
+    await scheduler.close()
+
+app = FastAPI(title="LLM Service", version="1.0.0", default_response_class=ORJSONResponse, lifespan=lifespan)
+app.mount("/metrics", make_asgi_app())
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "llm"}
 
+def build_products(request: ProductGenerationRequest, rng: random.Random) -> Dict[str, Any]:
+    """Build the product generation payload"""
+    products = []
+    for i in range(request.count):
+        category = rng.choice(request.categories) if request.categories else "General"
+        product = {
+            "id": f"prod_{rng.getrandbits(32):08x}",
+            "name": f"Sample {category} Product {i+1}",
+            "description": f"This is a high-quality {category.lower()} product designed for modern consumers.",
+            "price": round(rng.uniform(19.99, 299.99), 2),
+            "category": category,
+            "images": [
+                f"https://images.unsplash.com/photo-{rng.randint(1000000000, 9999999999)}?w=400&h=400&fit=crop",
+                f"https://images.unsplash.com/photo-{rng.randint(1000000000, 9999999999)}?w=400&h=400&fit=crop"
+            ],
+            "features": [
+                "Premium quality materials",
+                "Modern design",
+                "Easy to use",
+                "Durable construction"
+            ],
+            "specifications": {
+                "weight": f"{rng.randint(1, 10)} kg",
+                "dimensions": f"{rng.randint(10, 50)}cm x {rng.randint(10, 50)}cm x {rng.randint(5, 20)}cm",
+                "color": rng.choice(["Black", "White", "Blue", "Red", "Green"]),
+                "material": rng.choice(["Cotton", "Polyester", "Leather", "Metal", "Plastic"])
+            },
+            "inventory": rng.randint(10, 100),
+            "rating": round(rng.uniform(3.5, 5.0), 1),
+            "reviews_count": rng.randint(5, 50)
+        }
+        products.append(product)
+    
+    return {
+        "products": products,
+        "total_generated": len(products),
+        "categories_used": request.categories,
+        "generation_time": rng.uniform(2.0, 5.0)
+    }
+
 @app.post("/generate-products")
 async def generate_products(request: ProductGenerationRequest):
     """Generate products using LLM"""
     try:
-        products = []
-        for i in range(request.count):
-            category = random.choice(request.categories) if request.categories else "General"
-            product = {
-                "id": f"prod_{uuid.uuid4().hex[:8]}",
-                "name": f"Sample {category} Product {i+1}",
-                "description": f"This is a high-quality {category.lower()} product designed for modern consumers.",
-                "price": round(random.uniform(19.99, 299.99), 2),
-                "category": category,
-                "images": [
-                    f"https://images.unsplash.com/photo-{random.randint(1000000000, 9999999999)}?w=400&h=400&fit=crop",
-                    f"https://images.unsplash.com/photo-{random.randint(1000000000, 9999999999)}?w=400&h=400&fit=crop"
-                ],
-                "features": [
-                    "Premium quality materials",
-                    "Modern design",
-                    "Easy to use",
-                    "Durable construction"
-                ],
-                "specifications": {
-                    "weight": f"{random.randint(1, 10)} kg",
-                    "dimensions": f"{random.randint(10, 50)}cm x {random.randint(10, 50)}cm x {random.randint(5, 20)}cm",
-                    "color": random.choice(["Black", "White", "Blue", "Red", "Green"]),
-                    "material": random.choice(["Cotton", "Polyester", "Leather", "Metal", "Plastic"])
-                },
-                "inventory": random.randint(10, 100),
-                "rating": round(random.uniform(3.5, 5.0), 1),
-                "reviews_count": random.randint(5, 50)
-            }
-            products.append(product)
-        
-        return {
-            "products": products,
-            "total_generated": len(products),
-            "categories_used": request.categories,
-            "generation_time": random.uniform(2.0, 5.0)
-        }
-        
+        # Returned as a response object so FastAPI skips jsonable_encoder
+        return ORJSONResponse(await scheduler.generate_products(request))
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Product generation failed: {str(e)}")
 
+def build_content(request: ContentGenerationRequest, rng: random.Random) -> Dict[str, Any]:
+    """Build the content generation payload"""
+    content_type = request.content_type.lower()
+    inputs = request.inputs
+    
+    # Generate different types of content based on content_type
+    if content_type == "product_description":
+        product_name = inputs.get("product_name", "Product")
+        content = f"Discover the amazing {product_name}. This premium product offers exceptional quality and innovative features that will exceed your expectations. Perfect for modern lifestyles, it combines style with functionality."
+    
+    elif content_type == "store_description":
+        business_name = inputs.get("business_name", "Our Store")
+        industry = inputs.get("industry", "retail")
+        content = f"Welcome to {business_name}, your premier destination for high-quality {industry} products. We're committed to providing exceptional customer service and the best products in the market."
+    
+    elif content_type == "meta_description":
+        page_title = inputs.get("page_title", "Page")
+        content = f"Explore {page_title} - Find the best products and services. Shop with confidence and enjoy fast shipping, secure payments, and excellent customer support."
+    
+    elif content_type == "blog_post":
+        topic = inputs.get("topic", "E-commerce")
+        content = f"# The Future of {topic}\n\nIn today's rapidly evolving digital landscape, {topic.lower()} continues to transform how businesses operate and serve their customers. This comprehensive guide explores the latest trends and strategies."
+    
+    else:
+        content = f"Custom {content_type} content generated based on your requirements. This content is optimized for your specific needs and target audience."
+    
+    return {
+        "content": content,
+        "alternatives": [
+            f"Alternative {content_type} content option 1",
+            f"Alternative {content_type} content option 2",
+            f"Alternative {content_type} content option 3"
+        ],
+        "quality_score": round(rng.uniform(0.85, 0.98), 2),
+        "seo_keywords": [
+            inputs.get("primary_keyword", "keyword1"),
+            inputs.get("secondary_keyword", "keyword2"),
+            "quality",
+            "premium",
+            "best"
+        ],
+        "word_count": len(content.split()),
+        "readability_score": round(rng.uniform(60, 90), 1)
+    }
+
+async def generate_content_cached(request: ContentGenerationRequest) -> Dict[str, Any]:
+    """Reuse an earlier generation for a near-identical request, else generate (batched)
+
+    options.cache=false skips the semantic cache; options.fresh_alternatives
+    generates anew and replaces the matching entry.
+    """
+    result, _ = await lookup_or_generate_content(request)
+    return result
+
+async def lookup_or_generate_content(request: ContentGenerationRequest) -> Tuple[Dict[str, Any], bool]:
+    """The content for a request, and whether it came from the semantic cache"""
+    if semantic_cache is None or request.options.get("cache", True) is False:
+        return await scheduler.generate_content(request), False
+    key = semantic_cache.key(request.content_type, request.inputs, request.options)
+    if not request.options.get("fresh_alternatives"):
+        cached = semantic_cache.lookup(key)
+        if cached is not None:
+            return cached, True
+    result = await scheduler.generate_content(request)
+    semantic_cache.store(key, result)
+    return result, False
+
 @app.post("/generate-content")
 async def generate_content(request: ContentGenerationRequest):
     """Generate AI content"""
     try:
-        content_type = request.content_type.lower()
-        inputs = request.inputs
-        
-        # Generate different types of content based on content_type
-        if content_type == "product_description":
-            product_name = inputs.get("product_name", "Product")
-            content = f"Discover the amazing {product_name}. This premium product offers exceptional quality and innovative features that will exceed your expectations. Perfect for modern lifestyles, it combines style with functionality."
-        
-        elif content_type == "store_description":
-            business_name = inputs.get("business_name", "Our Store")
-            industry = inputs.get("industry", "retail")
-            content = f"Welcome to {business_name}, your premier destination for high-quality {industry} products. We're committed to providing exceptional customer service and the best products in the market."
-        
-        elif content_type == "meta_description":
-            page_title = inputs.get("page_title", "Page")
-            content = f"Explore {page_title} - Find the best products and services. Shop with confidence and enjoy fast shipping, secure payments, and excellent customer support."
-        
-        elif content_type == "blog_post":
-            topic = inputs.get("topic", "E-commerce")
-            content = f"# The Future of {topic}\n\nIn today's rapidly evolving digital landscape, {topic.lower()} continues to transform how businesses operate and serve their customers. This comprehensive guide explores the latest trends and strategies."
-        
-        else:
-            content = f"Custom {content_type} content generated based on your requirements. This content is optimized for your specific needs and target audience."
-        
-        return {
-            "content": content,
-            "alternatives": [
-                f"Alternative {content_type} content option 1",
-                f"Alternative {content_type} content option 2",
-                f"Alternative {content_type} content option 3"
-            ],
-            "quality_score": round(random.uniform(0.85, 0.98), 2),
-            "seo_keywords": [
-                inputs.get("primary_keyword", "keyword1"),
-                inputs.get("secondary_keyword", "keyword2"),
-                "quality",
-                "premium",
-                "best"
-            ],
-            "word_count": len(content.split()),
-            "readability_score": round(random.uniform(60, 90), 1)
-        }
+        return ORJSONResponse(await generate_content_cached(request))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Content generation failed: {str(e)}")
 
+async def stream_content(result: Dict[str, Any], token_delay: float = 0.0) -> AsyncIterator[bytes]:
+    """NDJSON: a start line, one delta per token, then the remaining fields"""
+    yield orjson.dumps({"type": "start"}) + b"\n"
+    for token in TOKEN_PATTERN.findall(result["content"]):
+        if token_delay:
+            await asyncio.sleep(token_delay)
+        yield orjson.dumps({"type": "delta", "text": token}) + b"\n"
+    metadata = {key: value for key, value in result.items() if key != "content"}
+    yield orjson.dumps({"type": "done", **metadata}) + b"\n"
+
+@app.post("/generate-content/stream")
+async def generate_content_stream(request: ContentGenerationRequest):
+    """Generate AI content, streamed token by token as NDJSON"""
+    try:
+        result, cache_hit = await lookup_or_generate_content(request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Content generation failed: {str(e)}")
+    token_delay = 0.0 if cache_hit else STREAM_TOKEN_DELAY
+    return StreamingResponse(stream_content(result, token_delay), media_type="application/x-ndjson")
+
 @app.post("/optimize-seo")
 async def optimize_seo(content: str, target_keywords: List[str] = None):
     """Optimize content for SEO"""
     try:
-        optimized_content = content
-        if target_keywords:
-            # Simple keyword optimization simulation
-            for keyword in target_keywords:
-                if keyword.lower() not in content.lower():
-                    optimized_content += f" {keyword}."
-        
-        return {
-            "optimized_content": optimized_content,
-            "seo_score": round(random.uniform(70, 95), 1),
-            "keyword_density": {keyword: round(random.uniform(1.0, 3.0), 2) for keyword in (target_keywords or [])},
-            "suggestions": [
-                "Add more relevant keywords",
-                "Include internal links",
-                "Optimize meta descriptions",
-                "Improve heading structure"
-            ]
-        }
-        
+        return seo.optimize(content, target_keywords or [])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"SEO optimization failed: {str(e)}")
 
+@app.post("/optimize-seo/batch")
+async def optimize_seo_batch(request: SEOBatchRequest):
+    """Analyze many documents in one call; documents without keywords use the shared target_keywords"""
+    if len(request.documents) > SEO_BATCH_MAX_DOCUMENTS:
+        raise HTTPException(status_code=413, detail=f"At most {SEO_BATCH_MAX_DOCUMENTS} documents per batch")
+    try:
+        # CPU-bound: keep the event loop (and the generation batchers) free while a large batch is scored
+        results = await run_in_threadpool(
+            seo.analyze_batch, [document.model_dump() for document in request.documents], request.target_keywords
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"SEO analysis failed: {str(e)}")
+    return {
+        "results": results,
+        "total": len(results),
+        "average_seo_score": round(sum(result["seo_score"] for result in results) / len(results), 1) if results else 0
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=9021) 
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""
+Micro-batching for generation requests
+Concurrent calls of the same kind are gathered into one backend call: a batch
+is dispatched when it reaches max_batch_size or when its oldest request has
+waited max_wait seconds, whichever comes first. At most max_concurrency
+batches run at once; while they do, new requests keep queueing, so batches
+grow under load instead of piling up more backend calls.
+"""
+
+import asyncio
+import importlib
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+batch_size = Histogram(
+    "llm_batch_size", "Requests per backend batch", ["kind"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+batch_queue_wait = Histogram(
+    "llm_batch_queue_wait_seconds", "Time a request waited before its batch was dispatched", ["kind"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+batch_duration = Histogram(
+    "llm_batch_duration_seconds", "Backend time per batch", ["kind"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+batch_queue_depth = Gauge("llm_batch_queue_depth", "Requests waiting for a batch", ["kind"])
+batch_errors = Counter("llm_batch_errors_total", "Failed requests by kind", ["kind"])
+
+# Backend batch call: one result per request, in order; an Exception fails only its own caller
+BatchHandler = Callable[[List[Any]], Awaitable[List[Any]]]
+
+
+@dataclass
+class _Pending:
+    item: Any
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class MicroBatcher:
+    """Queues requests of one kind and runs them through the backend in batches"""
+
+    def __init__(
+        self,
+        kind: str,
+        handler: BatchHandler,
+        max_batch_size: int,
+        max_wait: float,
+        max_concurrency: int
+    ):
+        self.kind = kind
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: Deque[_Pending] = deque()
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._batches: set = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        while self._pending:
+            pending = self._pending.popleft()
+            if not pending.future.done():
+                pending.future.set_exception(RuntimeError("Generation scheduler shut down"))
+        batch_queue_depth.labels(kind=self.kind).set(0)
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one request and wait for its own result"""
+        self.start()
+        pending = _Pending(item, asyncio.get_running_loop().create_future())
+        self._pending.append(pending)
+        batch_queue_depth.labels(kind=self.kind).set(len(self._pending))
+        self._wakeup.set()
+        return await pending.future
+
+    def _take_batch(self) -> List[_Pending]:
+        batch = []
+        while self._pending and len(batch) < self.max_batch_size:
+            pending = self._pending.popleft()
+            # Callers that gave up (e.g. client disconnected) are not sent to the backend
+            if not pending.future.cancelled():
+                batch.append(pending)
+        batch_queue_depth.labels(kind=self.kind).set(len(self._pending))
+        return batch
+
+    async def _wait_for_batch(self):
+        """Wait until a batch is full or its oldest request has waited max_wait"""
+        while not self._pending:
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        deadline = self._pending[0].enqueued_at + self.max_wait
+        while len(self._pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                await self._wait_for_batch()
+            except BaseException:
+                self._slots.release()
+                raise
+            batch = self._take_batch()
+            if not batch:
+                self._slots.release()
+                continue
+            task = asyncio.create_task(self._execute(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _execute(self, batch: List[_Pending]):
+        dispatched_at = time.monotonic()
+        batch_size.labels(kind=self.kind).observe(len(batch))
+        for pending in batch:
+            batch_queue_wait.labels(kind=self.kind).observe(dispatched_at - pending.enqueued_at)
+        try:
+            results = await self.handler([pending.item for pending in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Backend returned {len(results)} results for a batch of {len(batch)}")
+        except Exception as e:
+            logger.error(f"{self.kind} batch of {len(batch)} failed: {e}")
+            results = [e] * len(batch)
+        finally:
+            batch_duration.labels(kind=self.kind).observe(time.monotonic() - dispatched_at)
+            self._slots.release()
+
+        for pending, result in zip(batch, results):
+            if pending.future.done():
+                continue
+            if isinstance(result, Exception):
+                batch_errors.labels(kind=self.kind).inc()
+                pending.future.set_exception(result)
+            else:
+                pending.future.set_result(result)
+
+
+class GenerationBackend:
+    """Model backend interface: each method receives a whole batch and returns one result per request"""
+
+    async def generate_products(self, requests: List[Any]) -> List[Any]:
+        raise NotImplementedError
+
+    async def generate_content(self, requests: List[Any]) -> List[Any]:
+        raise NotImplementedError
+
+
+class GenerationScheduler:
+    """One MicroBatcher per generation kind, in front of a pluggable backend"""
+
+    def __init__(self, backend: GenerationBackend, max_batch_size: int, max_wait: float, max_concurrency: int):
+        self.backend = backend
+        self.batchers: Dict[str, MicroBatcher] = {
+            "products": MicroBatcher(
+                "products", backend.generate_products, max_batch_size, max_wait, max_concurrency
+            ),
+            "content": MicroBatcher(
+                "content", backend.generate_content, max_batch_size, max_wait, max_concurrency
+            ),
+        }
+
+    def start(self):
+        for batcher in self.batchers.values():
+            batcher.start()
+
+    async def close(self):
+        for batcher in self.batchers.values():
+            await batcher.close()
+
+    async def generate_products(self, request: Any) -> Any:
+        return await self.batchers["products"].submit(request)
+
+    async def generate_content(self, request: Any) -> Any:
+        return await self.batchers["content"].submit(request)
+
+
+def load_backend(spec: str, builtin: Dict[str, Callable[[], GenerationBackend]]) -> GenerationBackend:
+    """Backend by builtin name, or "package.module:ClassName" for an external one"""
+    if spec in builtin:
+        return builtin[spec]()
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown generation backend {spec!r}; use one of {sorted(builtin)} or module:Class")
+    return getattr(importlib.import_module(module_name), class_name)()
@@ -0,0 +1,207 @@
+"""
+Near-duplicate cache for generated content
+Requests are embedded locally by feature hashing (no model): the string
+inputs are normalised into word tokens and character trigrams, prefixed with
+their field name, and hashed into a fixed-size signed vector. Vectors live in
+one preallocated NumPy matrix; a lookup is a single matrix-vector product
+followed by an argmax, restricted to entries with the same content type and
+non-text parameters. A result is reused when the best cosine similarity
+reaches the threshold.
+
+Only free text is matched fuzzily. Identifying fields (product_name,
+business_name, ...), short attribute fields ("Red", "Men's") and the numbers
+inside free text ("8 card slots") go into the partition after normalisation,
+so requests for different products never share a result however similar
+their wording is.
+
+Memory is bounded by capacity x dim float32s. When full, the least recently
+used entry is overwritten; expired entries are reclaimed first.
+"""
+
+import hashlib
+import re
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+from prometheus_client import Counter, Gauge, Histogram
+
+semantic_requests = Counter(
+    "llm_semantic_cache_requests_total", "Semantic cache lookups", ["result"]
+)
+semantic_evictions = Counter(
+    "llm_semantic_cache_evictions_total", "Entries overwritten to make room", ["reason"]
+)
+semantic_entries = Gauge("llm_semantic_cache_entries", "Live entries in the semantic cache")
+semantic_similarity = Histogram(
+    "llm_semantic_cache_best_similarity", "Best cosine similarity found per lookup",
+    buckets=(0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.925, 0.95, 0.975, 0.99, 1.0),
+)
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {"a", "an", "and", "the", "of", "for", "to", "in", "on", "with", "our", "your"}
+# Spelling variants feature hashing cannot relate on its own (applied after plural folding)
+SYNONYMS = {"tshirt": "tee", "hoody": "hoodie", "colour": "color", "jumper": "sweater", "ecommerce": "commerce"}
+# Options that control caching rather than what gets generated
+CACHE_CONTROL_OPTIONS = {"cache", "fresh_alternatives"}
+# Fields that name what is being written about: always matched exactly
+IDENTITY_FIELDS = {"product_name", "business_name", "store_name", "brand", "name", "title", "page_title", "sku"}
+# Text fields this short are attributes (colour, size, gender), also matched exactly
+EXACT_MAX_TOKENS = 3
+WORD_WEIGHT = 1.0
+TRIGRAM_WEIGHT = 0.5
+
+
+def _stem(token: str) -> str:
+    # Plural folding and a few domain synonyms ("tees" -> "tee", "shoes" -> "shoe"); enough for short product phrases
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        token = token[:-1]
+    return SYNONYMS.get(token, token)
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Lowercase, strip accents, join hyphenated words ("t-shirt" -> "tshirt"), drop stopwords, fold plurals"""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    text = re.sub(r"(?<=[a-z0-9])[-'](?=[a-z0-9])", "", text)
+    return [_stem(token) for token in WORD_PATTERN.findall(text) if token not in STOPWORDS]
+
+
+def _features(field: str, text: str) -> List[Tuple[str, float]]:
+    features = []
+    for token in normalize_tokens(text):
+        features.append((f"{field}:{token}", WORD_WEIGHT))
+        padded = f"<{token}>"
+        features.extend((f"{field}#{padded[i:i + 3]}", TRIGRAM_WEIGHT) for i in range(len(padded) - 2))
+    return features
+
+
+def _text_fields(value: Any, prefix: str = "") -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Split a nested inputs dict into embeddable free text and exact-match parameters"""
+    texts: Dict[str, str] = {}
+    exact: Dict[str, Any] = {}
+    items = value.items() if isinstance(value, dict) else enumerate(value)
+    for key, item in items:
+        path = f"{prefix}{key}"
+        if isinstance(item, list) and item and all(isinstance(element, str) for element in item):
+            # Keyword/feature lists: order does not matter
+            item = " ".join(item)
+        if isinstance(item, str):
+            tokens = normalize_tokens(item)
+            if key in IDENTITY_FIELDS or len(tokens) <= EXACT_MAX_TOKENS:
+                exact[path] = sorted(tokens)
+                continue
+            texts[path] = item
+            numbers = sorted(token for token in tokens if token.isdigit())
+            if numbers:
+                exact[f"{path}#numbers"] = numbers
+        elif isinstance(item, (dict, list)):
+            nested_texts, nested_exact = _text_fields(item, f"{path}.")
+            texts.update(nested_texts)
+            exact.update(nested_exact)
+        else:
+            exact[path] = item
+    return texts, exact
+
+
+class SemanticCache:
+    """Cosine top-1 reuse of earlier generations for near-identical requests"""
+
+    def __init__(self, dim: int, capacity: int, threshold: float, ttl: float):
+        self.dim = dim
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._partitions = np.zeros(capacity, dtype=np.int64)
+        self._expires_at = np.zeros(capacity, dtype=np.float64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._live = np.zeros(capacity, dtype=bool)
+        self._results: List[Optional[Dict[str, Any]]] = [None] * capacity
+
+    def _hash(self, feature: str) -> Tuple[int, float]:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        # Signed feature hashing: collisions cancel out on average instead of adding up
+        return digest % self.dim, (1.0 if digest >> 63 else -1.0)
+
+    def embed(self, texts: Dict[str, str]) -> Optional[np.ndarray]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for field, text in texts.items():
+            for feature, weight in _features(field, text):
+                index, sign = self._hash(feature)
+                vector[index] += sign * weight
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    @staticmethod
+    def partition(content_type: str, options: Dict[str, Any], exact: Dict[str, Any]) -> int:
+        """Requests only match within the same content type and non-text parameters"""
+        spec = {
+            "content_type": content_type.strip().lower(),
+            "options": {key: value for key, value in options.items() if key not in CACHE_CONTROL_OPTIONS},
+            "exact": exact,
+        }
+        digest = hashlib.blake2b(orjson.dumps(spec, option=orjson.OPT_SORT_KEYS), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
+    def key(self, content_type: str, inputs: Dict[str, Any], options: Dict[str, Any]) -> Tuple[int, np.ndarray]:
+        """(partition, vector) for a request"""
+        texts, exact = _text_fields(inputs)
+        vector = self.embed(texts)
+        if vector is None:
+            # Nothing fuzzy to compare: the partition alone decides, every entry in it is identical
+            vector = np.zeros(self.dim, dtype=np.float32)
+            vector[0] = 1.0
+        return self.partition(content_type, options, exact), vector
+
+    def _best(self, key: Tuple[int, np.ndarray], now: float) -> Tuple[int, float]:
+        """Most similar live entry in the key's partition as (slot, similarity); (-1, -1.0) if none"""
+        partition, vector = key
+        candidates = self._live & (self._partitions == partition) & (self._expires_at > now)
+        if not candidates.any():
+            return -1, -1.0
+        similarities = self._vectors @ vector
+        similarities[~candidates] = -1.0
+        best = int(np.argmax(similarities))
+        return best, float(similarities[best])
+
+    def lookup(self, key: Tuple[int, np.ndarray]) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        slot, similarity = self._best(key, now)
+        if slot >= 0:
+            semantic_similarity.observe(max(similarity, 0.0))
+        if slot < 0 or similarity < self.threshold:
+            semantic_requests.labels(result="miss").inc()
+            return None
+        self._last_used[slot] = now
+        semantic_requests.labels(result="hit").inc()
+        return self._results[slot]
+
+    def _free_slot(self, now: float) -> int:
+        free = np.flatnonzero(~self._live)
+        if free.size:
+            return int(free[0])
+        expired = np.flatnonzero(self._expires_at <= now)
+        if expired.size:
+            semantic_evictions.labels(reason="expired").inc()
+            return int(expired[0])
+        semantic_evictions.labels(reason="capacity").inc()
+        return int(np.argmin(self._last_used))
+
+    def store(self, key: Tuple[int, np.ndarray], result: Dict[str, Any]):
+        partition, vector = key
+        now = time.monotonic()
+        # A fresh generation replaces the entry it would otherwise have matched
+        slot, similarity = self._best(key, now)
+        if slot < 0 or similarity < self.threshold:
+            slot = self._free_slot(now)
+        self._vectors[slot] = vector
+        self._partitions[slot] = partition
+        self._expires_at[slot] = now + self.ttl
+        self._last_used[slot] = now
+        self._live[slot] = True
+        self._results[slot] = result
+        semantic_entries.set(int(self._live.sum()))
@@ -1,10 +1,12 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
 import uuid
 import random
+import orjson
 
-app = FastAPI(title="Theme Service", version="1.0.0")
+app = FastAPI(title="Theme Service", version="1.0.0", default_response_class=ORJSONResponse)
 
 class ThemeCustomizationRequest(BaseModel):
     theme_id: str
@@ -208,74 +210,79 @@ async def generate_theme_preview(request: ThemePreviewRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Preview generation failed: {str(e)}")
 
+# Constant catalog payloads, serialized once at startup
+THEME_CATEGORIES_RESPONSE = orjson.dumps({
+    "categories": [
+        {
+            "id": "modern",
+            "name": "Modern",
+            "description": "Contemporary designs with clean lines and minimal aesthetics",
+            "theme_count": 15
+        },
+        {
+            "id": "classic",
+            "name": "Classic",
+            "description": "Timeless designs that never go out of style",
+            "theme_count": 12
+        },
+        {
+            "id": "bold",
+            "name": "Bold",
+            "description": "Eye-catching designs with vibrant colors and strong typography",
+            "theme_count": 8
+        },
+        {
+            "id": "elegant",
+            "name": "Elegant",
+            "description": "Sophisticated designs perfect for luxury and premium brands",
+            "theme_count": 10
+        },
+        {
+            "id": "minimal",
+            "name": "Minimal",
+            "description": "Simple and clean designs focused on content and usability",
+            "theme_count": 20
+        }
+    ],
+    "total_categories": 5
+})
+
 @app.get("/categories")
 async def get_theme_categories():
     """Get available theme categories"""
-    return {
-        "categories": [
-            {
-                "id": "modern",
-                "name": "Modern",
-                "description": "Contemporary designs with clean lines and minimal aesthetics",
-                "theme_count": 15
-            },
-            {
-                "id": "classic",
-                "name": "Classic",
-                "description": "Timeless designs that never go out of style",
-                "theme_count": 12
-            },
-            {
-                "id": "bold",
-                "name": "Bold",
-                "description": "Eye-catching designs with vibrant colors and strong typography",
-                "theme_count": 8
-            },
-            {
-                "id": "elegant",
-                "name": "Elegant",
-                "description": "Sophisticated designs perfect for luxury and premium brands",
-                "theme_count": 10
-            },
-            {
-                "id": "minimal",
-                "name": "Minimal",
-                "description": "Simple and clean designs focused on content and usability",
-                "theme_count": 20
-            }
-        ],
-        "total_categories": 5
-    }
+    return Response(content=THEME_CATEGORIES_RESPONSE, media_type="application/json")
+
+TRENDING_THEMES_RESPONSE = orjson.dumps({
+    "trending_themes": [
+        {
+            "id": "theme_001",
+            "name": "Modern Minimal",
+            "trend_score": 0.95,
+            "usage_count": 1250,
+            "rating": 4.8
+        },
+        {
+            "id": "theme_002",
+            "name": "Elegant Fashion",
+            "trend_score": 0.88,
+            "usage_count": 890,
+            "rating": 4.6
+        },
+        {
+            "id": "theme_003",
+            "name": "Bold Commerce",
+            "trend_score": 0.92,
+            "usage_count": 1100,
+            "rating": 4.7
+        }
+    ],
+    "period": "last_30_days"
+})
 
 @app.get("/trending")
 async def get_trending_themes():
     """Get currently trending themes"""
-    return {
-        "trending_themes": [
-            {
-                "id": "theme_001",
-                "name": "Modern Minimal",
-                "trend_score": 0.95,
-                "usage_count": 1250,
-                "rating": 4.8
-            },
-            {
-                "id": "theme_002",
-                "name": "Elegant Fashion",
-                "trend_score": 0.88,
-                "usage_count": 890,
-                "rating": 4.6
-            },
-            {
-                "id": "theme_003",
-                "name": "Bold Commerce",
-                "trend_score": 0.92,
-                "usage_count": 1100,
-                "rating": 4.7
-            }
-        ],
-        "period": "last_30_days"
-    }
+    return Response(content=TRENDING_THEMES_RESPONSE, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
@@ -122,8 +122,8 @@ const LaunchReadiness: React.FC<LaunchReadinessProps> = ({ data, setData }) => {
                     progress: 0
                 })
 
-                // Start polling for status
-                pollDeploymentStatus(deployResult.deployment_id)
+                // Follow the deployment as it progresses
+                watchDeploymentStatus(deployResult.deployment_id)
             } else {
                 throw new Error('Deployment failed')
             }
@@ -140,46 +140,77 @@ const LaunchReadiness: React.FC<LaunchReadinessProps> = ({ data, setData }) => {
         }
     }
 
+    const applyDeploymentStatus = async (deploymentId: string, status: any) => {
+        setDeploymentStatus({
+            deployment_id: status.deployment_id,
+            status: status.status,
+            progress: status.progress,
+            store_url: status.store_url,
+            message: status.message
+        })
+
+        if (status.status === 'completed') {
+            // Send notifications if enabled
+            if (launchSettings.sendNotifications) {
+                await sendLaunchNotifications(status.store_id)
+            }
+
+            // Update data with store URL
+            const updatedData = {
+                ...data,
+                storeUrl: status.store_url,
+                deploymentId: deploymentId,
+                launchStatus: 'completed'
+            }
+            setData(updatedData)
+
+            // Save to localStorage for success page access
+            localStorage.setItem('storeLaunchData', JSON.stringify({
+                storeUrl: status.store_url,
+                deploymentId: deploymentId,
+                storeData: updatedData
+            }))
+        }
+    }
+
+    const isFinished = (status: any) => status.status === 'completed' || status.status === 'failed'
+
+    const watchDeploymentStatus = (deploymentId: string) => {
+        if (typeof EventSource === 'undefined') {
+            pollDeploymentStatus(deploymentId)
+            return
+        }
+
+        // The server pushes each stage as it happens
+        const source = new EventSource(`/api/v1/wizard/launch/status/${deploymentId}/events`)
+        let received = false
+        source.addEventListener('status', async (event) => {
+            received = true
+            const status = JSON.parse((event as MessageEvent).data)
+            if (isFinished(status)) {
+                source.close()
+            }
+            await applyDeploymentStatus(deploymentId, status)
+        })
+        source.onerror = () => {
+            // EventSource reconnects on its own once it has streamed; fall back if it never worked
+            if (!received) {
+                source.close()
+                pollDeploymentStatus(deploymentId)
+            }
+        }
+    }
+
     const pollDeploymentStatus = async (deploymentId: string) => {
         const pollInterval = setInterval(async () => {
             try {
                 const response = await fetch(`/api/v1/wizard/launch/status/${deploymentId}`)
                 if (response.ok) {
                     const status = await response.json()
-                    setDeploymentStatus({
-                        deployment_id: status.deployment_id,
-                        status: status.status,
-                        progress: status.progress,
-                        store_url: status.store_url,
-                        message: status.message
-                    })
-
-                    if (status.status === 'completed') {
-                        clearInterval(pollInterval)
-
-                        // Send notifications if enabled
-                        if (launchSettings.sendNotifications) {
-                            await sendLaunchNotifications(status.store_id)
-                        }
-
-                        // Update data with store URL
-                        const updatedData = {
-                            ...data,
-                            storeUrl: status.store_url,
-                            deploymentId: deploymentId,
-                            launchStatus: 'completed'
-                        }
-                        setData(updatedData)
-
-                        // Save to localStorage for success page access
-                        localStorage.setItem('storeLaunchData', JSON.stringify({
-                            storeUrl: status.store_url,
-                            deploymentId: deploymentId,
-                            storeData: updatedData
-                        }))
-                    } else if (status.status === 'failed') {
+                    if (isFinished(status)) {
                         clearInterval(pollInterval)
                     }
+                    await applyDeploymentStatus(deploymentId, status)
                 }
             } catch (error) {
                 console.error('Status polling error:', error)
@@ -0,0 +1,80 @@
+"""Unit tests for the analytics reporting endpoints (repository faked)"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import analytics
+
+
+class FakeRepository:
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self.calls = []
+
+    async def list_session_summaries(self, limit, cursor):
+        self.calls.append(cursor)
+        if cursor is None:
+            return self.sessions[:limit]
+        updated_at, session_id = cursor
+        after = [s for s in self.sessions if (s["updated_at"], s["session_id"]) < (updated_at, session_id)]
+        return after[:limit]
+
+    async def event_counts(self, start, end):
+        self.calls.append((start, end))
+        return {}
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    base = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+    sessions = [
+        {"session_id": uuid.UUID(int=i), "updated_at": base - timedelta(minutes=i)} for i in range(1, 6)
+    ]
+    repository = FakeRepository(sessions)
+
+    async def get_repository():
+        return repository
+
+    monkeypatch.setattr(analytics, "get_analytics_repository", get_repository)
+    return repository
+
+
+@pytest.fixture
+def client(repository):
+    app = FastAPI()
+    app.include_router(analytics.router, prefix="/api/v1/analytics")
+    return TestClient(app)
+
+
+def test_naive_start_is_treated_as_utc(client, repository):
+    response = client.get("/api/v1/analytics/events", params={"start": "2026-10-16T00:00:00"})
+    assert response.status_code == 200
+    start, end = repository.calls[-1]
+    assert start == datetime(2026, 10, 16, tzinfo=timezone.utc)
+    assert end.tzinfo is not None
+
+
+def test_mixed_naive_and_aware_window(client):
+    response = client.get("/api/v1/analytics/events", params={
+        "start": "2026-10-16T00:00:00", "end": "2026-10-16T02:00:00+02:00"
+    })
+    assert response.status_code == 400
+
+
+def test_cursor_survives_unencoded_round_trip(client, repository):
+    first = client.get("/api/v1/analytics/sessions", params={"limit": 2}).json()
+    cursor = first["next_cursor"]
+    assert "+" not in cursor and "/" not in cursor and "=" not in cursor
+    # Passed back by hand, without URL-encoding
+    second = client.get(f"/api/v1/analytics/sessions?limit=2&cursor={cursor}")
+    assert second.status_code == 200
+    assert [s["session_id"] for s in second.json()["sessions"]] == [str(uuid.UUID(int=3)), str(uuid.UUID(int=4))]
+
+
+def test_invalid_cursor_is_rejected(client):
+    for cursor in ("garbage", "2026-10-16T00:00:00+00:00_abc", analytics._encode_cursor(datetime.now(), "nope")):
+        assert client.get("/api/v1/analytics/sessions", params={"cursor": cursor}).status_code == 400
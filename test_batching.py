@@ -0,0 +1,140 @@
+"""Unit tests for the LLM service's request micro-batching"""
+
+import asyncio
+
+import pytest
+
+from conftest import load_service_module
+
+batching = load_service_module("llm", "batching")
+
+
+class RecordingHandler:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return [ValueError(f"bad {item}") if item == "bad" else f"result {item}" for item in items]
+
+
+def make_batcher(handler, **overrides):
+    options = {"max_batch_size": 4, "max_wait": 0.02, "max_concurrency": 2}
+    options.update(overrides)
+    return batching.MicroBatcher("test", handler, **options)
+
+
+def test_concurrent_requests_share_batches_up_to_the_size_limit():
+    handler = RecordingHandler()
+
+    async def main():
+        batcher = make_batcher(handler, max_wait=1.0)
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(8))), timeout=0.5)
+        await batcher.close()
+        return results
+
+    results = asyncio.run(main())
+    # Two full batches go out at once rather than waiting for max_wait
+    assert results == [f"result {i}" for i in range(8)]
+    assert handler.batches == [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+
+def test_partial_batch_is_dispatched_after_max_wait():
+    handler = RecordingHandler()
+
+    async def main():
+        batcher = make_batcher(handler, max_wait=0.02)
+        result = await asyncio.wait_for(batcher.submit("only"), timeout=0.5)
+        await batcher.close()
+        return result
+
+    assert asyncio.run(main()) == "result only"
+    assert handler.batches == [["only"]]
+
+
+def test_item_failure_only_fails_its_caller():
+    async def main():
+        batcher = make_batcher(RecordingHandler())
+        results = await asyncio.gather(batcher.submit("a"), batcher.submit("bad"), batcher.submit("c"),
+                                       return_exceptions=True)
+        await batcher.close()
+        return results
+
+    first, failed, last = asyncio.run(main())
+    assert (first, last) == ("result a", "result c")
+    assert isinstance(failed, ValueError)
+
+
+@pytest.mark.parametrize("handler", [
+    lambda items: asyncio.sleep(0, result=["only one"]),
+    lambda items: asyncio.sleep(0, result=RuntimeError("backend down")),
+])
+def test_broken_batch_fails_every_caller(handler):
+    async def broken(items):
+        result = await handler(items)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def main():
+        batcher = make_batcher(broken)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        await batcher.close()
+        return results
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(main()))
+
+
+def test_busy_backend_grows_the_next_batch():
+    handler = RecordingHandler(delay=0.05)
+
+    async def main():
+        batcher = make_batcher(handler, max_batch_size=16, max_wait=0.0, max_concurrency=1)
+        first = asyncio.create_task(batcher.submit(0))
+        await asyncio.sleep(0.01)
+        # Queued while the only slot is busy: sent together once it frees up
+        await asyncio.gather(first, *(batcher.submit(i) for i in range(1, 6)))
+        await batcher.close()
+
+    asyncio.run(main())
+    assert handler.batches == [[0], [1, 2, 3, 4, 5]]
+
+
+def test_cancelled_callers_are_not_sent_to_the_backend():
+    handler = RecordingHandler()
+
+    async def main():
+        batcher = make_batcher(handler, max_wait=0.05)
+        gone = asyncio.create_task(batcher.submit("gone"))
+        kept = asyncio.create_task(batcher.submit("kept"))
+        await asyncio.sleep(0)
+        gone.cancel()
+        result = await kept
+        await batcher.close()
+        return result
+
+    assert asyncio.run(main()) == "result kept"
+    assert handler.batches == [["kept"]]
+
+
+def test_close_fails_requests_still_queued():
+    async def main():
+        batcher = make_batcher(RecordingHandler(), max_wait=10.0)
+        waiting = asyncio.create_task(batcher.submit("late"))
+        await asyncio.sleep(0.01)
+        await batcher.close()
+        with pytest.raises(RuntimeError, match="shut down"):
+            await waiting
+
+    asyncio.run(main())
+
+
+def test_load_backend_by_name_or_import_path():
+    sentinel = object()
+    assert batching.load_backend("local", {"local": lambda: sentinel}) is sentinel
+    assert isinstance(batching.load_backend("collections:OrderedDict", {}), dict)
+    with pytest.raises(ValueError):
+        batching.load_backend("remote", {"local": lambda: sentinel})
@@ -0,0 +1,159 @@
+"""Unit tests for the content service's streamed bulk execution"""
+
+import asyncio
+
+import orjson
+import pytest
+from fastapi import HTTPException
+
+from conftest import load_service_module
+
+bulk = load_service_module("content", "bulk")
+
+
+async def collect(stream):
+    return [orjson.loads(line) async for line in stream]
+
+
+def run(items, handler, concurrency=2):
+    return asyncio.run(collect(bulk.run_bulk(items, handler, concurrency)))
+
+
+async def double(item):
+    await asyncio.sleep(0)
+    return {"value": item * 2}
+
+
+def test_every_item_reported_once_with_its_index():
+    lines = run(range(10), double, concurrency=3)
+    results, done = lines[:-1], lines[-1]
+    assert sorted(line["index"] for line in results) == list(range(10))
+    assert all(line["result"] == {"value": line["index"] * 2} for line in results)
+    assert done == {"type": "done", "total": 10, "total_generated": 10, "failed": 0, "success_rate": 1.0}
+
+
+def test_single_worker_preserves_input_order():
+    lines = run(range(5), double, concurrency=1)
+    assert [line["index"] for line in lines[:-1]] == [0, 1, 2, 3, 4]
+
+
+def test_results_arrive_in_completion_order():
+    async def slow_first(item):
+        await asyncio.sleep(0.05 if item == 0 else 0)
+        return {"item": item}
+
+    lines = run([0, 1], slow_first, concurrency=2)
+    assert [line["index"] for line in lines[:-1]] == [1, 0]
+
+
+def test_failures_are_per_item():
+    async def handler(item):
+        if item == 1:
+            raise HTTPException(status_code=400, detail="bad product")
+        if item == 2:
+            raise ValueError()
+        return {"item": item}
+
+    lines = run(range(4), handler)
+    by_index = {line["index"]: line for line in lines[:-1]}
+    assert by_index[1] == {"type": "result", "index": 1, "status": "failed", "error": "bad product"}
+    assert by_index[2]["error"] == "ValueError"
+    assert by_index[0]["status"] == by_index[3]["status"] == "succeeded"
+    assert lines[-1]["failed"] == 2 and lines[-1]["success_rate"] == 0.5
+
+
+def test_unreadable_input_reports_error_and_finishes_queued_items():
+    async def items():
+        yield 1
+        yield 2
+        raise ValueError("truncated body")
+
+    lines = run(items(), double)
+    errors = [line for line in lines if line["type"] == "error"]
+    assert errors == [{"type": "error", "error": "Could not read bulk request: truncated body"}]
+    assert lines[-1]["total"] == 2
+
+
+def test_concurrency_is_bounded():
+    active = peak = 0
+
+    async def handler(item):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.001)
+        active -= 1
+        return {}
+
+    run(range(50), handler, concurrency=4)
+    assert peak == 4
+
+
+def test_closing_the_stream_cancels_in_flight_items_and_stops_feeding():
+    pulled = []
+    started = []
+    cancelled = []
+
+    def items():
+        for index in range(1000):
+            pulled.append(index)
+            yield index
+
+    async def handler(item):
+        if item == 0:
+            return {}
+        started.append(item)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+
+    async def main():
+        stream = bulk.run_bulk(items(), handler, 2)
+        first = orjson.loads(await stream.__anext__())
+        assert first["index"] == 0
+        # Client disconnected
+        await stream.aclose()
+
+    asyncio.run(main())
+    assert cancelled and cancelled == started
+    assert len(pulled) < 10
+
+
+class FakeRequest:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.mark.parametrize("chunks", [
+    [b'{"a": 1}\n{"b": 2}\n{"c": 3}'],
+    [b'{"a"', b': 1}\n{"b": 2', b'}\n\n  \n{"c": 3}\n'],
+    [b'{"a": 1}\n', b'{"b": 2}\n', b'{"c": 3}', b''],
+])
+def test_ndjson_lines_reassembles_split_chunks(chunks):
+    async def main():
+        body_read = asyncio.Event()
+        lines = [orjson.loads(line) async for line in bulk.ndjson_lines(FakeRequest(chunks), body_read)]
+        assert lines == [{"a": 1}, {"b": 2}, {"c": 3}]
+        assert body_read.is_set()
+
+    asyncio.run(main())
+
+
+def test_ndjson_lines_feed_run_bulk():
+    async def main():
+        body_read = asyncio.Event()
+        request = FakeRequest([b'{"n": 1}\n{"n"', b': 2}\n'])
+
+        async def handler(line):
+            return orjson.loads(line)
+
+        return await collect(bulk.run_bulk(bulk.ndjson_lines(request, body_read), handler, 2))
+
+    lines = asyncio.run(main())
+    assert sorted(line["result"]["n"] for line in lines[:-1]) == [1, 2]
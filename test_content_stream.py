@@ -0,0 +1,144 @@
+"""Upstream stream lifecycle and caching of the gateway's streamed content generation"""
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+from app.config import Settings
+from app.routers import content
+from app.services.cache import CacheManager
+from app.services.upstream import Upstream
+
+
+class TrackedStream(httpx.AsyncByteStream):
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def aclose(self):
+        self.closed = True
+
+
+class NullAnalytics:
+    def track(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream_stream(monkeypatch):
+    stream = TrackedStream([b'{"type":"start"}\n', b'{"type":"done"}\n'])
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, stream=stream))
+    upstream = Upstream("llm", httpx.AsyncClient(transport=transport, base_url="http://llm"), Settings())
+
+    async def get_upstream_client(name):
+        return upstream
+
+    async def get_analytics_buffer():
+        return NullAnalytics()
+
+    monkeypatch.setattr(content, "get_upstream_client", get_upstream_client)
+    monkeypatch.setattr(content, "get_analytics_buffer", get_analytics_buffer)
+    return stream
+
+
+def stream_request():
+    return content.ContentRequest(content_type="product_description", inputs={}, options={"cache": False})
+
+
+def test_client_gone_before_relay_starts_closes_upstream(upstream_stream):
+    async def main():
+        response = await content.generate_content_stream(stream_request(), None)
+        assert not upstream_stream.closed
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            await asyncio.sleep(0)
+
+        await response({"type": "http"}, receive, send)
+        assert upstream_stream.closed
+
+    asyncio.run(main())
+
+
+def test_relay_forwards_body_and_closes_upstream(upstream_stream):
+    async def main():
+        response = await content.generate_content_stream(stream_request(), None)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        assert body == b'{"type":"start"}\n{"type":"done"}\n'
+        assert upstream_stream.closed
+
+    asyncio.run(main())
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = CacheManager(FakeRedis(), Settings())
+
+    async def get_cache_manager():
+        return cache
+
+    monkeypatch.setattr(content, "get_cache_manager", get_cache_manager)
+    return cache
+
+
+def cached_request():
+    return content.ContentRequest(content_type="product_description", inputs={"product_name": "Mug"})
+
+
+async def relay(request):
+    response = await content.generate_content_stream(request, None)
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def test_completed_stream_is_cached_for_later_requests(upstream_stream, cache):
+    # Lines split across chunks arrive intact
+    upstream_stream.chunks = [
+        b'{"type":"start"}\n{"type":"delta","text":"Sturdy "}\n{"type":"del',
+        b'ta","text":"mug"}\n{"type":"done","content_type":"product_description"}\n',
+    ]
+
+    async def main():
+        body = await relay(cached_request())
+        assert body == b"".join(upstream_stream.chunks)
+        entry = await cache.get(f"wizard:content:{content.content_hash(cached_request())}", route="test")
+        assert orjson.loads(entry.body) == {"content": "Sturdy mug", "content_type": "product_description"}
+        # The next request is replayed from the cache without reaching the LLM service
+        upstream_stream.chunks = []
+        replayed = await relay(cached_request())
+        assert b'"text":"Sturdy mug"' in replayed
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("chunks", [
+    [b'{"type":"start"}\n{"type":"delta","text":"Sturdy "}\n'],
+    [b'{"type":"start"}\n{"type":"error","message":"LLM stream interrupted"}\n'],
+    [b'{"type":"start"}\n{"type":"delta","text":"' + b"x" * 70000 + b'"}\n{"type":"done"}\n'],
+])
+def test_incomplete_or_oversized_stream_is_not_cached(upstream_stream, cache, chunks):
+    upstream_stream.chunks = chunks
+
+    async def main():
+        await relay(cached_request())
+        assert cache.redis.values == {}
+
+    asyncio.run(main())
@@ -0,0 +1,178 @@
+"""Tests for WAL-position based read routing between the primary and the replica
+
+The integration test needs a real primary/streaming-replica pair and only runs
+when TEST_PRIMARY_DSN and TEST_REPLICA_DSN are set.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from app.config import Settings
+from app.repositories.database import (
+    PRIMARY_WAL_LSN,
+    REPLICA_STATUS,
+    Database,
+    DatabaseRouter,
+    create_pool,
+    parse_lsn,
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value.encode() if isinstance(value, str) else value
+
+    async def get(self, key):
+        return self.values.get(key)
+
+
+class FakePrimary:
+    def __init__(self, lsn):
+        self.lsn = lsn
+
+    async def fetchval(self, name, *args):
+        assert name == PRIMARY_WAL_LSN
+        if self.lsn is None:
+            raise ConnectionError("primary unavailable")
+        return self.lsn
+
+
+class FakeReplica:
+    def __init__(self, replay_lsn, replay_age=0.0, in_recovery=True):
+        self.status = {"in_recovery": in_recovery, "replay_lsn": replay_lsn, "replay_age": replay_age}
+
+    async def fetchrow(self, name, *args):
+        assert name == REPLICA_STATUS
+        return self.status
+
+
+def make_router(primary, replica, **overrides):
+    options = {"DB_REPLICA_MAX_LAG": 5.0}
+    options.update(overrides)
+    return DatabaseRouter(primary, replica, FakeRedis(), Settings(**options))
+
+
+def test_parse_lsn_orders_positions():
+    assert parse_lsn("0/0") == 0
+    assert parse_lsn("0/16B3748") == 0x16B3748
+    assert parse_lsn("1/0") == 1 << 32
+    assert parse_lsn("0/FFFFFFFF") < parse_lsn("1/0")
+
+
+def test_caught_up_replica_has_no_lag_even_after_idle_period():
+    # The last replayed commit is old, but nothing has been written since
+    router = make_router(FakePrimary("0/3000"), FakeReplica("0/3000", replay_age=600.0))
+    assert asyncio.run(router.check_lag()) == 0.0
+    assert router.replica_usable
+
+
+def test_lagging_replica_reports_replay_age():
+    router = make_router(FakePrimary("0/5000"), FakeReplica("0/3000", replay_age=12.0))
+    assert asyncio.run(router.check_lag()) == 12.0
+    assert not router.replica_usable
+
+
+def test_replica_without_replay_history_is_not_usable():
+    router = make_router(FakePrimary("0/5000"), FakeReplica(None, replay_age=None))
+    asyncio.run(router.check_lag())
+    assert not router.replica_usable
+
+
+def test_failed_check_marks_lag_unknown():
+    router = make_router(FakePrimary(None), FakeReplica("0/3000"))
+    assert asyncio.run(router.check_lag()) is None
+    assert not router.replica_usable
+
+
+def test_session_reads_follow_replayed_position():
+    primary = FakePrimary("0/3000")
+    replica = FakeReplica("0/3000")
+    router = make_router(primary, replica)
+
+    async def main():
+        await router.check_lag()
+        primary.lsn = "0/4000"
+        await router.note_write("s1")
+        assert await router.reader("s1") is primary
+        # Sessions without a recent write and unscoped reads still use the replica
+        assert await router.reader("s2") is replica
+        assert await router.reader() is replica
+        # Replayed just short of the write, then past it
+        replica.status["replay_lsn"] = "0/3FFF"
+        await router.check_lag()
+        assert await router.reader("s1") is primary
+        replica.status["replay_lsn"] = "0/4000"
+        await router.check_lag()
+        assert await router.reader("s1") is replica
+
+    asyncio.run(main())
+
+
+def test_write_position_unknown_pins_session_to_primary():
+    primary = FakePrimary("0/3000")
+    replica = FakeReplica("0/3000")
+    router = make_router(primary, replica)
+
+    async def main():
+        await router.check_lag()
+        primary.lsn = None
+        await router.note_write("s1")
+        primary.lsn = "0/3000"
+        await router.check_lag()
+        assert await router.reader("s1") is primary
+
+    asyncio.run(main())
+
+
+def test_plain_instance_as_replica_serves_every_read():
+    primary = FakePrimary("0/3000")
+    replica = FakeReplica(None, replay_age=None, in_recovery=False)
+    router = make_router(primary, replica)
+
+    async def main():
+        await router.check_lag()
+        await router.note_write("s1")
+        assert await router.reader("s1") is replica
+
+    asyncio.run(main())
+
+
+@pytest.mark.skipif(
+    not (os.environ.get("TEST_PRIMARY_DSN") and os.environ.get("TEST_REPLICA_DSN")),
+    reason="needs a primary/streaming-replica pair (TEST_PRIMARY_DSN, TEST_REPLICA_DSN)",
+)
+def test_read_your_writes_against_streaming_replica():
+    settings = Settings(DB_POOL_MIN_SIZE=1, DB_POOL_MAX_SIZE=2, DB_REPLICA_MAX_LAG=30.0)
+
+    async def main():
+        primary = Database(await create_pool(settings, os.environ["TEST_PRIMARY_DSN"]), settings)
+        replica = Database(await create_pool(settings, os.environ["TEST_REPLICA_DSN"]), settings)
+        router = DatabaseRouter(primary, replica, FakeRedis(), settings)
+        try:
+            async with primary.acquire() as conn:
+                await conn.execute("CREATE TABLE IF NOT EXISTS router_lag_probe (id serial PRIMARY KEY)")
+                row_id = await conn.fetchval("INSERT INTO router_lag_probe DEFAULT VALUES RETURNING id")
+            await router.note_write("probe")
+            await router.check_lag()
+            # Whenever the router sends the session to the replica, the write must be visible there
+            for _ in range(200):
+                db = await router.reader("probe")
+                async with db.acquire() as conn:
+                    seen = await conn.fetchval("SELECT count(*) FROM router_lag_probe WHERE id = $1", row_id)
+                assert seen == 1 or db is primary
+                if db is replica:
+                    break
+                await asyncio.sleep(0.05)
+                await router.check_lag()
+            else:
+                pytest.fail("replica never replayed the write")
+        finally:
+            await router.close()
+            await primary.close()
+
+    asyncio.run(main())
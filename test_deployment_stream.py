@@ -0,0 +1,62 @@
+"""Listener lifecycle of the deployment status Server-Sent Events stream"""
+
+import asyncio
+
+import pytest
+
+from app.config import Settings
+from app.routers import wizard
+from app.services.deployment_events import DeploymentEventHub, deployment_event
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = DeploymentEventHub(None, Settings())
+    states = {"d1": deployment_event("d1", "queued", 0, "Store deployment queued")}
+
+    async def get_hub():
+        return hub
+
+    async def current_state(deployment_id):
+        return states.get(deployment_id)
+
+    monkeypatch.setattr(wizard, "get_deployment_event_hub", get_hub)
+    monkeypatch.setattr(wizard, "_current_deployment_state", current_state)
+    hub.states = states
+    return hub
+
+
+def test_response_never_sent_leaves_no_listener(hub):
+    async def main():
+        response = await wizard.stream_deployment_status("d1")
+        # Client disconnected before the body was iterated
+        await response.body_iterator.aclose()
+        assert hub._listeners == {}
+
+    asyncio.run(main())
+
+
+def test_stream_unsubscribes_after_terminal_event(hub):
+    async def main():
+        response = await wizard.stream_deployment_status("d1")
+        chunks = response.body_iterator
+        assert await chunks.__anext__() == b"retry: 3000\n\n"
+        assert b'"queued"' in await chunks.__anext__()
+        assert len(hub._listeners["d1"]) == 1
+        hub._dispatch("d1", deployment_event("d1", "completed", 100, "Store deployed"))
+        assert b'"completed"' in await chunks.__anext__()
+        with pytest.raises(StopAsyncIteration):
+            await chunks.__anext__()
+        assert hub._listeners == {}
+
+    asyncio.run(main())
+
+
+def test_unknown_deployment_is_404_without_subscribing(hub):
+    async def main():
+        with pytest.raises(wizard.HTTPException) as raised:
+            await wizard.stream_deployment_status("missing")
+        assert raised.value.status_code == 404
+        assert hub._listeners == {}
+
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""Readiness reporting when dependencies cannot even be set up"""
+
+import asyncio
+
+import pytest
+
+from app import main
+from app.config import Settings
+from app.services import health
+
+
+class FakeRedis:
+    async def ping(self):
+        return True
+
+
+class FakeDatabase:
+    async def execute(self, name, *args):
+        return "SELECT 1"
+
+
+async def unavailable():
+    raise ConnectionError("connection refused")
+
+
+@pytest.fixture
+def dependencies(monkeypatch):
+    async def get_redis_client():
+        return FakeRedis()
+
+    async def get_database():
+        return FakeDatabase()
+
+    monkeypatch.setattr(health, "get_redis_client", get_redis_client)
+    monkeypatch.setattr(health, "get_database", get_database)
+    monkeypatch.setattr(health, "get_upstream_clients", unavailable)
+    monkeypatch.setattr(health, "get_database_router", unavailable)
+    return monkeypatch
+
+
+def test_upstream_and_replica_setup_failures_are_reported_as_checks(dependencies):
+    checker = health.HealthChecker(Settings(DATABASE_REPLICA_URL="postgresql://replica/db"))
+    report = asyncio.run(checker.readiness())
+    assert report["ready"]
+    assert report["status"] == "degraded"
+    assert report["checks"]["upstreams"].startswith("unhealthy")
+    assert report["checks"]["database_replica"].startswith("unhealthy")
+    assert report["checks"]["database"] == "healthy"
+
+
+def test_database_setup_failure_makes_readyz_503(dependencies):
+    dependencies.setattr(health, "get_database", unavailable)
+    dependencies.setattr(main, "health_checker", health.HealthChecker(Settings()))
+    response = asyncio.run(main.readiness_check())
+    assert response.status_code == 503
+
+
+def test_unexpected_collector_failure_is_not_ready(dependencies):
+    checker = health.HealthChecker(Settings())
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    dependencies.setattr(checker, "_collect", broken)
+    report = asyncio.run(checker.readiness())
+    assert not report["ready"]
+    assert checker._report is None
@@ -0,0 +1,76 @@
+"""Unit tests for the JSON patch replay used to rebuild session history"""
+
+import pytest
+
+from app.utils.json_patch import APPEND_INDEX, apply_patch, parse_pointer
+
+
+def patched(document, *operations, prefix=None):
+    return apply_patch(document, list(operations), prefix=prefix)
+
+
+def test_parse_pointer_unescapes_and_maps_append():
+    assert parse_pointer("") == []
+    assert parse_pointer("/a~1b/m~0n/-") == ["a/b", "m~n", APPEND_INDEX]
+    with pytest.raises(ValueError):
+        parse_pointer("products")
+
+
+def test_add_on_array_index_inserts():
+    document = {"tags": ["a", "b", "c"]}
+    assert patched(document, {"op": "add", "path": "/tags/1", "value": "x"}) == {"tags": ["a", "x", "b", "c"]}
+
+
+def test_add_clamps_like_jsonb_insert():
+    assert patched({"t": ["a"]}, {"op": "add", "path": "/t/-", "value": "z"}) == {"t": ["a", "z"]}
+    assert patched({"t": ["a"]}, {"op": "add", "path": "/t/5", "value": "z"}) == {"t": ["a", "z"]}
+    assert patched({"t": ["a", "b"]}, {"op": "add", "path": "/t/-1", "value": "z"}) == {"t": ["a", "z", "b"]}
+    assert patched({"t": ["a"]}, {"op": "add", "path": "/t/-5", "value": "z"}) == {"t": ["z", "a"]}
+
+
+def test_replace_on_array_index_overwrites():
+    assert patched({"t": ["a", "b"]}, {"op": "replace", "path": "/t/0", "value": "z"}) == {"t": ["z", "b"]}
+    assert patched({"t": ["a"]}, {"op": "replace", "path": "/t/3", "value": "z"}) == {"t": ["a", "z"]}
+
+
+def test_add_and_replace_set_object_members():
+    document = {"name": "Shop"}
+    document = patched(document, {"op": "add", "path": "/name", "value": "Store"})
+    document = patched(document, {"op": "replace", "path": "/color", "value": "red"})
+    assert document == {"name": "Store", "color": "red"}
+
+
+def test_remove():
+    document = {"t": ["a", "b"], "name": "Shop"}
+    document = patched(document, {"op": "remove", "path": "/t/0"}, {"op": "remove", "path": "/name"})
+    assert document == {"t": ["b"]}
+    assert patched({"t": ["a"]}, {"op": "remove", "path": "/t/4"}) == {"t": ["a"]}
+
+
+def test_missing_parent_is_a_no_op():
+    document = {"a": {}}
+    assert patched(document, {"op": "add", "path": "/b/c", "value": 1}) == {"a": {}}
+    assert patched(document, {"op": "remove", "path": "/a/x/y"}) == {"a": {}}
+
+
+def test_non_integer_array_index_is_rejected():
+    with pytest.raises(ValueError):
+        patched({"t": []}, {"op": "add", "path": "/t/first", "value": 1})
+
+
+def test_prefix_scopes_operations_to_a_step():
+    configuration = {"step_2": {"products": [{"name": "Mug"}]}}
+    configuration = patched(
+        configuration,
+        {"op": "add", "path": "/products/0", "value": {"name": "Pot"}},
+        {"op": "replace", "path": "/products/1/price", "value": 9},
+        prefix=["step_2"],
+    )
+    assert configuration == {"step_2": {"products": [{"name": "Pot"}, {"name": "Mug", "price": 9}]}}
+
+
+def test_empty_path_replaces_the_whole_step():
+    configuration = {"step_1": {"name": "Old"}}
+    assert patched(configuration, {"op": "replace", "path": "", "value": {"name": "New"}}, prefix=["step_1"]) == {
+        "step_1": {"name": "New"}
+    }
@@ -0,0 +1,44 @@
+"""Access logging wraps the auth and rate-limit middleware"""
+
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.middleware.logging import LoggingMiddleware
+
+
+class Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def access_log():
+    logger = logging.getLogger("app.access")
+    handler, level = Records(), logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    yield handler.records
+    logger.removeHandler(handler)
+    logger.setLevel(level)
+
+
+def test_logging_is_outermost_application_middleware():
+    names = [middleware.cls.__name__ for middleware in app.user_middleware]
+    assert names.index(LoggingMiddleware.__name__) < names.index("AuthMiddleware")
+    assert names.index(LoggingMiddleware.__name__) < names.index("RateLimitMiddleware")
+
+
+def test_rejected_request_is_logged(access_log):
+    client = TestClient(app, base_url="http://localhost")
+    response = client.get("/api/v1/wizard/session/abc", headers={"Authorization": "Basic abc"})
+    assert response.status_code == 401
+    [record] = [r for r in access_log if r.path == "/api/v1/wizard/session/abc"]
+    assert record.status == 401
+    assert record.request_id
@@ -0,0 +1,92 @@
+"""Unit tests for rate-limit identity resolution and lease sizing"""
+
+import asyncio
+import hashlib
+import secrets
+
+from app.config import Settings
+from app.middleware import rate_limiting
+from app.services.rate_limiter import RateLimitResult, TokenBucketLimiter, _Lease, classify_route, parse_rate
+from app.utils.client_ip import client_address, parse_networks
+
+PROXIES = parse_networks(["10.0.0.0/8"])
+
+
+def test_forwarded_header_ignored_from_untrusted_peer():
+    assert client_address("203.0.113.9", "1.2.3.4", PROXIES) == "203.0.113.9"
+    assert client_address("203.0.113.9", "1.2.3.4", []) == "203.0.113.9"
+
+
+def test_rightmost_untrusted_hop_is_the_client():
+    # The client prepended a forged address; the proxy appended the real one
+    assert client_address("10.0.0.2", "6.6.6.6, 198.51.100.7", PROXIES) == "198.51.100.7"
+    assert client_address("10.0.0.2", "198.51.100.7, 10.0.0.1", PROXIES) == "198.51.100.7"
+
+
+def test_unusable_forwarded_chain_falls_back_to_peer():
+    assert client_address("10.0.0.2", "not-an-ip", PROXIES) == "10.0.0.2"
+    assert client_address("10.0.0.2", "10.0.0.1", PROXIES) == "10.0.0.2"
+    assert client_address(None, "1.2.3.4", PROXIES) is None
+
+
+def test_parse_rate_and_route_classes():
+    assert parse_rate("10/minute") == (10, 10 / 60)
+    assert classify_route("/api/v1/wizard/llm/generate-products") == "llm_generation"
+    assert classify_route("/healthz") is None
+    assert classify_route("/api/v1/other") == "default"
+
+
+class _Redis:
+    def register_script(self, script):
+        return None
+
+
+def test_lease_grows_while_exhausted_and_shrinks_to_use():
+    limiter = TokenBucketLimiter(_Redis(), Settings(RATE_LIMIT_LEASE_FRACTION=0.1))
+    assert limiter._lease_size(None, 600, 1, now=0.0) == 1
+    exhausted_early = _Lease(tokens=0, granted=8, remote_remaining=0, expires_at=10.0, used=8)
+    assert limiter._lease_size(exhausted_early, 600, 1, now=5.0) == 16
+    assert limiter._lease_size(_Lease(0, 50, 0, 10.0, used=50), 600, 1, now=5.0) == 60
+    expired = _Lease(tokens=37, granted=40, remote_remaining=0, expires_at=10.0, used=3)
+    assert limiter._lease_size(expired, 600, 1, now=11.0) == 3
+
+
+class _RecordingLimiter:
+    def __init__(self):
+        self.identities = []
+
+    async def hit(self, identity, route_class):
+        self.identities.append(identity)
+        return RateLimitResult(allowed=True, limit=10, remaining=9, reset=60)
+
+
+def _identities(monkeypatch, api_keys, request_keys):
+    monkeypatch.setattr(rate_limiting, "get_settings", lambda: Settings(API_KEYS=api_keys))
+
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    middleware = rate_limiting.RateLimitMiddleware(endpoint)
+    middleware.limiter = _RecordingLimiter()
+    for key in request_keys:
+        scope = {
+            "type": "http", "method": "POST", "path": "/api/v1/wizard/llm/generate-products",
+            "headers": [(b"x-api-key", key.encode())], "client": ("203.0.113.9", 5000), "state": {},
+        }
+        asyncio.run(middleware(scope, None, send))
+    return middleware.limiter.identities
+
+
+def test_rotating_unknown_api_keys_share_the_ip_bucket(monkeypatch):
+    identities = _identities(monkeypatch, [], [secrets.token_hex(16) for _ in range(5)])
+    assert identities == ["ip:203.0.113.9"] * 5
+
+
+def test_issued_api_key_gets_its_own_bucket(monkeypatch):
+    digest = hashlib.sha256(b"issued-key").hexdigest()
+    identities = _identities(monkeypatch, [digest.upper()], ["issued-key", "guessed-key"])
+    assert identities == [f"key:{digest[:16]}", "ip:203.0.113.9"]
@@ -0,0 +1,177 @@
+"""Unit tests for the gateway's circuit breaker, retry budget and upstream client"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import Settings
+from app.services.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, RetryBudget
+from app.services.upstream import Upstream
+
+
+def make_breaker(**overrides):
+    options = {"failure_threshold": 2, "reset_timeout": 0.0, "half_open_calls": 1}
+    options.update(overrides)
+    return CircuitBreaker("test", **options)
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = make_breaker(reset_timeout=60)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_half_open_allows_limited_probes_then_closes_on_success():
+    breaker = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_released_probe_frees_the_half_open_slot():
+    breaker = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+
+
+def test_retry_budget_caps_retries():
+    budget = RetryBudget(ratio=0.0, min_per_second=0.1, window=10)
+    assert budget.try_withdraw()
+    assert not budget.try_withdraw()
+
+
+def make_upstream(handler, **overrides):
+    options = {
+        "UPSTREAM_BREAKER_FAILURE_THRESHOLD": 1,
+        "UPSTREAM_BREAKER_RESET_TIMEOUT": 0.0,
+        "UPSTREAM_HEDGE_DELAY": 0.01,
+    }
+    options.update(overrides)
+    settings = Settings(**options)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://upstream")
+    return Upstream("test", client, settings)
+
+
+def open_breaker(upstream):
+    upstream.breaker.record_failure()
+    assert upstream.breaker.state == OPEN
+
+
+def test_cancelled_probe_does_not_wedge_half_open():
+    async def slow(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    async def main():
+        upstream = make_upstream(slow)
+        open_breaker(upstream)
+        probe = asyncio.create_task(upstream.get("/"))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        # The next call is allowed through as a new probe
+        upstream.client._transport = httpx.MockTransport(lambda request: httpx.Response(200))
+        response = await upstream.get("/")
+        assert response.status_code == 200
+        assert upstream.breaker.state == CLOSED
+
+    asyncio.run(main())
+
+
+def test_unexpected_error_in_probe_counts_as_failure():
+    def broken(request):
+        raise ValueError("bad response")
+
+    async def main():
+        upstream = make_upstream(broken)
+        open_breaker(upstream)
+        with pytest.raises(ValueError):
+            await upstream.get("/")
+        assert upstream.breaker.state == OPEN
+
+    asyncio.run(main())
+
+
+def test_cancelled_hedged_call_cancels_both_copies():
+    started = []
+    cancelled = []
+
+    async def slow(request):
+        started.append(request)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(request)
+            raise
+        return httpx.Response(200)
+
+    async def main():
+        upstream = make_upstream(slow)
+        call = asyncio.create_task(upstream.get("/", hedge=True))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        await asyncio.sleep(0)
+        assert len(started) == 2
+        assert len(cancelled) == 2
+
+    asyncio.run(main())
+
+
+def test_hedged_call_returns_first_success():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+        return httpx.Response(200, text=str(len(calls)))
+
+    async def main():
+        upstream = make_upstream(handler)
+        response = await upstream.get("/", hedge=True)
+        assert response.text == "2"
+
+    asyncio.run(main())
+
+
+def test_cancelled_before_hedge_delay_cancels_primary():
+    cancelled = []
+
+    async def slow(request):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(request)
+            raise
+        return httpx.Response(200)
+
+    async def main():
+        upstream = make_upstream(slow, UPSTREAM_HEDGE_DELAY=5.0)
+        call = asyncio.create_task(upstream.get("/", hedge=True))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        await asyncio.sleep(0)
+        assert len(cancelled) == 1
+
+    asyncio.run(main())
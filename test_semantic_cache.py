@@ -0,0 +1,89 @@
+"""Unit tests for the LLM service's near-duplicate content cache"""
+
+import pytest
+
+from conftest import load_service_module
+
+semantic_cache = load_service_module("llm", "semantic_cache")
+
+
+def make_cache(**overrides):
+    options = {"dim": 1024, "capacity": 8, "threshold": 0.95, "ttl": 60}
+    options.update(overrides)
+    return semantic_cache.SemanticCache(**options)
+
+
+def store_and_lookup(cache, first, second, content_type="product_description"):
+    cache.store(cache.key(content_type, first, {}), {"content": "first"})
+    return cache.lookup(cache.key(content_type, second, {}))
+
+
+@pytest.mark.parametrize("first, second", [
+    ({"product_name": "T-Shirts", "category": "Apparel"}, {"product_name": "tshirt", "category": "apparel"}),
+    ({"product_name": "Cotton Tees"}, {"product_name": "cotton t-shirt"}),
+    (
+        {"product_name": "Mug", "description": "A sturdy ceramic mug for your morning coffee and tea"},
+        {"product_name": "Mug", "description": "sturdy ceramic mugs for the morning coffee and tea"},
+    ),
+])
+def test_near_duplicates_are_reused(first, second):
+    assert store_and_lookup(make_cache(), first, second) == {"content": "first"}
+
+
+@pytest.mark.parametrize("first, second", [
+    ({"product_name": "Organic Cotton Tee, Red"}, {"product_name": "Organic Cotton Tee, Blue"}),
+    ({"product_name": "Men's Running Shoes"}, {"product_name": "Women's Running Shoes"}),
+    ({"business_name": "Acme Coffee Roasters"}, {"business_name": "Apex Coffee Roasters"}),
+    (
+        {"product_name": "Wallet", "color": "Red"},
+        {"product_name": "Wallet", "color": "Blue"},
+    ),
+    (
+        {"product_name": "Wallet", "features": "slim leather wallet with 8 card slots and a coin pocket"},
+        {"product_name": "Wallet", "features": "slim leather wallet with 6 card slots and a coin pocket"},
+    ),
+    (
+        {"product_name": "Wallet", "features": ["Slim", "Leather", "8 card slots", "RFID blocking"]},
+        {"product_name": "Wallet", "features": ["Slim", "Leather", "6 card slots", "RFID blocking"]},
+    ),
+])
+def test_near_misses_are_not_reused(first, second):
+    assert store_and_lookup(make_cache(), first, second) is None
+
+
+def test_partitions_by_content_type_and_options():
+    cache = make_cache()
+    inputs = {"product_name": "Mug"}
+    cache.store(cache.key("product_description", inputs, {"tone": "casual"}), {"content": "casual"})
+    assert cache.lookup(cache.key("product_title", inputs, {"tone": "casual"})) is None
+    assert cache.lookup(cache.key("product_description", inputs, {"tone": "formal"})) is None
+    # Cache-control options do not split the partition
+    assert cache.lookup(cache.key("product_description", inputs, {"tone": "casual", "cache": True})) == {"content": "casual"}
+
+
+def test_store_replaces_matching_entry():
+    cache = make_cache()
+    key = cache.key("product_description", {"product_name": "Mug"}, {})
+    cache.store(key, {"content": "old"})
+    cache.store(key, {"content": "new"})
+    assert cache.lookup(key) == {"content": "new"}
+    assert int(cache._live.sum()) == 1
+
+
+def test_evicts_least_recently_used_when_full():
+    cache = make_cache(capacity=2)
+    keys = [cache.key("product_description", {"product_name": name}, {}) for name in ("Mug", "Pot", "Cup")]
+    cache.store(keys[0], {"content": "mug"})
+    cache.store(keys[1], {"content": "pot"})
+    cache.lookup(keys[0])
+    cache.store(keys[2], {"content": "cup"})
+    assert cache.lookup(keys[0]) == {"content": "mug"}
+    assert cache.lookup(keys[1]) is None
+    assert cache.lookup(keys[2]) == {"content": "cup"}
+
+
+def test_expired_entries_are_not_returned():
+    cache = make_cache(ttl=-1)
+    key = cache.key("product_description", {"product_name": "Mug"}, {})
+    cache.store(key, {"content": "mug"})
+    assert cache.lookup(key) is None
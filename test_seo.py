@@ -0,0 +1,80 @@
+"""Unit tests for the single-pass SEO analyzer shared by the content and LLM services"""
+
+import unicodedata
+from pathlib import Path
+
+import pytest
+
+from conftest import load_service_module
+
+seo = load_service_module("content", "seo")
+
+ROOT = Path(__file__).parent
+
+
+def test_service_copies_are_identical():
+    content_copy = (ROOT / "services" / "content" / "seo.py").read_text()
+    llm_copy = (ROOT / "services" / "llm" / "seo.py").read_text()
+    assert content_copy == llm_copy
+
+
+def test_accented_words_are_single_tokens():
+    text = "Best café in town. Visit our café. Crème brûlée daily."
+    assert seo.words(text) == [
+        "best", "café", "in", "town", "visit", "our", "café", "crème", "brûlée", "daily"
+    ]
+    analysis = seo.analyze(text, ["café", "crème brûlée"])
+    assert analysis["word_count"] == 10
+    assert analysis["sentence_count"] == 3
+    assert analysis["keyword_counts"] == {"café": 2, "crème brûlée": 1}
+
+
+def test_decomposed_accents_match_composed_keywords():
+    text = unicodedata.normalize("NFD", "Crème brûlée daily")
+    assert seo.analyze(text, ["crème brûlée"])["keyword_counts"] == {"crème brûlée": 1}
+
+
+def test_syllables_ignore_accents():
+    assert seo.count_syllables("brûlée") == seo.count_syllables("brulee")
+    assert seo.count_syllables("café") == 2
+
+
+@pytest.mark.parametrize("content, keywords", [("", []), ("   \n", []), ("", ["mug"]), ("<p></p>", [])])
+def test_empty_content_scores_zero(content, keywords):
+    analysis = seo.analyze(content, keywords)
+    assert analysis["seo_score"] == 0
+    assert analysis["word_count"] == 0
+
+
+def test_overlapping_and_multi_word_keywords_counted_in_one_pass():
+    analysis = seo.analyze("Running shoes for trail running. Shoes ship free.", ["running shoes", "shoes", "running"])
+    assert analysis["keyword_counts"] == {"running shoes": 1, "shoes": 2, "running": 2}
+
+
+def test_keywords_do_not_match_across_sentences():
+    analysis = seo.analyze("We sell running. Shoes are extra.", ["running shoes"])
+    assert analysis["keyword_counts"] == {"running shoes": 0}
+    assert analysis["missing_keywords"] == ["running shoes"]
+
+
+def test_heading_structure_issues():
+    outline = seo.headings("# Title\n\n### Details\n<h1>Again</h1>")
+    assert [heading["level"] for heading in outline] == [1, 3, 1]
+    issues = seo.analyze("# Title\n\n### Details\n<h1>Again</h1>", ["mug"])["headings"]["issues"]
+    assert "multiple_h1" in issues
+    assert "skipped_heading_level" in issues
+    assert "keywords_not_in_headings" in issues
+
+
+def test_optimize_appends_missing_keywords():
+    result = seo.optimize("A sturdy mug.", ["mug", "ceramic"])
+    assert result["optimized_content"] == "A sturdy mug. ceramic."
+    assert result["analysis"]["missing_keywords"] == ["ceramic"]
+
+
+def test_batch_uses_document_keywords_over_shared_ones():
+    results = seo.analyze_batch(
+        [{"id": 1, "content": "A mug."}, {"id": 2, "content": "A pot.", "target_keywords": ["pot"]}],
+        target_keywords=["mug"],
+    )
+    assert [(result["id"], result["keyword_counts"]) for result in results] == [(1, {"mug": 1}), (2, {"pot": 1})]
@@ -0,0 +1,73 @@
+"""Unit tests for the content service's compiled template registry"""
+
+import orjson
+import pytest
+
+from conftest import load_service_module
+
+template_registry = load_service_module("content", "template_registry")
+CompiledTemplate = template_registry.CompiledTemplate
+TemplateRegistry = template_registry.TemplateRegistry
+
+
+def test_render_applies_filters_and_fallbacks():
+    template = CompiledTemplate(
+        "{name|upper}: {category|lower} - {features|join} ({tone|title})",
+        defaults={"category": "General", "features": ["Quality", "Modern"]},
+    )
+    assert template.fields == ("name", "category", "features", "tone")
+    assert template.render({"name": "Mug", "tone": "warm and cosy"}) == (
+        "MUG: general - Quality, Modern (Warm And Cosy)"
+    )
+    # Context beats inputs, inputs beat defaults, anything else renders empty
+    assert template.render({"name": "Mug", "category": "Kitchen"}, name="Pot") == "POT: kitchen - Quality, Modern ()"
+
+
+def test_literal_braces_survive():
+    assert CompiledTemplate("{{literal}} {name}").render({"name": "x"}) == "{literal} x"
+
+
+@pytest.mark.parametrize("source", ["{name:>10}", "{name!r}", "{}", "{name|shout}", "{unclosed"])
+def test_bad_placeholders_fail_at_compile_time(source):
+    with pytest.raises(ValueError):
+        CompiledTemplate(source)
+
+
+def write_template(directory, content_type, spec):
+    (directory / f"{content_type}.json").write_bytes(orjson.dumps(spec))
+
+
+def test_load_uses_default_for_unknown_content_types(tmp_path):
+    write_template(tmp_path, "_default", {"template": "Generated {content_type} for {product_name}"})
+    write_template(tmp_path, "product_title", {
+        "template": "{product_name|title}",
+        "catalog": [{"id": "t1", "name": "Plain", "template": "{product_name}"}],
+    })
+    registry = TemplateRegistry.load(tmp_path)
+    assert registry.render("product_title", {"product_name": "blue mug"}) == "Blue Mug"
+    assert registry.render("haiku", {"product_name": "Mug"}) == "Generated haiku for Mug"
+    assert orjson.loads(registry.catalog_response("product_title"))["total_templates"] == 1
+    assert orjson.loads(registry.catalog_response("haiku")) == {
+        "content_type": "haiku", "templates": [], "total_templates": 0
+    }
+
+
+def test_load_rejects_invalid_files(tmp_path):
+    write_template(tmp_path, "_default", {"template": "x"})
+    write_template(tmp_path, "broken", {"defaults": {}})
+    with pytest.raises(ValueError, match="broken.json"):
+        TemplateRegistry.load(tmp_path)
+
+
+def test_load_requires_a_default_template(tmp_path):
+    write_template(tmp_path, "product_title", {"template": "{product_name}"})
+    with pytest.raises(ValueError, match="_default"):
+        TemplateRegistry.load(tmp_path)
+
+
+def test_shipped_templates_compile():
+    registry = TemplateRegistry.load()
+    assert "product_description" in registry.templates
+    assert registry.render("product_description", {"product_name": "Mug", "category": "Kitchen"}).startswith(
+        "Discover the amazing Mug. This premium kitchen product"
+    )